@@ -0,0 +1,136 @@
+"""Compares time and peak traced memory of assembling a knowledge graph from
+node and edge dataframes through record tuples, through bulk filling of
+networkx storage and through CSR arrays:
+
+poetry run python benchmarks/bench_assemble_kg.py
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+from networkx import DiGraph
+
+from eos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
+    EdgeDF,
+    EdgeDFs,
+    EdgeType,
+)
+from eos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDF,
+    NodeDFs,
+    NodeType,
+)
+from eos.nodes.assemble_kg import (
+    csr_graph_from_element_dfs,
+    digraph_from_element_dfs,
+    edge_tuples_from_edge_dfs,
+    node_tuples_from_node_dfs,
+)
+
+
+def mock_element_dfs(n_themes: int, n_sub_industries: int) -> Tuple[NodeDFs, EdgeDFs]:
+    rng = np.random.default_rng(seed=0)
+    nid_theme = np.arange(n_themes)
+    nid_sub_industry = np.arange(n_themes, n_themes + n_sub_industries)
+
+    node_dfs = NodeDFs(
+        members=[
+            NodeDF(
+                ntype=NodeType.theme,
+                df=pd.DataFrame(
+                    {
+                        NodeAttrKey.nid.value: nid_theme,
+                        NodeAttrKey.ntype.value: NodeType.theme.value,
+                        NodeAttrKey.theme.value: [f"theme {i}" for i in nid_theme],
+                        NodeAttrKey.description.value: "description",
+                    }
+                ),
+            ),
+            NodeDF(
+                ntype=NodeType.sub_industry,
+                df=pd.DataFrame(
+                    {
+                        NodeAttrKey.nid.value: nid_sub_industry,
+                        NodeAttrKey.ntype.value: NodeType.sub_industry.value,
+                        NodeAttrKey.label.value: np.arange(n_sub_industries),
+                    }
+                ),
+            ),
+        ]
+    )
+    edge_dfs = EdgeDFs(
+        members=[
+            EdgeDF(
+                etype=EdgeType.theme_to_sub_industry,
+                df=pd.DataFrame(
+                    {
+                        EdgeAttrKey.src.value: nid_theme,
+                        EdgeAttrKey.dst.value: rng.choice(nid_sub_industry, n_themes),
+                        EdgeAttrKey.etype.value: EdgeType.theme_to_sub_industry.value,
+                    }
+                ),
+            )
+        ]
+    )
+
+    return node_dfs, edge_dfs
+
+
+def assemble_from_tuples(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
+    nx_g = DiGraph()
+    nx_g.add_nodes_from(node_tuples_from_node_dfs(node_dfs=node_dfs))
+    nx_g.add_edges_from(edge_tuples_from_edge_dfs(edge_dfs=edge_dfs))
+
+    return nx_g
+
+
+def measure(func: Callable[[], Any]) -> Tuple[float, float]:
+    """Returns wall time in seconds and peak traced memory in MiB, measured in
+    separate runs because tracing slows allocations down"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return elapsed, peak / 2**20
+
+
+def main(n_themes: int, n_sub_industries: int) -> None:
+    node_dfs, edge_dfs = mock_element_dfs(
+        n_themes=n_themes, n_sub_industries=n_sub_industries
+    )
+
+    cases = {
+        "tuples": assemble_from_tuples,
+        "bulk networkx": digraph_from_element_dfs,
+        "csr arrays": csr_graph_from_element_dfs,
+    }
+
+    print(f"{n_themes} themes, {n_sub_industries} sub industries")
+    for name, assemble in cases.items():
+        elapsed, peak = measure(lambda: assemble(node_dfs=node_dfs, edge_dfs=edge_dfs))
+        print(f"{name}: {elapsed:.2f} s, peak {peak:.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks knowledge graph assembly paths"
+    )
+    parser.add_argument("-nt", "--n_themes", type=int, default=1_000_000)
+    parser.add_argument("-nsi", "--n_sub_industries", type=int, default=10_000)
+
+    args = parser.parse_args()
+
+    main(n_themes=args.n_themes, n_sub_industries=args.n_sub_industries)
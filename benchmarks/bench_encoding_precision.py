@@ -0,0 +1,145 @@
+"""Compares disk size of encodings stored at each EncodingPrecision and the
+drift of clustering labels they cause, as adjusted Rand indices against
+labels of float32 encodings. Drift is reported both for the whole stage,
+where the number of sub industries is selected again, and for k-means with
+the number of sub industries selected for float32 encodings, which
+separates drift in cluster membership from drift in the selected number.
+As a noise floor, the drift caused by only changing the k-means seed of
+float32 encodings is reported too.
+Encodings saved by encode_features are used if given, otherwise clustered
+mock encodings:
+
+poetry run python benchmarks/bench_encoding_precision.py
+poetry run python benchmarks/bench_encoding_precision.py -pte data/04_feature/theme.npy -pde data/04_feature/description.npy
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score
+
+from eos.nodes.encoding_precision import (
+    EncodingPrecision,
+    dequantise_encoding,
+    mean_dequantised,
+    quantise_encoding,
+)
+from eos.nodes.k_means_cluster import _cluster_for_sub_and_industries
+
+
+def mock_encoding(
+    n_themes: int, dim: int, n_centres: int, seed: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Unit norm theme and description encodings scattered around shared
+    centres like sentence embeddings of related texts"""
+    rng = np.random.default_rng(seed=seed)
+    centres = rng.normal(size=(n_centres, dim))
+    membership = rng.integers(n_centres, size=n_themes)
+
+    list_encoding = []
+    for _ in range(2):
+        encoding = centres[membership] + rng.normal(scale=0.8, size=(n_themes, dim))
+        encoding /= np.linalg.norm(encoding, axis=1, keepdims=True)
+        list_encoding.append(encoding.astype(np.float32))
+
+    return list_encoding[0], list_encoding[1]
+
+
+def main(
+    path_theme_encoding: Optional[Path],
+    path_description_encoding: Optional[Path],
+    n_themes: int,
+    dim: int,
+) -> None:
+    if path_theme_encoding is not None and path_description_encoding is not None:
+        theme_encoding = dequantise_encoding(stored=np.load(path_theme_encoding))
+        description_encoding = dequantise_encoding(
+            stored=np.load(path_description_encoding)
+        )
+    else:
+        theme_encoding, description_encoding = mock_encoding(
+            n_themes=n_themes, dim=dim, n_centres=max(2, n_themes // 20), seed=0
+        )
+
+    print(f"{len(theme_encoding)} themes of {theme_encoding.shape[1]} dimensions")
+    print(
+        f"{'precision':>10} {'MiB':>8} {'max abs err':>12} {'k':>5} "
+        f"{'ARI sub ind':>12} {'ARI fixed k':>12} {'ARI ind':>8} {'secs':>7}"
+    )
+
+    reference: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    with tempfile.TemporaryDirectory() as dirname:
+        for precision in EncodingPrecision:
+            paths = [Path(dirname) / f"{name}.npy" for name in ["t", "d"]]
+            for path, encoding in zip(paths, [theme_encoding, description_encoding]):
+                np.save(path, quantise_encoding(encoding=encoding, precision=precision))
+            size = sum(path.stat().st_size for path in paths) / (1 << 20)
+
+            stored = [np.load(path, mmap_mode="r") for path in paths]
+            error = float(
+                np.abs(dequantise_encoding(stored=stored[0]) - theme_encoding).max()
+            )
+
+            start = time.perf_counter()
+            sub_industry_label, industry_label = _cluster_for_sub_and_industries(
+                theme_encoding=stored[0], description_encoding=stored[1]
+            )
+            seconds = time.perf_counter() - start
+
+            # Industry labels are compared per theme as sub industries differ
+            theme_industry_label = industry_label[sub_industry_label]
+            if reference is None:
+                reference = (sub_industry_label, theme_industry_label)
+
+            fixed_k_label = (
+                KMeans(n_clusters=len(np.unique(reference[0])), random_state=42)
+                .fit(mean_dequantised(list_stored=stored))
+                .labels_
+            )
+
+            print(
+                f"{precision.value:>10} {size:>8.2f} {error:>12.2e} "
+                f"{len(np.unique(sub_industry_label)):>5} "
+                f"{adjusted_rand_score(reference[0], sub_industry_label):>12.4f} "
+                f"{adjusted_rand_score(reference[0], fixed_k_label):>12.4f} "
+                f"{adjusted_rand_score(reference[1], theme_industry_label):>8.4f} "
+                f"{seconds:>7.2f}"
+            )
+
+        if reference is not None:
+            reseeded_label = (
+                KMeans(n_clusters=len(np.unique(reference[0])), random_state=0)
+                .fit(
+                    mean_dequantised(list_stored=[theme_encoding, description_encoding])
+                )
+                .labels_
+            )
+            print(
+                "ARI fixed k of float32 encodings with another k-means seed: "
+                f"{adjusted_rand_score(reference[0], reseeded_label):.4f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks clustering label drift of reduced precision "
+        "encodings"
+    )
+    parser.add_argument("-pte", "--path_theme_encoding", type=Path, default=None)
+    parser.add_argument("-pde", "--path_description_encoding", type=Path, default=None)
+    parser.add_argument("-nt", "--n_themes", type=int, default=400)
+    parser.add_argument("-d", "--dim", type=int, default=384)
+
+    args = parser.parse_args()
+
+    main(
+        path_theme_encoding=args.path_theme_encoding,
+        path_description_encoding=args.path_description_encoding,
+        n_themes=args.n_themes,
+        dim=args.dim,
+    )
@@ -0,0 +1,107 @@
+"""Compares strategies selecting the number of clusters against the
+exhaustive search over the same range: how many candidates each evaluates
+and how far its selection falls from the exhaustive optimum. Candidates are
+fitted once for the exhaustive search, and the other strategies replay
+their scores:
+
+poetry run python benchmarks/bench_k_selection.py
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from eos.nodes.k_search import KSearch
+from eos.nodes.k_selection import KSelection, KSelectionConfig, select_n_clusters
+
+
+class ReplayedKSearch(KSearch):
+    """Looks scores up instead of fitting candidates"""
+
+    def __init__(self, all_scores: Dict[int, float]) -> None:
+        self.all_scores = all_scores
+        self.scores: Dict[int, float] = {}
+        self.executor = None
+
+    def evaluate(self, list_n_clusters: List[int]) -> Dict[int, float]:
+        for n_clusters in list_n_clusters:
+            self.scores[n_clusters] = self.all_scores[n_clusters]
+
+        return {n_clusters: self.scores[n_clusters] for n_clusters in list_n_clusters}
+
+
+def mock_encoding(n_rows: int, dim: int, n_centres: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed=seed)
+    centres = rng.normal(size=(n_centres, dim))
+    encoding = centres[rng.integers(n_centres, size=n_rows)] + rng.normal(
+        scale=0.5, size=(n_rows, dim)
+    )
+
+    return encoding.astype(np.float32)
+
+
+def main(n_rows: int, dim: int, n_centres: int, budget: int) -> None:
+    encoding = mock_encoding(n_rows=n_rows, dim=dim, n_centres=n_centres, seed=0)
+    n_lowest, n_highest = n_rows // 5, n_rows // 2 - 1
+
+    start = time.perf_counter()
+    with KSearch(encoding=encoding) as k_search:
+        k_search.evaluate(list_n_clusters=list(range(n_lowest, n_highest + 1)))
+    seconds_per_fit = (time.perf_counter() - start) / len(k_search.scores)
+    all_scores = dict(k_search.scores)
+    best_score = max(all_scores.values())
+
+    print(
+        f"{n_rows} rows, {n_centres} centres, candidates {n_lowest} to "
+        f"{n_highest}, {seconds_per_fit:.3f} seconds per candidate"
+    )
+    print(f"{'strategy':>32} {'fits':>5} {'k':>5} {'score':>8} {'gap':>8}")
+
+    configs = [
+        KSelectionConfig(strategy=KSelection.exhaustive),
+        KSelectionConfig(strategy=KSelection.coarse_to_fine),
+        KSelectionConfig(strategy=KSelection.coarse_to_fine, num_points=16),
+        KSelectionConfig(strategy=KSelection.coarse_to_fine, budget=budget),
+        KSelectionConfig(
+            strategy=KSelection.coarse_to_fine, num_points=16, min_improvement=1e-3
+        ),
+        KSelectionConfig(strategy=KSelection.golden_section),
+        KSelectionConfig(strategy=KSelection.golden_section, budget=budget),
+    ]
+    for config in configs:
+        replayed_k_search = ReplayedKSearch(all_scores=all_scores)
+        n_clusters = select_n_clusters(
+            k_search=replayed_k_search,
+            n_lowest=n_lowest,
+            n_highest=n_highest,
+            config=config,
+        )
+        score = all_scores[n_clusters]
+
+        name = config.strategy.value
+        if config.strategy == KSelection.coarse_to_fine:
+            name += f" {config.num_points}pts"
+        if config.budget is not None:
+            name += f" budget {config.budget}"
+        if config.min_improvement is not None:
+            name += f" stop {config.min_improvement}"
+        print(
+            f"{name:>32} {len(replayed_k_search.scores):>5} {n_clusters:>5} "
+            f"{score:>8.4f} {best_score - score:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks strategies selecting the number of clusters"
+    )
+    parser.add_argument("-nr", "--n_rows", type=int, default=1000)
+    parser.add_argument("-d", "--dim", type=int, default=32)
+    parser.add_argument("-nc", "--n_centres", type=int, default=300)
+    parser.add_argument("-b", "--budget", type=int, default=20)
+
+    args = parser.parse_args()
+
+    main(n_rows=args.n_rows, dim=args.dim, n_centres=args.n_centres, budget=args.budget)
@@ -0,0 +1,98 @@
+"""Compares encoding throughput of a sentence transformer run by PyTorch with
+its ONNX Runtime exports, in float32 and with int8 quantised weights, and
+reports how close their encodings stay to PyTorch's. Requires the optional
+onnx dependency group:
+
+poetry install --with onnx
+poetry run python benchmarks/bench_onnx_encoder.py -pst data/01_raw/all-MiniLM-L6-v2/ -pdo data/cache/onnx
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from eos.nodes.encode_features import TextEncoder, encode_list_text
+from eos.nodes.encode_pool import load_sentence_transformer
+from eos.nodes.onnx_encoder import OnnxEncoder, export_onnx_encoder
+from eos.nodes.stage_cache import digest_path
+
+
+def mock_list_text(n_texts: int) -> List[str]:
+    """Texts ranging from theme-like names to description-like paragraphs"""
+    rng = np.random.default_rng(seed=0)
+    words = ["industrial", "software", "battery", "retail", "logistics", "energy"]
+
+    return [
+        " ".join(rng.choice(words, size=rng.integers(2, 120)).tolist())
+        for _ in range(n_texts)
+    ]
+
+
+def measure(model: TextEncoder, list_text: List[str]) -> Tuple[float, np.ndarray]:
+    """Returns texts encoded per second after a warm-up batch"""
+    encode_list_text(model=model, list_text=list_text[:32])
+
+    start = time.perf_counter()
+    encoding = encode_list_text(model=model, list_text=list_text)
+    elapsed = time.perf_counter() - start
+
+    return len(list_text) / elapsed, encoding
+
+
+def cosine_similarity(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    similarity: np.ndarray = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+
+    return similarity
+
+
+def main(path_sentence_transformer: Path, path_dir_onnx: Path, n_texts: int) -> None:
+    list_text = mock_list_text(n_texts=n_texts)
+
+    export_onnx_encoder(
+        path_sentence_transformer=path_sentence_transformer,
+        path_dir_onnx=path_dir_onnx,
+        model_digest=digest_path(path=path_sentence_transformer, digest_memo={}),
+        quantise=True,
+        list_text_check=list_text[:256],
+    )
+
+    throughput, reference = measure(
+        model=load_sentence_transformer(path_sentence_transformer),
+        list_text=list_text,
+    )
+    print(f"{n_texts} texts")
+    print(f"torch: {throughput:.0f} texts/s")
+
+    for quantised in [False, True]:
+        throughput, encoding = measure(
+            model=OnnxEncoder(path_dir_onnx=path_dir_onnx, quantised=quantised),
+            list_text=list_text,
+        )
+        similarity = cosine_similarity(reference=reference, candidate=encoding)
+        print(
+            f"onnx{'_int8' if quantised else ''}: {throughput:.0f} texts/s, "
+            f"cosine similarity to torch min {similarity.min():.4f} "
+            f"mean {similarity.mean():.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks PyTorch and ONNX Runtime encoder backends"
+    )
+    parser.add_argument("-pst", "--path_sentence_transformer", type=Path, required=True)
+    parser.add_argument("-pdo", "--path_dir_onnx", type=Path, required=True)
+    parser.add_argument("-nt", "--n_texts", type=int, default=5_000)
+
+    args = parser.parse_args()
+
+    main(
+        path_sentence_transformer=args.path_sentence_transformer,
+        path_dir_onnx=args.path_dir_onnx,
+        n_texts=args.n_texts,
+    )
@@ -0,0 +1,111 @@
+"""Compares load time of the compiled schema decoders against dacite, which
+must be installed from the dev dependency group to run this benchmark:
+
+poetry run python benchmarks/bench_schema_decoding.py
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable
+
+import dacite
+import numpy as np
+import orjson
+from pandas import DataFrame
+
+from eos.data_interfaces.clusters_eval_data_interface import (
+    ClusteringLevel,
+    ClustersEval,
+    decode_clusters_eval,
+)
+from eos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDF,
+    NodeDFs,
+    NodeType,
+    decode_node_dfs,
+)
+from eos.nodes.utils_df_serialisation import default, df_type_hook
+
+
+def mock_clusters_eval_json(n_clusters: int) -> bytes:
+    return orjson.dumps(
+        {
+            "level": ClusteringLevel.sub_industry.value,
+            "members": [
+                {"id": i, "label": f"label {i}", "note": f"note {i}"}
+                for i in range(n_clusters)
+            ],
+        }
+    )
+
+
+def mock_node_dfs_json(n_nodes: int) -> bytes:
+    node_dfs = NodeDFs(
+        members=[
+            NodeDF(
+                ntype=ntype,
+                df=DataFrame(
+                    {
+                        NodeAttrKey.nid.value: np.arange(n_nodes),
+                        NodeAttrKey.label.value: np.arange(n_nodes) % 100,
+                    }
+                ),
+            )
+            for ntype in NodeType
+        ]
+    )
+
+    return orjson.dumps(node_dfs, default=default)
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(n_clusters: int, n_nodes: int, repeat: int) -> None:
+    clusters_eval_json = mock_clusters_eval_json(n_clusters=n_clusters)
+    node_dfs_json = mock_node_dfs_json(n_nodes=n_nodes)
+
+    cases = {
+        f"ClustersEval ({n_clusters} members)": (
+            lambda: decode_clusters_eval(orjson.loads(clusters_eval_json)),
+            lambda: dacite.from_dict(
+                data_class=ClustersEval,
+                data=orjson.loads(clusters_eval_json),
+                config=dacite.Config(cast=[ClusteringLevel]),
+            ),
+        ),
+        f"NodeDFs ({len(NodeType)} x {n_nodes} rows)": (
+            lambda: decode_node_dfs(orjson.loads(node_dfs_json)),
+            lambda: dacite.from_dict(
+                data_class=NodeDFs,
+                data=orjson.loads(node_dfs_json),
+                config=dacite.Config(
+                    type_hooks={DataFrame: df_type_hook}, cast=[NodeType]
+                ),
+            ),
+        ),
+    }
+
+    for name, (compiled, reflective) in cases.items():
+        t_compiled = best_of(compiled, repeat=repeat)
+        t_reflective = best_of(reflective, repeat=repeat)
+        print(
+            f"{name}: compiled {t_compiled * 1e3:.1f} ms, "
+            f"dacite {t_reflective * 1e3:.1f} ms, "
+            f"speed-up {t_reflective / t_compiled:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks compiled schema decoders against dacite"
+    )
+    parser.add_argument("-nc", "--n_clusters", type=int, default=100_000)
+    parser.add_argument("-nn", "--n_nodes", type=int, default=10_000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+
+    main(n_clusters=args.n_clusters, n_nodes=args.n_nodes, repeat=args.repeat)
@@ -0,0 +1,70 @@
+"""Compares aggregating theme encodings per sub industry with one boolean
+mask per label, as derive_sub_industry_encoding used to, against the single
+pass segment reduction, as the number of sub industries grows:
+
+poetry run python benchmarks/bench_segment_reduction.py
+"""
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from eos.nodes.segment_reduction import Aggregation, reduce_segments
+
+
+def reduce_segments_masked(values: np.ndarray, segment_ids: np.ndarray) -> np.ndarray:
+    return np.array(
+        [
+            np.mean(values[segment_ids == segment_id], axis=0)
+            for segment_id in np.unique(segment_ids)
+        ]
+    )
+
+
+def main(n_themes: int, dim: int, list_n_segments: List[int]) -> None:
+    rng = np.random.default_rng(seed=0)
+    values = rng.random((n_themes, dim), dtype=np.float32)
+
+    print(f"{n_themes} themes of {dim} dimensions, seconds per aggregation")
+    print(
+        f"{'segments':>9} {'masked':>8} "
+        + " ".join(f"{a.value:>14}" for a in Aggregation)
+    )
+    for n_segments in list_n_segments:
+        segment_ids = rng.integers(n_segments, size=n_themes)
+
+        start = time.perf_counter()
+        expected = reduce_segments_masked(values=values, segment_ids=segment_ids)
+        seconds_masked = time.perf_counter() - start
+
+        list_seconds = []
+        for aggregation in Aggregation:
+            start = time.perf_counter()
+            reduced = reduce_segments(
+                values=values, segment_ids=segment_ids, aggregation=aggregation
+            )
+            list_seconds.append(time.perf_counter() - start)
+            if aggregation == Aggregation.mean:
+                assert np.allclose(reduced, expected, atol=1e-5)
+
+        print(
+            f"{n_segments:>9} {seconds_masked:>8.3f} "
+            + " ".join(f"{seconds:>14.3f}" for seconds in list_seconds)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks aggregating encodings per sub industry"
+    )
+    parser.add_argument("-nt", "--n_themes", type=int, default=50000)
+    parser.add_argument("-d", "--dim", type=int, default=384)
+    parser.add_argument(
+        "-ns", "--list_n_segments", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+
+    args = parser.parse_args()
+
+    main(n_themes=args.n_themes, dim=args.dim, list_n_segments=args.list_n_segments)
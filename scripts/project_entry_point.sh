@@ -1,11 +1,14 @@
 #!/bin/bash -e
 
-python -m eos.pipelines.type_raw_source_themes -prst data/01_raw/industrial_business_theme_descriptions.jsonl -pst data/02_intermediate/source_themes.json
-python -m eos.pipelines.source_themes_to_element_dfs -pst data/02_intermediate/source_themes.json -pnd data/03_primary/node_dfs.json -ped data/03_primary/edge_dfs.json
-python -m eos.pipelines.encode_features -pnd data/03_primary/node_dfs.json -pst data/01_raw/all-MiniLM-L6-v2/ -pdfe data/04_feature/
-python -m eos.pipelines.cluster_for_sub_and_industries -pte data/04_feature/theme.npy -pde data/04_feature/description.npy -psil data/04_feature/sub_industry_label.npy -pil data/04_feature/industry_label.npy
-python -m eos.pipelines.parse_interm_layer_elements -pbnd data/03_primary/node_dfs.json -pbed data/03_primary/edge_dfs.json -psil data/04_feature/sub_industry_label.npy -pil data/04_feature/industry_label.npy -pind data/04_feature/interm_node_dfs.json -pied data/04_feature/interm_edge_dfs.json
-python -m eos.pipelines.assemble_kg -pnd data/04_feature/interm_node_dfs.json -ped data/04_feature/interm_edge_dfs.json -png data/04_feature/nx_g.json
-python -m eos.pipelines.eval_llm_output -psic data/01_raw/llm_sub_industry_clusters.json -pic data/01_raw/llm_industry_clusters.json -psie data/02_intermediate/sub_industry_clusters_eval.json -pie data/02_intermediate/industry_clusters_eval.json
-python -m eos.pipelines.augment_element_dfs_with_llm -pbnd data/04_feature/interm_node_dfs.json -psie data/02_intermediate/sub_industry_clusters_eval.json -pie data/02_intermediate/industry_clusters_eval.json -plnd data/04_feature/llm_node_dfs.json
-python -m eos.pipelines.assemble_kg -pnd data/04_feature/llm_node_dfs.json -ped data/04_feature/interm_edge_dfs.json -png data/04_feature/llm_nx_g.json
+# Stages whose inputs, parameters and code are unchanged are restored from here
+PATH_DIR_CACHE="${PATH_DIR_CACHE:-data/cache}"
+
+python -m eos.pipelines.type_raw_source_themes -prst data/01_raw/industrial_business_theme_descriptions.jsonl -pst data/02_intermediate/source_themes.json -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.source_themes_to_element_dfs -pst data/02_intermediate/source_themes.json -pnd data/03_primary/node_dfs.arrow -ped data/03_primary/edge_dfs.arrow -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.encode_features -pnd data/03_primary/node_dfs.arrow -pst data/01_raw/all-MiniLM-L6-v2/ -pdfe data/04_feature/ -pec "$PATH_DIR_CACHE/embeddings.sqlite" -pes "$PATH_DIR_CACHE/encoder.sock" -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.cluster_for_sub_and_industries -pte data/04_feature/theme.npy -pde data/04_feature/description.npy -psil data/04_feature/sub_industry_label.npy -pil data/04_feature/industry_label.npy -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.parse_interm_layer_elements -pbnd data/03_primary/node_dfs.arrow -pbed data/03_primary/edge_dfs.arrow -psil data/04_feature/sub_industry_label.npy -pil data/04_feature/industry_label.npy -pind data/04_feature/interm_node_dfs.arrow -pied data/04_feature/interm_edge_dfs.arrow -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.assemble_kg -pnd data/04_feature/interm_node_dfs.arrow -ped data/04_feature/interm_edge_dfs.arrow -png data/04_feature/nx_g.json -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.eval_llm_output -psic data/01_raw/llm_sub_industry_clusters.json -pic data/01_raw/llm_industry_clusters.json -psie data/02_intermediate/sub_industry_clusters_eval.json -pie data/02_intermediate/industry_clusters_eval.json -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.augment_element_dfs_with_llm -pbnd data/04_feature/interm_node_dfs.arrow -psie data/02_intermediate/sub_industry_clusters_eval.json -pie data/02_intermediate/industry_clusters_eval.json -plnd data/04_feature/llm_node_dfs.arrow -pdc "$PATH_DIR_CACHE"
+python -m eos.pipelines.assemble_kg -pnd data/04_feature/llm_node_dfs.arrow -ped data/04_feature/interm_edge_dfs.arrow -png data/04_feature/llm_nx_g.json -pdc "$PATH_DIR_CACHE"
@@ -6,10 +6,11 @@ from enum import Enum
 from pathlib import Path
 from typing import Dict, List, TypedDict
 
-import dacite
 import orjson
 from pandas import DataFrame
 
+from eos.nodes.utils_schema_decoding import compile_decoder
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,6 +78,9 @@ class ClustersEval:
         )
 
 
+decode_clusters_eval = compile_decoder(data_class=ClustersEval)
+
+
 class ClustersEvalDataInterface:
     def __init__(self, filepath: Path) -> None:
         self.filepath = filepath
@@ -97,11 +101,7 @@ class ClustersEvalDataInterface:
         with open(self.filepath, "rb") as f:
             json_data = orjson.loads(f.read())
 
-            clusters_eval = dacite.from_dict(
-                data_class=ClustersEval,
-                data=json_data,
-                config=dacite.Config(cast=[ClusteringLevel]),
-            )
+            clusters_eval = decode_clusters_eval(json_data)
 
             logger.info(f"Loaded a {type(clusters_eval)} object from {self.filepath}")
 
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import orjson
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from pandas import DataFrame
+
+from eos.nodes.utils_schema_decoding import compile_decoder
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class DFStorageFormat(str, Enum):
+    json = "json"  # One orjson document embedding each dataframe as a json string
+    parquet = "parquet"  # One compressed Parquet file per dataframe
+    arrow = "arrow"  # One uncompressed Arrow IPC (Feather V2) file per dataframe
+
+    @classmethod
+    def from_filepath(cls, filepath: Path) -> DFStorageFormat:
+        suffix_to_format: Dict[str, DFStorageFormat] = {
+            ".json": cls.json,
+            ".parquet": cls.parquet,
+            ".arrow": cls.arrow,
+            ".feather": cls.arrow,
+        }
+
+        if filepath.suffix not in suffix_to_format:
+            raise ValueError(
+                f"Suffix of {filepath} does not match any of supported "
+                f"suffixes {list(suffix_to_format)}"
+            )
+
+        return suffix_to_format[filepath.suffix]
+
+
+@dataclass
+class ColumnarDFEntry:
+    name: str  # e.g. a node type or an edge type
+    filename: str  # Relative to the directory holding the manifest
+    num_rows: int
+
+
+@dataclass
+class ColumnarDFsManifest:
+    storage_format: DFStorageFormat
+    members: List[ColumnarDFEntry]
+
+    @property
+    def names(self) -> List[str]:
+        return [entry.name for entry in self.members]
+
+    def select(self, names: List[str]) -> List[ColumnarDFEntry]:
+        name_to_entry = {entry.name: entry for entry in self.members}
+
+        missing_names = [name for name in names if name not in name_to_entry]
+        if len(missing_names) > 0:
+            raise ValueError(
+                f"Dataframes {missing_names} are not among stored "
+                f"dataframes {self.names}"
+            )
+
+        return [name_to_entry[name] for name in names]
+
+
+decode_manifest = compile_decoder(data_class=ColumnarDFsManifest)
+
+
+def project_named_dfs(
+    named_dfs: Dict[str, DataFrame],
+    names: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+) -> Dict[str, DataFrame]:
+    """Keeps only dataframes called names and, within each of them, those of
+    columns it has. Applied after parsing by backends without push-down"""
+    if names is not None:
+        missing_names = [name for name in names if name not in named_dfs]
+        if len(missing_names) > 0:
+            raise ValueError(
+                f"Dataframes {missing_names} are not among loaded "
+                f"dataframes {list(named_dfs)}"
+            )
+        named_dfs = {name: named_dfs[name] for name in names}
+
+    if columns is not None:
+        named_dfs = {
+            name: df[[column for column in df.columns if column in columns]]
+            for name, df in named_dfs.items()
+        }
+
+    return named_dfs
+
+
+def validate_projected_columns(
+    named_dfs: Dict[str, DataFrame], columns: List[str]
+) -> None:
+    """Fails if a requested column is in none of the selected dataframes,
+    which is most likely a typo rather than an intended empty projection"""
+    found_columns = {column for df in named_dfs.values() for column in df.columns}
+    missing_columns = [column for column in columns if column not in found_columns]
+
+    if len(missing_columns) > 0:
+        raise ValueError(
+            f"Columns {missing_columns} are in none of " f"dataframes {list(named_dfs)}"
+        )
+
+
+def remove_path(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def link_or_copy(path_src: Path, path_dst: Path) -> None:
+    """Hard links an immutable file into another store, falling back to a copy
+    across file systems. Files are always replaced rather than rewritten in
+    place so that later writes to either store never affect the other"""
+    path_partial = path_dst.with_name(f"{path_dst.name}.partial")
+    path_partial.unlink(missing_ok=True)
+
+    try:
+        os.link(path_src, path_partial)
+    except OSError:
+        shutil.copy2(path_src, path_partial)
+
+    path_partial.replace(path_dst)
+
+
+class ColumnarDFsDataInterface:
+    """Stores named dataframes as one binary columnar file each in a directory
+    alongside a small json manifest. With memory_map, Arrow IPC files are
+    mapped instead of read so that numeric columns are views onto the page
+    cache shared by all processes reading the same files"""
+
+    def __init__(
+        self, dirpath: Path, storage_format: DFStorageFormat, memory_map: bool = False
+    ) -> None:
+        if storage_format == DFStorageFormat.json:
+            raise ValueError(f"{storage_format} is not a columnar storage format")
+
+        if memory_map and storage_format != DFStorageFormat.arrow:
+            logger.warning(
+                f"{storage_format} files cannot be loaded without decoding so "
+                "memory mapping is ignored"
+            )
+            memory_map = False
+
+        self.dirpath = dirpath
+        self.storage_format = storage_format
+        self.memory_map = memory_map
+
+    @property
+    def path_manifest(self) -> Path:
+        return self.dirpath / MANIFEST_FILENAME
+
+    def save_manifest(self, manifest: ColumnarDFsManifest) -> None:
+        with open(self.path_manifest, "wb") as f:
+            f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+    def load_manifest(self) -> ColumnarDFsManifest:
+        with open(self.path_manifest, "rb") as f:
+            json_data = orjson.loads(f.read())
+
+            manifest = decode_manifest(json_data)
+
+            if manifest.storage_format != self.storage_format:
+                raise ValueError(
+                    f"Manifest at {self.path_manifest} describes "
+                    f"{manifest.storage_format} files instead of {self.storage_format}"
+                )
+
+            return manifest
+
+    def save_df(self, df: DataFrame, filename: str) -> None:
+        # Non-default indices are kept as columns, default ones as metadata
+        table = pa.Table.from_pandas(df)
+
+        # Replace rather than overwrite files which may be mapped by readers
+        path_partial = self.dirpath / f"{filename}.partial"
+
+        if self.storage_format == DFStorageFormat.parquet:
+            pq.write_table(table, path_partial)
+        else:
+            # Uncompressed so that files can later be mapped without copies
+            feather.write_feather(table, path_partial, compression="uncompressed")
+
+        path_partial.replace(self.dirpath / filename)
+
+    def read_column_names(self, filename: str) -> List[str]:
+        """Reads column names from file metadata without loading any data"""
+        if self.storage_format == DFStorageFormat.parquet:
+            schema = pq.read_schema(self.dirpath / filename)
+        else:
+            with pa.memory_map(str(self.dirpath / filename)) as source:
+                schema = pa.ipc.open_file(source).schema
+
+        column_names: List[str] = schema.names
+
+        return column_names
+
+    def load_df(self, filename: str, columns: Optional[List[str]] = None) -> DataFrame:
+        if columns is not None:
+            # Only chunks of selected columns are decoded or mapped
+            columns = [
+                column
+                for column in self.read_column_names(filename=filename)
+                if column in columns
+            ]
+
+        if self.storage_format == DFStorageFormat.parquet:
+            table = pq.read_table(self.dirpath / filename, columns=columns)
+        else:
+            table = feather.read_table(
+                self.dirpath / filename, columns=columns, memory_map=self.memory_map
+            )
+
+        # Split blocks keep numeric columns as read-only views of mapped buffers
+        # instead of consolidating them into freshly allocated 2D blocks
+        df: DataFrame = table.to_pandas(split_blocks=self.memory_map)
+
+        return df
+
+    def save(self, named_dfs: Dict[str, DataFrame]) -> None:
+        self._save_members(named_dfs=named_dfs, base_entries=[], base=self)
+
+    def save_partial(
+        self,
+        named_dfs: Dict[str, DataFrame],
+        base: Optional[ColumnarDFsDataInterface] = None,
+    ) -> None:
+        """Writes only named_dfs and keeps all other dataframes of base, which
+        defaults to this store. Kept files of another base store are hard linked
+        rather than rewritten"""
+        base = self if base is None else base
+        if base.storage_format != self.storage_format:
+            raise ValueError(
+                f"Cannot keep {base.storage_format} files of {base.dirpath} "
+                f"in a store of {self.storage_format} files"
+            )
+
+        self._save_members(
+            named_dfs=named_dfs, base_entries=base.load_manifest().members, base=base
+        )
+
+    def _save_members(
+        self,
+        named_dfs: Dict[str, DataFrame],
+        base_entries: List[ColumnarDFEntry],
+        base: ColumnarDFsDataInterface,
+    ) -> None:
+        if not self.dirpath.exists():
+            logger.info(f"Creating {self.dirpath} because it does not yet exist")
+            self.dirpath.mkdir(parents=True, exist_ok=True)
+
+        previous_filenames: List[str] = (
+            [entry.filename for entry in self.load_manifest().members]
+            if self.path_manifest.is_file()
+            else []
+        )
+
+        kept_entries = [entry for entry in base_entries if entry.name not in named_dfs]
+        if base.dirpath.resolve() != self.dirpath.resolve():
+            for entry in kept_entries:
+                link_or_copy(
+                    path_src=base.dirpath / entry.filename,
+                    path_dst=self.dirpath / entry.filename,
+                )
+
+        written_entries: Dict[str, ColumnarDFEntry] = {}
+        for name, df in named_dfs.items():
+            entry = ColumnarDFEntry(
+                name=name,
+                filename=f"{name}.{self.storage_format.value}",
+                num_rows=len(df),
+            )
+            self.save_df(df=df, filename=entry.filename)
+            written_entries[name] = entry
+
+        # Rewritten dataframes retain their position and new ones are appended
+        members: List[ColumnarDFEntry] = [
+            written_entries.pop(entry.name, entry) for entry in base_entries
+        ] + list(written_entries.values())
+
+        # The manifest is written last so that it only lists complete files
+        manifest = ColumnarDFsManifest(
+            storage_format=self.storage_format, members=members
+        )
+        self.save_manifest(manifest=manifest)
+
+        # Remove files of dataframes no longer part of the collection
+        for filename in set(previous_filenames) - {e.filename for e in members}:
+            (self.dirpath / filename).unlink(missing_ok=True)
+
+        logger.info(
+            f"Saved {len(named_dfs)} dataframes as {self.storage_format.value} "
+            f"files to {self.dirpath} and kept {len(kept_entries)} others"
+        )
+
+    def load(
+        self, names: Optional[List[str]] = None, columns: Optional[List[str]] = None
+    ) -> Dict[str, DataFrame]:
+        manifest = self.load_manifest()
+        entries = manifest.members if names is None else manifest.select(names=names)
+
+        named_dfs: Dict[str, DataFrame] = {
+            entry.name: self.load_df(filename=entry.filename, columns=columns)
+            for entry in entries
+        }
+        logger.info(
+            f"Loaded {len(named_dfs)} dataframes from {self.storage_format.value} "
+            f"files in {self.dirpath}"
+        )
+
+        return named_dfs
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+import orjson
+from networkx import Graph
+from pandas import DataFrame
+
+from eos.data_interfaces.columnar_dfs_data_interface import (
+    ColumnarDFsDataInterface,
+    DFStorageFormat,
+    remove_path,
+)
+from eos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey
+from eos.data_interfaces.node_dfs_data_interface import NodeAttrKey
+from eos.nodes.utils_schema_decoding import compile_decoder
+
+logger = logging.getLogger(__name__)
+
+NTYPE_ATTR_KEY: str = NodeAttrKey.ntype.value
+ETYPE_ATTR_KEY: str = EdgeAttrKey.etype.value
+NID_COLUMN: str = NodeAttrKey.nid.value
+
+CSR_ARRAY_NAMES = ["nid", "ntype_code", "indptr", "indices", "etype_code"]
+
+
+@dataclass
+class CSRGraphMeta:
+    directed: bool
+    num_nodes: int
+    num_edges: int  # Stored adjacency entries, i.e. twice the edges if undirected
+    ntypes: List[str]  # Indexed by ntype_code
+    etypes: List[str]  # Indexed by etype_code
+
+
+decode_csr_graph_meta = compile_decoder(data_class=CSRGraphMeta)
+
+
+class CSRGraph:
+    """Graph with integer node ids stored as compressed sparse row adjacency
+    arrays. Node i has id nid[i] and type ntypes[ntype_code[i]], and its out
+    edges lead to nodes indices[indptr[i]:indptr[i + 1]] with types etypes of
+    etype_code over the same slice. Undirected graphs store both directions.
+    Other node attributes are held in one dataframe per node type with a nid
+    column, so that arrays can be memory-mapped and nothing is materialised
+    per node until asked for"""
+
+    def __init__(
+        self,
+        meta: CSRGraphMeta,
+        nid: np.ndarray,
+        ntype_code: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        etype_code: np.ndarray,
+        ntype_to_df: Dict[str, DataFrame],
+    ) -> None:
+        self.meta = meta
+        self.nid = nid  # Sorted so that node indices are found by bisection
+        self.ntype_code = ntype_code
+        self.indptr = indptr
+        self.indices = indices
+        self.etype_code = etype_code
+        self.ntype_to_df = ntype_to_df
+
+        self._ntype_to_row_nid: Dict[str, np.ndarray] = {}
+
+    def number_of_nodes(self) -> int:
+        return self.meta.num_nodes
+
+    def number_of_edges(self) -> int:
+        num_edges = self.meta.num_edges
+
+        return num_edges if self.meta.directed else num_edges // 2
+
+    def node_index(self, nid: int) -> int:
+        i = int(np.searchsorted(self.nid, nid))
+        if i == len(self.nid) or self.nid[i] != nid:
+            raise KeyError(f"Node {nid} is not in the graph")
+
+        return i
+
+    def ntype(self, nid: int) -> str:
+        ntype: str = self.meta.ntypes[self.ntype_code[self.node_index(nid=nid)]]
+
+        return ntype
+
+    def successors(self, nid: int) -> np.ndarray:
+        i = self.node_index(nid=nid)
+        successor_nid: np.ndarray = self.nid[
+            self.indices[self.indptr[i] : self.indptr[i + 1]]
+        ]
+
+        return successor_nid
+
+    def out_etypes(self, nid: int) -> List[str]:
+        """Types of out edges of a node in the order of its successors"""
+        i = self.node_index(nid=nid)
+
+        return [
+            self.meta.etypes[code]
+            for code in self.etype_code[self.indptr[i] : self.indptr[i + 1]]
+        ]
+
+    def node_attrs(self, nid: int) -> Dict[str, Any]:
+        ntype = self.ntype(nid=nid)
+        df = self.ntype_to_df[ntype]
+
+        if ntype not in self._ntype_to_row_nid:
+            self._ntype_to_row_nid[ntype] = df[NID_COLUMN].to_numpy()
+        row_nid = self._ntype_to_row_nid[ntype]
+
+        # Rows are saved in ascending node id order within each node type
+        row = int(np.searchsorted(row_nid, nid))
+        attrs: Dict[str, Any] = {
+            str(k): v for k, v in df.iloc[row].drop(NID_COLUMN).items()
+        }
+
+        return attrs
+
+    def to_networkx(self) -> Graph:
+        nx_g = nx.DiGraph() if self.meta.directed else nx.Graph()
+
+        for df in self.ntype_to_df.values():
+            attr_columns = [column for column in df.columns if column != NID_COLUMN]
+            list_attrs = [
+                dict(zip(attr_columns, values))
+                for values in zip(*(df[column].tolist() for column in attr_columns))
+            ]
+            nx_g.add_nodes_from(zip(df[NID_COLUMN].tolist(), list_attrs))
+
+        src_index = np.repeat(np.arange(self.meta.num_nodes), np.diff(self.indptr))
+        etypes = self.meta.etypes
+        nx_g.add_edges_from(
+            (u, v, {ETYPE_ATTR_KEY: etypes[code]})
+            for u, v, code in zip(
+                self.nid[src_index].tolist(),
+                self.nid[self.indices].tolist(),
+                self.etype_code.tolist(),
+            )
+        )
+
+        logger.info(
+            f"Materialised a {type(nx_g)} object with {nx_g.number_of_nodes()} "
+            f"nodes and {nx_g.number_of_edges()} edges"
+        )
+
+        return nx_g
+
+    @classmethod
+    def from_networkx(cls, nx_g: Graph) -> CSRGraph:
+        """Requires integer node ids, an ntype attribute on every node and no
+        edge attributes other than etype"""
+        list_nid: List[int] = []
+        ntype_to_records: Dict[str, List[Dict[str, Any]]] = {}
+        for nid, attrs in nx_g.nodes(data=True):
+            if not isinstance(nid, (int, np.integer)):
+                raise ValueError(f"Node id {nid!r} is not an integer")
+            if NTYPE_ATTR_KEY not in attrs:
+                raise ValueError(f"Node {nid} does not have a {NTYPE_ATTR_KEY}")
+
+            list_nid.append(int(nid))
+            ntype_to_records.setdefault(attrs[NTYPE_ATTR_KEY], []).append(
+                {NID_COLUMN: int(nid), **attrs}
+            )
+
+        ntypes = list(ntype_to_records)
+        ntype_to_df = {
+            ntype: DataFrame.from_records(records)
+            .sort_values(NID_COLUMN)
+            .reset_index(drop=True)
+            for ntype, records in ntype_to_records.items()
+        }
+
+        nid = np.sort(np.array(list_nid, dtype=np.int64))
+        ntype_code = np.empty(len(nid), dtype=np.int16)
+        for code, ntype in enumerate(ntypes):
+            ntype_code[
+                np.searchsorted(nid, ntype_to_df[ntype][NID_COLUMN].to_numpy())
+            ] = code
+
+        list_u: List[int] = []
+        list_v: List[int] = []
+        list_etype: List[str] = []
+        for u, v, attrs in nx_g.edges(data=True):
+            if set(attrs) != {ETYPE_ATTR_KEY}:
+                raise ValueError(
+                    f"Edge ({u}, {v}) has attributes {list(attrs)} instead of "
+                    f"only {ETYPE_ATTR_KEY}"
+                )
+            list_u.append(u)
+            list_v.append(v)
+            list_etype.append(attrs[ETYPE_ATTR_KEY])
+
+        etypes = list(dict.fromkeys(list_etype))
+        etype_to_code = {etype: code for code, etype in enumerate(etypes)}
+        u_index = np.searchsorted(nid, np.array(list_u, dtype=np.int64))
+        v_index = np.searchsorted(nid, np.array(list_v, dtype=np.int64))
+        etype_code = np.array(
+            [etype_to_code[etype] for etype in list_etype], dtype=np.int16
+        )
+
+        directed = nx_g.is_directed()
+        if not directed:
+            u_index, v_index = (
+                np.concatenate([u_index, v_index]),
+                np.concatenate([v_index, u_index]),
+            )
+            etype_code = np.concatenate([etype_code, etype_code])
+
+        indptr, indices, etype_code = build_csr_arrays(
+            num_nodes=len(nid), u_index=u_index, v_index=v_index, etype_code=etype_code
+        )
+
+        meta = CSRGraphMeta(
+            directed=directed,
+            num_nodes=len(nid),
+            num_edges=len(indices),
+            ntypes=ntypes,
+            etypes=etypes,
+        )
+
+        return cls(
+            meta=meta,
+            nid=nid,
+            ntype_code=ntype_code,
+            indptr=indptr,
+            indices=indices,
+            etype_code=etype_code,
+            ntype_to_df=ntype_to_df,
+        )
+
+
+def build_csr_arrays(
+    num_nodes: int,
+    u_index: np.ndarray,
+    v_index: np.ndarray,
+    etype_code: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorts edges given as node index pairs by source then destination and
+    returns indptr, indices and etype codes in that order"""
+    order = np.lexsort((v_index, u_index))
+
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(u_index, minlength=num_nodes), out=indptr[1:])
+
+    return indptr, v_index[order].astype(np.int64), etype_code[order]
+
+
+class CSRGraphDataInterface:
+    """Stores a CSRGraph as a directory of .npy arrays, a json meta file and an
+    Arrow IPC directory of node attribute dataframes. With memory_map, arrays
+    and numeric attribute columns are loaded as read-only memory maps"""
+
+    def __init__(self, dirpath: Path, memory_map: bool = False) -> None:
+        self.dirpath = dirpath
+        self.memory_map = memory_map
+
+    @staticmethod
+    def path_meta(dirpath: Path) -> Path:
+        return dirpath / "meta.json"
+
+    @staticmethod
+    def path_dir_node_attrs(dirpath: Path) -> Path:
+        return dirpath / "node_attrs.arrow"
+
+    def save(self, csr_graph: CSRGraph) -> None:
+        if not self.dirpath.parent.exists():
+            logger.info(f"Creating {self.dirpath.parent} because it does not yet exist")
+            self.dirpath.parent.mkdir(parents=True, exist_ok=True)
+
+        # The whole directory is replaced so that readers never see a mix
+        path_partial = self.dirpath.with_name(f"{self.dirpath.name}.partial")
+        remove_path(path_partial)
+        path_partial.mkdir()
+
+        for array_name in CSR_ARRAY_NAMES:
+            np.save(path_partial / f"{array_name}.npy", getattr(csr_graph, array_name))
+
+        ColumnarDFsDataInterface(
+            dirpath=self.path_dir_node_attrs(dirpath=path_partial),
+            storage_format=DFStorageFormat.arrow,
+        ).save(named_dfs=csr_graph.ntype_to_df)
+
+        with open(self.path_meta(dirpath=path_partial), "wb") as f:
+            f.write(orjson.dumps(csr_graph.meta, option=orjson.OPT_INDENT_2))
+
+        remove_path(self.dirpath)
+        path_partial.replace(self.dirpath)
+
+        logger.info(f"Saved a {type(csr_graph)} object to {self.dirpath}")
+
+    def load(self) -> CSRGraph:
+        with open(self.path_meta(dirpath=self.dirpath), "rb") as f:
+            meta = decode_csr_graph_meta(orjson.loads(f.read()))
+
+        mmap_mode: Optional[Literal["r"]] = "r" if self.memory_map else None
+        arrays: Dict[str, np.ndarray] = {
+            array_name: np.load(self.dirpath / f"{array_name}.npy", mmap_mode=mmap_mode)
+            for array_name in CSR_ARRAY_NAMES
+        }
+
+        ntype_to_df = ColumnarDFsDataInterface(
+            dirpath=self.path_dir_node_attrs(dirpath=self.dirpath),
+            storage_format=DFStorageFormat.arrow,
+            memory_map=self.memory_map,
+        ).load()
+
+        csr_graph = CSRGraph(meta=meta, ntype_to_df=ntype_to_df, **arrays)
+
+        logger.info(
+            f"Loaded a {type(csr_graph)} object with {meta.num_nodes} nodes "
+            f"from {self.dirpath}"
+        )
+
+        return csr_graph
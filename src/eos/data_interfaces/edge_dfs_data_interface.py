@@ -4,21 +4,35 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
 
-import dacite
+import numpy as np
 import orjson
+import pandas as pd
 from pandas import DataFrame
 
+from eos.data_interfaces.columnar_dfs_data_interface import (
+    ColumnarDFsDataInterface,
+    DFStorageFormat,
+    project_named_dfs,
+    validate_projected_columns,
+)
+from eos.data_interfaces.node_dfs_data_interface import NodeType
 from eos.nodes.utils_df_serialisation import default, df_type_hook
+from eos.nodes.utils_dtypes import compact_df
+from eos.nodes.utils_schema_decoding import compile_decoder
+from eos.nodes.utils_validation import ValidationLevel, resolve_validation_level
 
 logger = logging.getLogger(__name__)
 
 
 class EdgeAttrKey(str, Enum):
-    eid = "eid"
+    src = "src"  # Source node id
+    dst = "dst"  # Destination node id
     etype = "etype"
 
+    eid = "eid"  # Legacy column of (src, dst) tuples
+
 
 class EdgeType(str, Enum):
     theme_to_sector = "ThemeToSector"
@@ -28,17 +42,40 @@ class EdgeType(str, Enum):
     industry_to_sector = "IndustryToSector"
 
 
+# Node types of source and destination nodes of each edge type
+ETYPE_TO_ENDPOINT_NTYPES: Dict[EdgeType, Tuple[NodeType, NodeType]] = {
+    EdgeType.theme_to_sector: (NodeType.theme, NodeType.sector),
+    EdgeType.theme_to_sub_industry: (NodeType.theme, NodeType.sub_industry),
+    EdgeType.sub_industry_to_industry: (NodeType.sub_industry, NodeType.industry),
+    EdgeType.industry_to_sector: (NodeType.industry, NodeType.sector),
+}
+
+
 @dataclass
 class EdgeDF:
     etype: EdgeType
     df: DataFrame
 
 
+def compact_edge_df(df: DataFrame) -> DataFrame:
+    """Holds edge types as EdgeType coded categoricals rather than one python
+    string object per row"""
+    return compact_df(
+        df=df, enum_columns={EdgeAttrKey.etype.value: EdgeType}, text_columns=[]
+    )
+
+
 @dataclass
 class EdgeDFs:
     members: List[EdgeDF]
 
-    def validate(self) -> None:
+    def validate(self, level: Optional[ValidationLevel] = None) -> None:
+        """Checks edge types are unique, to an extent set by level or by the
+        EOS_VALIDATION_LEVEL environment variable"""
+        level = resolve_validation_level(level=level)
+        if level == ValidationLevel.off:
+            return
+
         list_etype: List[EdgeType] = [edge_df.etype for edge_df in self.members]
         set_etype: Set[EdgeType] = {edge_df.etype for edge_df in self.members}
 
@@ -48,6 +85,33 @@ class EdgeDFs:
                 f"edge types are not unique:\n{list_etype}"
             )
 
+        if level == ValidationLevel.full:
+            for edge_df in self.members:
+                df = edge_df.df
+                for column in [EdgeAttrKey.src.value, EdgeAttrKey.dst.value]:
+                    if not pd.api.types.is_integer_dtype(df[column].dtype):
+                        raise ValueError(
+                            f"Column {column} of {edge_df.etype.value} edge "
+                            f"dataframe is of {df[column].dtype} rather than an "
+                            "integer type"
+                        )
+
+                if EdgeAttrKey.etype.value in df.columns:
+                    foreign_etype = np.unique(
+                        df[EdgeAttrKey.etype.value].to_numpy(dtype=object)
+                    )
+                    foreign_etype = foreign_etype[foreign_etype != edge_df.etype.value]
+                    if len(foreign_etype) > 0:
+                        raise ValueError(
+                            f"{edge_df.etype.value} edge dataframe contains edges "
+                            f"of types {foreign_etype.tolist()}"
+                        )
+
+    def compact(self) -> None:
+        """Replaces member dataframes with ones of compact column dtypes"""
+        for edge_df in self.members:
+            edge_df.df = compact_edge_df(df=edge_df.df)
+
     def to_dict(self) -> Dict[EdgeType, DataFrame]:
         etype_to_df: Dict[EdgeType, DataFrame] = {
             edge_df.etype: edge_df.df for edge_df in self.members
@@ -55,12 +119,162 @@ class EdgeDFs:
 
         return etype_to_df
 
+    @property
+    def etypes(self) -> List[EdgeType]:
+        return [edge_df.etype for edge_df in self.members]
+
+
+# Compiled once at import and shared by every load
+decode_edge_dfs = compile_decoder(
+    data_class=EdgeDFs, type_hooks={DataFrame: df_type_hook}
+)
+
+
+# Legacy columns upgraded by upgrade_legacy_eid_columns
+LEGACY_EID_U_COLUMN = f"{EdgeAttrKey.eid.value}_u"
+LEGACY_EID_V_COLUMN = f"{EdgeAttrKey.eid.value}_v"
+LEGACY_EID_COLUMNS = [EdgeAttrKey.eid.value, LEGACY_EID_U_COLUMN, LEGACY_EID_V_COLUMN]
+
+
+def eid_array(df: DataFrame) -> np.ndarray:
+    """Returns edge ids as an integer array shaped (n_edges, 2)"""
+    return df[[EdgeAttrKey.src.value, EdgeAttrKey.dst.value]].to_numpy(dtype=np.int64)
+
+
+def upgrade_legacy_eid_columns(df: DataFrame) -> DataFrame:
+    """Compatibility shim for artifacts which stored edge ids as a column of
+    (u, v) pairs or as a pair of eid_u and eid_v columns"""
+    if EdgeAttrKey.eid.value in df.columns:
+        legacy_columns = [EdgeAttrKey.eid.value]
+        eid = np.array(df[EdgeAttrKey.eid.value].tolist(), dtype=np.int64)
+        eid = eid.reshape(-1, 2)
+    elif LEGACY_EID_U_COLUMN in df.columns:
+        legacy_columns = [LEGACY_EID_U_COLUMN, LEGACY_EID_V_COLUMN]
+        eid = df[legacy_columns].to_numpy(dtype=np.int64)
+    else:
+        return df
+
+    i_eid = df.columns.tolist().index(legacy_columns[0])
+
+    df_upgraded = df.drop(columns=legacy_columns)
+    df_upgraded.insert(i_eid, EdgeAttrKey.src.value, eid[:, 0])
+    df_upgraded.insert(i_eid + 1, EdgeAttrKey.dst.value, eid[:, 1])
+
+    logger.info(f"Upgraded legacy edge id columns {legacy_columns} to src and dst")
+
+    return df_upgraded
+
 
 class EdgeDFsDataInterface:
-    def __init__(self, filepath: Path) -> None:
+    """Picks a storage backend from the suffix of filepath: ".json" for a single
+    json document, ".parquet" or ".arrow" for a directory of columnar files.
+    With memory_map, numeric columns loaded from ".arrow" directories are
+    read-only views of memory-mapped files"""
+
+    def __init__(self, filepath: Path, memory_map: bool = False) -> None:
         self.filepath = filepath
+        self.storage_format = DFStorageFormat.from_filepath(filepath=filepath)
+        self.memory_map = memory_map
 
     def save(self, edge_dfs: EdgeDFs) -> None:
+        if self.storage_format == DFStorageFormat.json:
+            self._save_json(edge_dfs=edge_dfs)
+        else:
+            self._save_columnar(edge_dfs=edge_dfs)
+
+    def save_partial(self, edge_dfs: EdgeDFs, path_base: Optional[Path] = None) -> None:
+        """Writes only members of edge_dfs and keeps all other edge type
+        dataframes stored at path_base, which defaults to filepath"""
+        base_data_interface = EdgeDFsDataInterface(
+            filepath=self.filepath if path_base is None else path_base
+        )
+
+        if (
+            self.storage_format != DFStorageFormat.json
+            and base_data_interface.storage_format == self.storage_format
+        ):
+            columnar_dfs_data_interface = ColumnarDFsDataInterface(
+                dirpath=self.filepath, storage_format=self.storage_format
+            )
+            columnar_dfs_data_interface.save_partial(
+                named_dfs={
+                    edge_df.etype.value: edge_df.df for edge_df in edge_dfs.members
+                },
+                base=ColumnarDFsDataInterface(
+                    dirpath=base_data_interface.filepath,
+                    storage_format=self.storage_format,
+                ),
+            )
+
+            logger.info(
+                f"Saved {edge_dfs.etypes} of a {type(edge_dfs)} type object "
+                f"to {self.filepath}"
+            )
+        else:
+            # A single json document or a change of format is always rewritten
+            etype_to_df = base_data_interface.load().to_dict()
+            etype_to_df.update(edge_dfs.to_dict())
+
+            self.save(
+                edge_dfs=EdgeDFs(
+                    members=[
+                        EdgeDF(etype=etype, df=df) for etype, df in etype_to_df.items()
+                    ]
+                )
+            )
+
+    def load(
+        self,
+        etypes: Optional[List[EdgeType]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> EdgeDFs:
+        """Loads only dataframes of etypes and, within each of them, those of
+        columns it has. Columnar backends skip reading everything else"""
+        names = None if etypes is None else [etype.value for etype in etypes]
+
+        if self.storage_format == DFStorageFormat.json:
+            edge_dfs = self._load_json()
+            if names is None and columns is None:
+                edge_dfs.compact()
+                return edge_dfs
+            named_dfs = project_named_dfs(
+                named_dfs={
+                    edge_df.etype.value: edge_df.df for edge_df in edge_dfs.members
+                },
+                names=names,
+                columns=columns,
+            )
+        else:
+            # Legacy edge id columns are read too in case they hold src and dst
+            named_dfs = self._load_columnar(
+                names=names,
+                columns=None if columns is None else columns + LEGACY_EID_COLUMNS,
+            )
+            named_dfs = {
+                etype: upgrade_legacy_eid_columns(df=df)
+                for etype, df in named_dfs.items()
+            }
+            if columns is not None:
+                named_dfs = project_named_dfs(named_dfs=named_dfs, columns=columns)
+
+        if columns is not None:
+            validate_projected_columns(named_dfs=named_dfs, columns=columns)
+
+        edge_dfs = EdgeDFs(
+            members=[
+                EdgeDF(etype=EdgeType(etype), df=df) for etype, df in named_dfs.items()
+            ]
+        )
+        # Also normalises artifacts saved before compact dtypes were adopted
+        edge_dfs.compact()
+
+        logger.info(
+            f"Loaded {edge_dfs.etypes} of a {type(edge_dfs)} object from {self.filepath}"
+        )
+
+        return edge_dfs
+
+    def _save_json(self, edge_dfs: EdgeDFs) -> None:
         if not self.filepath.parent.exists():
             logger.info(
                 f"Creating {self.filepath.parent} because it does not yet exist"
@@ -75,17 +289,35 @@ class EdgeDFsDataInterface:
 
             logger.info(f"Saved a {type(edge_dfs)} type object to {self.filepath}")
 
-    def load(self) -> EdgeDFs:
+    def _load_json(self) -> EdgeDFs:
         with open(self.filepath, "rb") as f:
             json_data = orjson.loads(f.read())
-            edge_dfs = dacite.from_dict(
-                data_class=EdgeDFs,
-                data=json_data,
-                config=dacite.Config(
-                    type_hooks={DataFrame: df_type_hook}, cast=[EdgeType]
-                ),
-            )
+            edge_dfs = decode_edge_dfs(json_data)
+            for edge_df in edge_dfs.members:
+                edge_df.df = upgrade_legacy_eid_columns(df=edge_df.df)
 
             logger.info(f"Loaded a {type(edge_dfs)} object from {self.filepath}")
 
             return edge_dfs
+
+    def _save_columnar(self, edge_dfs: EdgeDFs) -> None:
+        columnar_dfs_data_interface = ColumnarDFsDataInterface(
+            dirpath=self.filepath, storage_format=self.storage_format
+        )
+        columnar_dfs_data_interface.save(
+            named_dfs={edge_df.etype.value: edge_df.df for edge_df in edge_dfs.members}
+        )
+
+        logger.info(f"Saved a {type(edge_dfs)} type object to {self.filepath}")
+
+    def _load_columnar(
+        self, names: Optional[List[str]], columns: Optional[List[str]]
+    ) -> Dict[str, DataFrame]:
+        columnar_dfs_data_interface = ColumnarDFsDataInterface(
+            dirpath=self.filepath,
+            storage_format=self.storage_format,
+            memory_map=self.memory_map,
+        )
+        named_dfs = columnar_dfs_data_interface.load(names=names, columns=columns)
+
+        return named_dfs
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DTYPE = np.dtype(np.float32)
+
+
+class EmbeddingCacheDataInterface:
+    """Stores text embeddings in a SQLite table keyed by a model key and a
+    digest of the text, each vector as a float32 blob. Lookups and writes are
+    done in bulk through a temporary table rather than one query per text"""
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def connect(self) -> sqlite3.Connection:
+        if not self.filepath.parent.exists():
+            logger.info(
+                f"Creating {self.filepath.parent} because it does not yet exist"
+            )
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        connection = sqlite3.connect(self.filepath)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embedding ("
+            "model_key TEXT NOT NULL, "
+            "text_digest BLOB NOT NULL, "
+            "vector BLOB NOT NULL, "
+            "PRIMARY KEY (model_key, text_digest)"
+            ") WITHOUT ROWID"
+        )
+
+        return connection
+
+    def load(
+        self, model_key: str, text_digests: List[bytes]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns a boolean mask of text digests found and their vectors
+        stacked in the order of text digests found"""
+        with closing(self.connect()) as connection:
+            connection.execute(
+                "CREATE TEMP TABLE query (i INTEGER PRIMARY KEY, text_digest BLOB)"
+            )
+            connection.executemany(
+                "INSERT INTO query VALUES (?, ?)", enumerate(text_digests)
+            )
+            rows: List[Tuple[int, bytes]] = connection.execute(
+                "SELECT query.i, embedding.vector FROM query "
+                "JOIN embedding ON embedding.text_digest = query.text_digest "
+                "WHERE embedding.model_key = ? ORDER BY query.i",
+                (model_key,),
+            ).fetchall()
+
+        is_found = np.zeros(len(text_digests), dtype=bool)
+        if len(rows) == 0:
+            return is_found, np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+
+        is_found[[i for i, _ in rows]] = True
+        vectors = np.frombuffer(
+            b"".join(vector for _, vector in rows), dtype=EMBEDDING_DTYPE
+        ).reshape(len(rows), -1)
+
+        logger.info(
+            f"Found {len(rows)} of {len(text_digests)} embeddings of model "
+            f"{model_key} in {self.filepath}"
+        )
+
+        return is_found, vectors
+
+    def save(
+        self, model_key: str, text_digests: List[bytes], vectors: np.ndarray
+    ) -> None:
+        if len(text_digests) != len(vectors):
+            raise ValueError(
+                f"{len(text_digests)} text digests do not match "
+                f"{len(vectors)} vectors"
+            )
+
+        vectors = np.ascontiguousarray(vectors, dtype=EMBEDDING_DTYPE)
+        with closing(self.connect()) as connection, connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embedding VALUES (?, ?, ?)",
+                (
+                    (model_key, text_digest, vector.tobytes())
+                    for text_digest, vector in zip(text_digests, vectors)
+                ),
+            )
+
+        logger.info(
+            f"Saved {len(text_digests)} embeddings of model {model_key} "
+            f"to {self.filepath}"
+        )
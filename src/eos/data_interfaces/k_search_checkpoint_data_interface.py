@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from eos.nodes.utils_schema_decoding import compile_decoder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class KCandidate:
+    n_clusters: int
+    score: float
+
+
+@dataclass
+class KSearchCheckpoint:
+    search_key: str  # Identifies the encoding and settings searched over
+    candidates: List[KCandidate]  # Candidates evaluated so far
+    best_n_clusters: int  # Candidate whose labels are saved next to the record
+
+
+decode_k_search_checkpoint = compile_decoder(data_class=KSearchCheckpoint)
+
+
+class KSearchCheckpointDataInterface:
+    """Directory of searches over numbers of clusters in progress, each saved
+    as a json record of candidates evaluated so far and the labels of the
+    best of them, under the key of the search"""
+
+    def __init__(self, dirpath: Path) -> None:
+        self.dirpath = dirpath
+
+    def path_checkpoint(self, search_key: str) -> Path:
+        return self.dirpath / f"{search_key}.json"
+
+    def path_best_labels(self, search_key: str) -> Path:
+        return self.dirpath / f"{search_key}.labels.npy"
+
+    def save(self, checkpoint: KSearchCheckpoint, best_labels: np.ndarray) -> None:
+        """Labels are only rewritten if the best candidate changed. Both files
+        are replaced atomically and labels first, so that a record never
+        refers to labels which are not saved"""
+        if not self.dirpath.exists():
+            logger.info(f"Creating {self.dirpath} because it does not yet exist")
+            self.dirpath.mkdir(parents=True, exist_ok=True)
+
+        path_checkpoint = self.path_checkpoint(search_key=checkpoint.search_key)
+        path_best_labels = self.path_best_labels(search_key=checkpoint.search_key)
+
+        previous = self.load_checkpoint(search_key=checkpoint.search_key)
+        if previous is None or previous.best_n_clusters != checkpoint.best_n_clusters:
+            path_partial = path_best_labels.with_name(
+                f"{path_best_labels.name}.partial"
+            )
+            with open(path_partial, "wb") as f:
+                np.save(f, best_labels)
+            path_partial.replace(path_best_labels)
+
+        path_partial = path_checkpoint.with_name(f"{path_checkpoint.name}.partial")
+        with open(path_partial, "wb") as f:
+            f.write(orjson.dumps(checkpoint))
+        path_partial.replace(path_checkpoint)
+
+    def load_checkpoint(self, search_key: str) -> Optional[KSearchCheckpoint]:
+        path_checkpoint = self.path_checkpoint(search_key=search_key)
+        if not path_checkpoint.is_file():
+            return None
+
+        with open(path_checkpoint, "rb") as f:
+            checkpoint = decode_k_search_checkpoint(orjson.loads(f.read()))
+
+        return checkpoint
+
+    def load(self, search_key: str) -> Optional[Tuple[KSearchCheckpoint, np.ndarray]]:
+        """Returns None if no search under search_key has been checkpointed"""
+        checkpoint = self.load_checkpoint(search_key=search_key)
+        if checkpoint is None:
+            return None
+
+        best_labels: np.ndarray = np.load(self.path_best_labels(search_key=search_key))
+
+        logger.info(
+            f"Loaded {len(checkpoint.candidates)} evaluated candidates of search "
+            f"{search_key} from {self.dirpath}"
+        )
+
+        return checkpoint, best_labels
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Tuple
 
-import dacite
+import numpy as np
 import orjson
+import pandas as pd
 from pandas import DataFrame
 
+from eos.data_interfaces.columnar_dfs_data_interface import (
+    ColumnarDFsDataInterface,
+    DFStorageFormat,
+    project_named_dfs,
+    validate_projected_columns,
+)
 from eos.nodes.utils_df_serialisation import default, df_type_hook
+from eos.nodes.utils_dtypes import compact_df
+from eos.nodes.utils_schema_decoding import compile_decoder
+from eos.nodes.utils_validation import (
+    ValidationLevel,
+    format_ids,
+    resolve_validation_level,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,17 +47,111 @@ class NodeType(str, Enum):
     industry = "Industry"
 
 
+# Free text columns held as Arrow-backed strings
+NODE_TEXT_COLUMNS: List[str] = [
+    NodeAttrKey.theme.value,
+    NodeAttrKey.description.value,
+    NodeAttrKey.sector.value,
+]
+
+
 @dataclass
 class NodeDF:
     ntype: NodeType
     df: DataFrame
 
 
+def compact_node_df(df: DataFrame) -> DataFrame:
+    """Holds node types as NodeType coded categoricals and text as Arrow-backed
+    strings rather than one python string object per row"""
+    return compact_df(
+        df=df,
+        enum_columns={NodeAttrKey.ntype.value: NodeType},
+        text_columns=NODE_TEXT_COLUMNS,
+    )
+
+
+@dataclass
+class NidIndex:
+    """Node ids of all members sorted, each with the position of its member
+    and its row within the member's dataframe"""
+
+    sorted_nid: np.ndarray
+    member: np.ndarray
+    row: np.ndarray
+
+    @classmethod
+    def from_members(cls, members: List[NodeDF]) -> NidIndex:
+        list_nid = [node_df.df[NodeAttrKey.nid.value].to_numpy() for node_df in members]
+        nid = np.concatenate(list_nid + [np.empty(0, dtype=np.int64)])
+        member = np.repeat(
+            np.arange(len(members), dtype=np.int32),
+            [len(member_nid) for member_nid in list_nid],
+        )
+        row = np.concatenate(
+            [np.arange(len(member_nid)) for member_nid in list_nid]
+            + [np.empty(0, dtype=np.int64)]
+        )
+
+        order = np.argsort(nid, kind="stable")
+
+        return cls(sorted_nid=nid[order], member=member[order], row=row[order])
+
+    def duplicates(self) -> np.ndarray:
+        is_repeat = self.sorted_nid[1:] == self.sorted_nid[:-1]
+        duplicate_nid: np.ndarray = np.unique(self.sorted_nid[1:][is_repeat])
+
+        return duplicate_nid
+
+    def locate(self, nid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns member positions and rows of node ids by bisection"""
+        nid = np.asarray(nid)
+        if len(self.sorted_nid) == 0:
+            is_missing = np.ones(len(nid), dtype=bool)
+            i_clipped = np.zeros(len(nid), dtype=np.int64)
+        else:
+            i = np.searchsorted(self.sorted_nid, nid)
+            i_clipped = np.minimum(i, len(self.sorted_nid) - 1)
+            is_missing = self.sorted_nid[i_clipped] != nid
+
+        if np.any(is_missing):
+            raise KeyError(
+                f"Node ids {format_ids(ids=np.unique(nid[is_missing]))} "
+                "do not exist in node dataframes"
+            )
+
+        return self.member[i_clipped], self.row[i_clipped]
+
+
 @dataclass
 class NodeDFs:
     members: List[NodeDF]
 
-    def validate(self) -> None:
+    # Caches which are neither decoded nor serialised, keyed on a version of
+    # members bumped when members is reassigned or changed by append, replace,
+    # compact or invalidate. Members or member dataframes changed otherwise,
+    # such as by list item assignment, require invalidate to be called
+    _members_version: int = field(default=0, init=False, repr=False, compare=False)
+    _max_allocated_nid: int = field(default=-1, init=False, repr=False, compare=False)
+    _max_nid: Optional[Tuple[int, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _nid_index: Optional[Tuple[int, NidIndex]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name: str, value: object) -> None:
+        super().__setattr__(name, value)
+        if name == "members":
+            self.invalidate()
+
+    def validate(self, level: Optional[ValidationLevel] = None) -> None:
+        """Checks node types and node ids are unique, to an extent set by level
+        or by the EOS_VALIDATION_LEVEL environment variable"""
+        level = resolve_validation_level(level=level)
+        if level == ValidationLevel.off:
+            return
+
         list_ntype: List[NodeType] = [node_df.ntype for node_df in self.members]
         set_ntype: Set[NodeType] = {node_df.ntype for node_df in self.members}
 
@@ -53,19 +161,117 @@ class NodeDFs:
                 f"node types are not unique:\n{list_ntype}"
             )
 
-        list_nid: List[int] = []
-        set_nid: Set[int] = set()
-        for node_df in self.members:
-            df = node_df.df
-            list_nid.extend(df[NodeAttrKey.nid.value].tolist())
-            set_nid = set_nid | set(df[NodeAttrKey.nid.value])
+        if level == ValidationLevel.full:
+            for node_df in self.members:
+                dtype = node_df.df[NodeAttrKey.nid.value].dtype
+                if not pd.api.types.is_integer_dtype(dtype):
+                    raise ValueError(
+                        f"Node ids of {node_df.ntype.value} node dataframe are "
+                        f"of {dtype} rather than an integer type"
+                    )
+
+        duplicate_nid = self.nid_index().duplicates()
+        if len(duplicate_nid) > 0:
+            raise ValueError(
+                f"Node ids {format_ids(ids=duplicate_nid)} are not unique within "
+                f"dataframes in {self.__class__.__name__} object"
+            )
+
+    def nid_array(self) -> np.ndarray:
+        """Returns node ids of all members concatenated in member order"""
+        return np.concatenate(
+            [node_df.df[NodeAttrKey.nid.value].to_numpy() for node_df in self.members]
+            + [np.empty(0, dtype=np.int64)]
+        )
+
+    def append(self, node_df: NodeDF) -> None:
+        """Adds a member and raises the node id high water mark past its ids"""
+        max_nid = self._max_nid
+        if max_nid is not None and max_nid[0] != self._members_version:
+            max_nid = None
+        self.members.append(node_df)
+        self.invalidate()
+
+        if max_nid is not None:
+            member_nid = node_df.df[NodeAttrKey.nid.value].to_numpy()
+            self._max_nid = (
+                self._members_version,
+                max(max_nid[1], int(member_nid.max(initial=-1))),
+            )
 
-        if len(set_nid) != len(list_nid):
+    def replace(self, node_df: NodeDF) -> None:
+        """Replaces the member of the node type of node_df"""
+        ntypes = self.ntypes
+        if node_df.ntype not in ntypes:
             raise ValueError(
-                "Node ids are not unique within dataframes in "
+                f"No {node_df.ntype.value} node dataframe to replace in "
                 f"{self.__class__.__name__} object"
             )
 
+        self.members[ntypes.index(node_df.ntype)] = node_df
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drops caches of node ids, which are rebuilt on next use"""
+        self._members_version = getattr(self, "_members_version", 0) + 1
+        self._max_nid = None
+        self._nid_index = None
+
+    def max_nid(self) -> int:
+        """Returns the high water mark of node ids held or allocated, or -1"""
+        if self._max_nid is None or self._max_nid[0] != self._members_version:
+            self._max_nid = (
+                self._members_version,
+                int(self.nid_array().max(initial=-1)),
+            )
+
+        return max(self._max_nid[1], self._max_allocated_nid)
+
+    def allocate_nid(self, num: int) -> int:
+        """Reserves num consecutive node ids above every id held or allocated
+        so far and returns the first of them"""
+        first_nid = self.max_nid() + 1
+        self._max_allocated_nid = first_nid + num - 1
+
+        return first_nid
+
+    def nid_index(self) -> NidIndex:
+        if self._nid_index is None or self._nid_index[0] != self._members_version:
+            self._nid_index = (
+                self._members_version,
+                NidIndex.from_members(members=self.members),
+            )
+
+        return self._nid_index[1]
+
+    def attr_val(self, nid: np.ndarray, attr_key: NodeAttrKey) -> np.ndarray:
+        """Returns values of an attribute in the order of node ids, which may
+        be of any node types having the attribute"""
+        member, row = self.nid_index().locate(nid=nid)
+        unique_member = np.unique(member).tolist()
+
+        # Attribute values of a single node type keep their dtype
+        if len(unique_member) == 1:
+            single_attr_val: np.ndarray = (
+                self.members[unique_member[0]].df[attr_key.value].to_numpy()[row]
+            )
+            return single_attr_val
+
+        attr_val = np.empty(len(nid), dtype=object)
+        for i in unique_member:
+            is_member = member == i
+            attr_val[is_member] = (
+                self.members[i].df[attr_key.value].to_numpy()[row[is_member]]
+            )
+
+        return attr_val
+
+    def compact(self) -> None:
+        """Replaces member dataframes with ones of compact column dtypes"""
+        for node_df in self.members:
+            node_df.df = compact_node_df(df=node_df.df)
+        self.invalidate()
+
     def to_dict(self) -> Dict[NodeType, DataFrame]:
         ntype_to_df: Dict[NodeType, DataFrame] = {
             node_df.ntype: node_df.df for node_df in self.members
@@ -78,11 +284,112 @@ class NodeDFs:
         return [node_df.ntype for node_df in self.members]
 
 
+# Compiled once at import and shared by every load
+decode_node_dfs = compile_decoder(
+    data_class=NodeDFs, type_hooks={DataFrame: df_type_hook}
+)
+
+
 class NodeDFsDataInterface:
-    def __init__(self, filepath: Path) -> None:
+    """Picks a storage backend from the suffix of filepath: ".json" for a single
+    json document, ".parquet" or ".arrow" for a directory of columnar files.
+    With memory_map, numeric columns loaded from ".arrow" directories are
+    read-only views of memory-mapped files"""
+
+    def __init__(self, filepath: Path, memory_map: bool = False) -> None:
         self.filepath = filepath
+        self.storage_format = DFStorageFormat.from_filepath(filepath=filepath)
+        self.memory_map = memory_map
 
     def save(self, node_dfs: NodeDFs) -> None:
+        if self.storage_format == DFStorageFormat.json:
+            self._save_json(node_dfs=node_dfs)
+        else:
+            self._save_columnar(node_dfs=node_dfs)
+
+    def save_partial(self, node_dfs: NodeDFs, path_base: Optional[Path] = None) -> None:
+        """Writes only members of node_dfs and keeps all other node type
+        dataframes stored at path_base, which defaults to filepath"""
+        base_data_interface = NodeDFsDataInterface(
+            filepath=self.filepath if path_base is None else path_base
+        )
+
+        if (
+            self.storage_format != DFStorageFormat.json
+            and base_data_interface.storage_format == self.storage_format
+        ):
+            columnar_dfs_data_interface = ColumnarDFsDataInterface(
+                dirpath=self.filepath, storage_format=self.storage_format
+            )
+            columnar_dfs_data_interface.save_partial(
+                named_dfs={
+                    node_df.ntype.value: node_df.df for node_df in node_dfs.members
+                },
+                base=ColumnarDFsDataInterface(
+                    dirpath=base_data_interface.filepath,
+                    storage_format=self.storage_format,
+                ),
+            )
+
+            logger.info(
+                f"Saved {node_dfs.ntypes} of a {type(node_dfs)} type object "
+                f"to {self.filepath}"
+            )
+        else:
+            # A single json document or a change of format is always rewritten
+            ntype_to_df = base_data_interface.load().to_dict()
+            ntype_to_df.update(node_dfs.to_dict())
+
+            self.save(
+                node_dfs=NodeDFs(
+                    members=[
+                        NodeDF(ntype=ntype, df=df) for ntype, df in ntype_to_df.items()
+                    ]
+                )
+            )
+
+    def load(
+        self,
+        ntypes: Optional[List[NodeType]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> NodeDFs:
+        """Loads only dataframes of ntypes and, within each of them, those of
+        columns it has. Columnar backends skip reading everything else"""
+        names = None if ntypes is None else [ntype.value for ntype in ntypes]
+
+        if self.storage_format == DFStorageFormat.json:
+            node_dfs = self._load_json()
+            if names is None and columns is None:
+                node_dfs.compact()
+                return node_dfs
+            named_dfs = project_named_dfs(
+                named_dfs={
+                    node_df.ntype.value: node_df.df for node_df in node_dfs.members
+                },
+                names=names,
+                columns=columns,
+            )
+        else:
+            named_dfs = self._load_columnar(names=names, columns=columns)
+
+        if columns is not None:
+            validate_projected_columns(named_dfs=named_dfs, columns=columns)
+
+        node_dfs = NodeDFs(
+            members=[
+                NodeDF(ntype=NodeType(ntype), df=df) for ntype, df in named_dfs.items()
+            ]
+        )
+        # Also normalises artifacts saved before compact dtypes were adopted
+        node_dfs.compact()
+
+        logger.info(
+            f"Loaded {node_dfs.ntypes} of a {type(node_dfs)} object from {self.filepath}"
+        )
+
+        return node_dfs
+
+    def _save_json(self, node_dfs: NodeDFs) -> None:
         if not self.filepath.parent.exists():
             logger.info(
                 f"Creating {self.filepath.parent} because it does not yet exist"
@@ -97,17 +404,33 @@ class NodeDFsDataInterface:
 
             logger.info(f"Saved a {type(node_dfs)} type object to {self.filepath}")
 
-    def load(self) -> NodeDFs:
+    def _load_json(self) -> NodeDFs:
         with open(self.filepath, "rb") as f:
             json_data = orjson.loads(f.read())
-            node_dfs = dacite.from_dict(
-                data_class=NodeDFs,
-                data=json_data,
-                config=dacite.Config(
-                    type_hooks={DataFrame: df_type_hook}, cast=[NodeType]
-                ),
-            )
+            node_dfs = decode_node_dfs(json_data)
 
             logger.info(f"Loaded a {type(node_dfs)} object from {self.filepath}")
 
             return node_dfs
+
+    def _save_columnar(self, node_dfs: NodeDFs) -> None:
+        columnar_dfs_data_interface = ColumnarDFsDataInterface(
+            dirpath=self.filepath, storage_format=self.storage_format
+        )
+        columnar_dfs_data_interface.save(
+            named_dfs={node_df.ntype.value: node_df.df for node_df in node_dfs.members}
+        )
+
+        logger.info(f"Saved a {type(node_dfs)} type object to {self.filepath}")
+
+    def _load_columnar(
+        self, names: Optional[List[str]], columns: Optional[List[str]]
+    ) -> Dict[str, DataFrame]:
+        columnar_dfs_data_interface = ColumnarDFsDataInterface(
+            dirpath=self.filepath,
+            storage_format=self.storage_format,
+            memory_map=self.memory_map,
+        )
+        named_dfs = columnar_dfs_data_interface.load(names=names, columns=columns)
+
+        return named_dfs
@@ -5,14 +5,36 @@ import networkx as nx
 import orjson
 from networkx import Graph
 
+from eos.data_interfaces.csr_graph_data_interface import (
+    CSRGraph,
+    CSRGraphDataInterface,
+)
+
 logger = logging.getLogger(__name__)
 
+CSR_SUFFIX = ".csr"
+
 
 class NXGDataInterface:
-    def __init__(self, filepath: Path) -> None:
+    """Stores a graph as node link json, or as a directory of CSR arrays if
+    filepath ends with ".csr". With memory_map, CSR arrays are loaded as
+    read-only memory maps"""
+
+    def __init__(self, filepath: Path, memory_map: bool = False) -> None:
         self.filepath = filepath
+        self.memory_map = memory_map
+
+    @property
+    def is_csr(self) -> bool:
+        return self.filepath.suffix == CSR_SUFFIX
 
     def save(self, nx_g: Graph) -> None:
+        if self.is_csr:
+            CSRGraphDataInterface(dirpath=self.filepath).save(
+                csr_graph=CSRGraph.from_networkx(nx_g=nx_g)
+            )
+            return
+
         if not self.filepath.parent.exists():
             logger.info(
                 f"Creating {self.filepath.parent} because it does not yet exist"
@@ -26,7 +48,16 @@ class NXGDataInterface:
 
             logger.info(f"Saved a {type(nx_g)} object to {self.filepath}")
 
+    def save_csr(self, csr_graph: CSRGraph) -> None:
+        if self.is_csr:
+            CSRGraphDataInterface(dirpath=self.filepath).save(csr_graph=csr_graph)
+        else:
+            self.save(nx_g=csr_graph.to_networkx())
+
     def load(self) -> Graph:
+        if self.is_csr:
+            return self.load_lazy().to_networkx()
+
         with open(self.filepath, "rb") as f:
             json_data = orjson.loads(f.read())
 
@@ -38,3 +69,14 @@ class NXGDataInterface:
             logger.info(f"Loaded a {type(nx_g)} object from {self.filepath}")
 
             return nx_g
+
+    def load_lazy(self) -> CSRGraph:
+        """Loads a graph without materialising any networkx objects, which is
+        only possible from CSR arrays. Call to_networkx on the result to get
+        the same graph as load"""
+        if not self.is_csr:
+            return CSRGraph.from_networkx(nx_g=self.load())
+
+        return CSRGraphDataInterface(
+            dirpath=self.filepath, memory_map=self.memory_map
+        ).load()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, List, Optional
+
+import orjson
+
+from eos.nodes.utils_schema_decoding import compile_decoder
+
+logger = logging.getLogger(__name__)
+
+
+class PoolingMode(str, Enum):
+    mean = "mean"
+    cls = "cls"
+    max = "max"
+
+
+@dataclass
+class OnnxEncoderConfig:
+    model_digest: str  # Content digest of the exported sentence transformer
+    input_names: List[str]  # Tokenizer outputs the graph takes, in order
+    pooling_mode: PoolingMode
+    normalize: bool
+    max_seq_length: int
+    quantised: bool  # Whether an int8 graph was exported next to the float one
+
+
+decode_onnx_encoder_config = compile_decoder(data_class=OnnxEncoderConfig)
+
+
+class OnnxEncoderDataInterface:
+    """Directory holding a sentence transformer exported to ONNX: the float
+    graph, optionally a dynamically int8 quantised graph, the tokenizer files
+    and a json config of pooling and normalisation applied to graph outputs"""
+
+    def __init__(self, dirpath: Path) -> None:
+        self.dirpath = dirpath
+
+    @property
+    def path_config(self) -> Path:
+        return self.dirpath / "onnx_encoder_config.json"
+
+    @property
+    def path_dir_tokenizer(self) -> Path:
+        return self.dirpath / "tokenizer"
+
+    def path_model(self, quantised: bool) -> Path:
+        return self.dirpath / ("model_int8.onnx" if quantised else "model.onnx")
+
+    def save_config(self, config: OnnxEncoderConfig) -> None:
+        if not self.dirpath.exists():
+            logger.info(f"Creating {self.dirpath} because it does not yet exist")
+            self.dirpath.mkdir(parents=True, exist_ok=True)
+
+        # Written last by an export so that it only describes complete files
+        with open(self.path_config, "wb") as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+
+        logger.info(f"Saved a {type(config)} object to {self.path_config}")
+
+    def load_config(self) -> Optional[OnnxEncoderConfig]:
+        """Returns None if no export has completed in the directory"""
+        if not self.path_config.is_file():
+            return None
+
+        with open(self.path_config, "rb") as f:
+            config = decode_onnx_encoder_config(orjson.loads(f.read()))
+
+        return config
+
+    def load_session(self, quantised: bool, num_threads: Optional[int] = None) -> Any:
+        import onnxruntime as ort
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = (
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        if num_threads is not None:
+            session_options.intra_op_num_threads = num_threads
+
+        session = ort.InferenceSession(
+            str(self.path_model(quantised=quantised)),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"],
+        )
+
+        logger.info(f"Loaded an ONNX Runtime session from {self.path_model(quantised)}")
+
+        return session
+
+    def load_tokenizer(self) -> Any:
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(str(self.path_dir_tokenizer))
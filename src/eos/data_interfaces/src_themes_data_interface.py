@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from enum import Enum
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, Generator, Iterable, List, Optional, Set
 
-import dacite
 import orjson
+import pandas as pd
+from pandas import DataFrame
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 10_000
+
 
 @dataclass
 class SourceTheme:
@@ -18,41 +22,127 @@ class SourceTheme:
     description: str
 
 
-@dataclass
+class SourceThemeAttrKey(str, Enum):
+    # Mirrors SourceTheme fields in the columnar SourceThemes representation
+    theme = "theme"
+    sector = "sector"
+    description = "description"
+
+
+SOURCE_THEME_COLUMNS: List[str] = [attr_key.value for attr_key in SourceThemeAttrKey]
+
+
+@dataclass(eq=False)
 class SourceThemes:
-    members: List[SourceTheme]
+    # Struct-of-arrays form with one column per SourceTheme field
+    df: DataFrame
 
     @classmethod
-    def from_untyped_jsonl(cls, filepath: Path) -> SourceThemes:
-        members: List[SourceTheme] = []
+    def from_records(cls, records: List[Dict[str, str]]) -> SourceThemes:
+        if len(records) == 0:
+            return cls(df=DataFrame(columns=SOURCE_THEME_COLUMNS, dtype=object))
+
+        # Columns are the union of keys so unexpected keys are caught
+        df = DataFrame.from_records(records)
+
+        if set(df.columns) != set(SOURCE_THEME_COLUMNS):
+            raise ValueError(
+                f"Source theme record keys {sorted(df.columns)} do not match "
+                f"expected keys {sorted(SOURCE_THEME_COLUMNS)}"
+            )
+        if df.isna().to_numpy().any():
+            raise ValueError("At least one source theme record has missing fields")
+
+        return cls(df=df[SOURCE_THEME_COLUMNS])
+
+    @classmethod
+    def from_members(cls, members: List[SourceTheme]) -> SourceThemes:
+        return cls.from_records(records=[asdict(member) for member in members])
+
+    @classmethod
+    def iter_untyped_jsonl(
+        cls, filepath: Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Generator[SourceThemes, None, None]:
+        """Yields typed source themes in batches of at most chunk_size members
+        read line by line from the file handle"""
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+
+        records: List[Dict[str, str]] = []
 
         with open(filepath, "rb") as f:
-            list_json_str = f.read().splitlines()
-            for json_str in list_json_str:
-                json_data = orjson.loads(json_str)
+            for json_str in f:
+                if not json_str.strip():  # Tolerate blank trailing lines
+                    continue
 
-                src_theme = SourceTheme(**json_data)
-                members.append(src_theme)
+                records.append(orjson.loads(json_str))
 
-            source_themes = cls(members=members)
+                if len(records) == chunk_size:
+                    yield cls.from_records(records=records)
+                    records = []
 
-            logger.info(
-                f"Loaded a {source_themes.__class__.__name__} object "
-                f"from source jsonl {filepath}"
+        if len(records) > 0:
+            yield cls.from_records(records=records)
+
+    @classmethod
+    def from_untyped_jsonl(cls, filepath: Path) -> SourceThemes:
+        dfs: List[DataFrame] = [
+            source_themes_chunk.df
+            for source_themes_chunk in cls.iter_untyped_jsonl(filepath=filepath)
+        ]
+
+        source_themes = (
+            cls(df=pd.concat(dfs, ignore_index=True))
+            if len(dfs) > 0
+            else cls.from_records(records=[])
+        )
+
+        logger.info(
+            f"Loaded a {source_themes.__class__.__name__} object "
+            f"from source jsonl {filepath}"
+        )
+
+        return source_themes
+
+    @property
+    def members(self) -> List[SourceTheme]:
+        """Row view materialising one SourceTheme per theme"""
+        return [
+            SourceTheme(theme=theme, sector=sector, description=description)
+            for theme, sector, description in zip(
+                *(self.df[column].tolist() for column in SOURCE_THEME_COLUMNS)
             )
+        ]
 
-            return source_themes
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def to_json_records(self) -> bytes:
+        """Serialises themes as a json array of SourceTheme shaped objects"""
+        return self.df.to_json(orient="records", force_ascii=False).encode()
 
-    def validate(self) -> None:
-        # Themes are assumed to be unique
-        set_themes: Set[str] = {source_theme.theme for source_theme in self.members}
+    def validate(self, seen_themes: Optional[Set[str]] = None) -> None:
+        """Themes are assumed to be unique. When validating a stream of chunks,
+        seen_themes carries themes of previous chunks and is updated in place"""
+        themes = self.df[SourceThemeAttrKey.theme.value]
 
-        if len(set_themes) != len(self.members):
+        if not themes.is_unique:
             raise ValueError(
                 f"Themes contained within {self.__class__.__name__} "
                 "object are not unique"
             )
 
+        if seen_themes is not None:
+            list_themes: List[str] = themes.tolist()
+
+            if not seen_themes.isdisjoint(list_themes):
+                raise ValueError(
+                    f"Themes contained within {self.__class__.__name__} "
+                    "object duplicate themes of a previous chunk"
+                )
+
+            seen_themes.update(list_themes)
+
 
 class SourceThemesDataInterface:
     def __init__(self, filepath: Path) -> None:
@@ -65,16 +155,54 @@ class SourceThemesDataInterface:
             )
             self.filepath.parent.mkdir(parents=True, exist_ok=True)
 
+        # On-disk layout is kept as {"members": [SourceTheme, ...]}
         with open(self.filepath, "wb") as f:
-            json_str = orjson.dumps(source_themes, option=orjson.OPT_INDENT_2)
-            f.write(json_str)
+            f.write(b'{"members":' + source_themes.to_json_records() + b"}")
 
             logger.info(f"Saved a {type(source_themes)} object to {self.filepath}")
 
+    def save_chunks(self, source_themes_chunks: Iterable[SourceThemes]) -> int:
+        """Writes chunks into one object loadable with load() while holding
+        only one chunk in memory at a time. Returns the number of members"""
+        if not self.filepath.parent.exists():
+            logger.info(
+                f"Creating {self.filepath.parent} because it does not yet exist"
+            )
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        # Avoid leaving a truncated but valid looking file behind on failure
+        path_partial = self.filepath.with_name(self.filepath.name + ".partial")
+        n_members = 0
+
+        with open(path_partial, "wb") as f:
+            f.write(b'{"members":[')
+
+            for source_themes_chunk in source_themes_chunks:
+                if len(source_themes_chunk) == 0:
+                    continue
+
+                if n_members > 0:
+                    f.write(b",")
+
+                # Strip the enclosing brackets to splice members into one array
+                f.write(source_themes_chunk.to_json_records()[1:-1])
+                n_members += len(source_themes_chunk)
+
+            f.write(b"]}")
+
+        path_partial.replace(self.filepath)
+
+        logger.info(
+            f"Saved {n_members} members of chunked {SourceThemes} objects "
+            f"to {self.filepath}"
+        )
+
+        return n_members
+
     def load(self) -> SourceThemes:
         with open(self.filepath, "rb") as f:
             json_data = orjson.loads(f.read())
-            source_themes = dacite.from_dict(data_class=SourceThemes, data=json_data)
+            source_themes = SourceThemes.from_records(records=json_data["members"])
 
             logger.info(f"Loaded a {type(source_themes)} object from {self.filepath}")
 
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import orjson
+
+from eos.data_interfaces.columnar_dfs_data_interface import link_or_copy, remove_path
+from eos.nodes.utils_schema_decoding import compile_decoder
+
+logger = logging.getLogger(__name__)
+
+# File size, modification time in nanoseconds, inode and content digest
+DigestMemo = Dict[str, List[int | str]]
+
+
+@dataclass
+class CachedOutput:
+    digest: str  # Content digest naming the output's object in the cache
+    is_dir: bool
+
+
+@dataclass
+class StageCacheEntry:
+    stage: str  # Qualified name of the pipeline function
+    key: str
+    outputs: List[CachedOutput]  # In the order outputs are declared
+
+
+decode_stage_cache_entry = compile_decoder(data_class=StageCacheEntry)
+
+
+class StageCacheDataInterface:
+    """Content addressed store of pipeline stage outputs. Entries under
+    "entries" map stage keys to output digests and objects under "objects"
+    hold output files or directories named by their digests. Objects are hard
+    linked to and from output paths, which is safe because outputs are removed
+    before a stage runs rather than rewritten in place"""
+
+    def __init__(self, dirpath: Path) -> None:
+        self.dirpath = dirpath
+
+    @property
+    def path_dir_entries(self) -> Path:
+        return self.dirpath / "entries"
+
+    @property
+    def path_dir_objects(self) -> Path:
+        return self.dirpath / "objects"
+
+    @property
+    def path_digest_memo(self) -> Path:
+        return self.dirpath / "digest_memo.json"
+
+    def path_entry(self, key: str) -> Path:
+        return self.path_dir_entries / f"{key}.json"
+
+    def path_object(self, digest: str) -> Path:
+        return self.path_dir_objects / digest
+
+    def save_entry(self, entry: StageCacheEntry) -> None:
+        if not self.path_dir_entries.exists():
+            logger.info(
+                f"Creating {self.path_dir_entries} because it does not yet exist"
+            )
+            self.path_dir_entries.mkdir(parents=True, exist_ok=True)
+
+        path_partial = self.path_dir_entries / f"{entry.key}.json.partial"
+        with open(path_partial, "wb") as f:
+            f.write(orjson.dumps(entry, option=orjson.OPT_INDENT_2))
+        path_partial.replace(self.path_entry(key=entry.key))
+
+        logger.info(f"Saved cache entry of {entry.stage} under key {entry.key}")
+
+    def load_entry(self, key: str) -> Optional[StageCacheEntry]:
+        """Returns None on a cache miss, including when an object is missing"""
+        if not self.path_entry(key=key).is_file():
+            return None
+
+        with open(self.path_entry(key=key), "rb") as f:
+            entry = decode_stage_cache_entry(orjson.loads(f.read()))
+
+        for cached_output in entry.outputs:
+            if not self.path_object(digest=cached_output.digest).exists():
+                logger.warning(
+                    f"Ignoring cache entry {key} because object "
+                    f"{cached_output.digest} is missing"
+                )
+                return None
+
+        return entry
+
+    def save_object(self, path: Path, digest: str) -> CachedOutput:
+        cached_output = CachedOutput(digest=digest, is_dir=path.is_dir())
+
+        path_object = self.path_object(digest=digest)
+        if not path_object.exists():
+            self.path_dir_objects.mkdir(parents=True, exist_ok=True)
+
+            path_partial = self.path_dir_objects / f"{digest}.partial"
+            remove_path(path_partial)
+            self._link_tree(path_src=path, path_dst=path_partial)
+            path_partial.replace(path_object)
+
+        return cached_output
+
+    def restore_object(self, cached_output: CachedOutput, path: Path) -> None:
+        path_object = self.path_object(digest=cached_output.digest)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path_partial = path.with_name(f"{path.name}.partial")
+        remove_path(path_partial)
+        self._link_tree(path_src=path_object, path_dst=path_partial)
+
+        # Directories cannot replace directories so the old output goes first
+        remove_path(path)
+        path_partial.replace(path)
+
+        logger.info(f"Restored {path} from cached object {cached_output.digest}")
+
+    def save_digest_memo(self, digest_memo: DigestMemo) -> None:
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+
+        path_partial = self.dirpath / f"{self.path_digest_memo.name}.partial"
+        with open(path_partial, "wb") as f:
+            f.write(orjson.dumps(digest_memo))
+        path_partial.replace(self.path_digest_memo)
+
+    def load_digest_memo(self) -> DigestMemo:
+        if not self.path_digest_memo.is_file():
+            return {}
+
+        with open(self.path_digest_memo, "rb") as f:
+            digest_memo: DigestMemo = orjson.loads(f.read())
+
+            return digest_memo
+
+    @staticmethod
+    def _link_tree(path_src: Path, path_dst: Path) -> None:
+        if not path_src.is_dir():
+            link_or_copy(path_src=path_src, path_dst=path_dst)
+            return
+
+        path_dst.mkdir(parents=True)
+        for path_src_file in sorted(path_src.rglob("*")):
+            path_dst_file = path_dst / path_src_file.relative_to(path_src)
+            if path_src_file.is_dir():
+                path_dst_file.mkdir(parents=True, exist_ok=True)
+            else:
+                link_or_copy(path_src=path_src_file, path_dst=path_dst_file)
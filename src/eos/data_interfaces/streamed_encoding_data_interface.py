@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import orjson
+
+from eos.nodes.encoding_precision import (
+    EncodingPrecision,
+    encoding_dtype,
+    encoding_shape,
+)
+from eos.nodes.utils_schema_decoding import compile_decoder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EncodeProgress:
+    run_key: str  # Identifies the model and texts being encoded
+    num_rows: int
+    dim: int
+    precision: EncodingPrecision
+    num_encoded: int  # Leading rows of the partial file which are complete
+
+
+decode_encode_progress = compile_decoder(data_class=EncodeProgress)
+
+
+class StreamedEncodingDataInterface:
+    """Encoding saved as a .npy file which is filled in place one slice at a
+    time. Until it is complete, rows are written to a memory-mapped partial
+    file next to a json record of how many leading rows are done, so that an
+    interrupted encode can carry on from there"""
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    @property
+    def path_partial(self) -> Path:
+        return self.filepath.with_name(f"{self.filepath.name}.partial")
+
+    @property
+    def path_progress(self) -> Path:
+        return self.filepath.with_name(f"{self.filepath.name}.progress.json")
+
+    def load_progress(self) -> Optional[EncodeProgress]:
+        """Returns None unless a partial file and its progress both exist"""
+        if not (self.path_progress.is_file() and self.path_partial.is_file()):
+            return None
+
+        with open(self.path_progress, "rb") as f:
+            progress = decode_encode_progress(orjson.loads(f.read()))
+
+        return progress
+
+    def save_progress(self, progress: EncodeProgress) -> None:
+        # Replaced atomically so that a crash never leaves a torn record
+        path_partial = self.path_progress.with_name(
+            f"{self.path_progress.name}.partial"
+        )
+        with open(path_partial, "wb") as f:
+            f.write(orjson.dumps(progress))
+        path_partial.replace(self.path_progress)
+
+    def open_partial(self, progress: EncodeProgress, resume: bool) -> np.memmap:
+        """Opens the partial file for writing, preallocating it unless an
+        existing one is resumed"""
+        if not self.filepath.parent.exists():
+            logger.info(
+                f"Creating {self.filepath.parent} because it does not yet exist"
+            )
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        dtype = encoding_dtype(precision=progress.precision, dim=progress.dim)
+        shape = encoding_shape(
+            precision=progress.precision, num_rows=progress.num_rows, dim=progress.dim
+        )
+        if resume:
+            encoding: np.memmap = np.lib.format.open_memmap(
+                self.path_partial, mode="r+"
+            )
+            if encoding.shape != shape or encoding.dtype != dtype:
+                raise ValueError(
+                    f"{self.path_partial} holds {encoding.dtype} of shape "
+                    f"{encoding.shape} rather than {dtype} of shape {shape} "
+                    f"recorded in {self.path_progress}"
+                )
+        else:
+            encoding = np.lib.format.open_memmap(
+                self.path_partial, mode="w+", dtype=dtype, shape=shape
+            )
+
+        return encoding
+
+    def complete(self, encoding: np.memmap) -> None:
+        """Flushes the partial file and moves it to the final path"""
+        encoding.flush()
+        self.path_partial.replace(self.filepath)
+        self.path_progress.unlink(missing_ok=True)
+
+        logger.info(
+            f"Saved a streamed encoding of shape {encoding.shape} to {self.filepath}"
+        )
+
+    def save_empty(self, precision: EncodingPrecision) -> None:
+        """Saves an encoding of no texts, which cannot be memory-mapped"""
+        self.discard()
+        np.save(
+            file=self.filepath,
+            arr=np.empty(
+                encoding_shape(precision=precision, num_rows=0, dim=0),
+                dtype=encoding_dtype(precision=precision, dim=0),
+            ),
+        )
+
+        logger.info(f"Saved an empty encoding to {self.filepath}")
+
+    def discard(self) -> None:
+        self.path_partial.unlink(missing_ok=True)
+        self.path_progress.unlink(missing_ok=True)
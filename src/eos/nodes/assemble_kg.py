@@ -1,41 +1,88 @@
 import logging
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 from networkx import DiGraph
+from pandas import DataFrame
 
+from eos.data_interfaces.csr_graph_data_interface import (
+    CSRGraph,
+    CSRGraphMeta,
+    build_csr_arrays,
+)
 from eos.data_interfaces.edge_dfs_data_interface import (
+    ETYPE_TO_ENDPOINT_NTYPES,
     EdgeAttrKey,
     EdgeDF,
     EdgeDFs,
     EdgeType,
+    eid_array,
 )
 from eos.data_interfaces.node_dfs_data_interface import NodeAttrKey, NodeDF, NodeDFs
+from eos.nodes.utils_validation import (
+    ValidationLevel,
+    find_missing,
+    format_ids,
+    resolve_validation_level,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def validate_node_dfs_and_edge_dfs(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> None:
-    # Collect all unique node ids
-    set_nid: Set[int] = set()
-    for node_df in node_dfs.members:
-        df = node_df.df
-        set_nid = set_nid | set(df[NodeAttrKey.nid.value])
+def validate_node_dfs_and_edge_dfs(
+    node_dfs: NodeDFs, edge_dfs: EdgeDFs, level: Optional[ValidationLevel] = None
+) -> None:
+    """Checks every edge endpoint is a node and every node an edge endpoint. At
+    full level, also checks endpoints are nodes of the types an edge type
+    connects"""
+    level = resolve_validation_level(level=level)
+    if level == ValidationLevel.off:
+        return
+
+    nid = node_dfs.nid_array()
+    eid = np.concatenate(
+        [eid_array(df=edge_df.df) for edge_df in edge_dfs.members]
+        + [np.empty((0, 2), dtype=np.int64)]
+    )
 
-    # Collect all unique node ids referenced in eids
-    set_nid_referenced = set()
-    for edge_df in edge_dfs.members:
-        df = edge_df.df
-        for u, v in df[EdgeAttrKey.eid.value].tolist():
-            set_nid_referenced.add(u)
-            set_nid_referenced.add(v)
+    dangling_nid = find_missing(ids=eid.ravel(), reference=nid)
+    if len(dangling_nid) > 0:
+        raise ValueError(
+            f"Edge endpoints {format_ids(ids=dangling_nid)} are not node ids "
+            "in node dataframes"
+        )
 
-    if set_nid != set_nid_referenced:  # Island nodes are not allowed
+    island_nid = find_missing(ids=nid, reference=eid.ravel())
+    if len(island_nid) > 0:  # Island nodes are not allowed
         raise ValueError(
-            f"The set of {len(set_nid)} node ids in node datagrames and "
-            f"{len(set_nid_referenced)} node ids in edge dataframes are "
-            "not identical"
+            f"Nodes {format_ids(ids=island_nid)} are not endpoints of any edge "
+            "in edge dataframes"
         )
 
+    if level == ValidationLevel.full:
+        ntype_to_df = node_dfs.to_dict()
+        for edge_df in edge_dfs.members:
+            src_ntype, dst_ntype = ETYPE_TO_ENDPOINT_NTYPES[edge_df.etype]
+            if src_ntype not in ntype_to_df or dst_ntype not in ntype_to_df:
+                continue
+
+            edge_eid = eid_array(df=edge_df.df)
+            for ntype, endpoint_nid in [
+                (src_ntype, edge_eid[:, 0]),
+                (dst_ntype, edge_eid[:, 1]),
+            ]:
+                foreign_nid = find_missing(
+                    ids=endpoint_nid,
+                    reference=ntype_to_df[ntype][NodeAttrKey.nid.value].to_numpy(),
+                )
+                if len(foreign_nid) > 0:
+                    raise ValueError(
+                        f"{edge_df.etype.value} edges have endpoints "
+                        f"{format_ids(ids=foreign_nid)} which are not "
+                        f"{ntype.value} nodes"
+                    )
+
 
 def node_tuples_from_node_df(node_df: NodeDF) -> List[Tuple[int, Dict[str, Any]]]:
     df = node_df.df
@@ -73,8 +120,9 @@ def edge_tuples_from_edge_df(edge_df: EdgeDF) -> List[Tuple[int, int, Dict[str,
     edge_tuples: List[Tuple[int, int, Dict[str, Any]]] = []
 
     for record in df.to_dict(orient="records"):
-        # e.g. [{"eid": (0, 1), "etype": ...}, ...]
-        u, v = tuple(record.pop(EdgeAttrKey.eid.value))
+        # e.g. [{"src": 0, "dst": 1, "etype": ...}, ...]
+        u = int(record.pop(EdgeAttrKey.src.value))
+        v = int(record.pop(EdgeAttrKey.dst.value))
         # The rest is assumed all to be attributes
         record_str_key = {str(k): v for k, v in record.items()}
         edge_tuple: Tuple[int, int, Dict[str, Any]] = (u, v, record_str_key)
@@ -99,7 +147,151 @@ def edge_tuples_from_edge_dfs(
     return edge_tuples
 
 
-def _assemble_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
+def attr_dicts_from_df(df: DataFrame, key_columns: List[str]) -> List[Dict[str, Any]]:
+    """Builds one attribute dict per row from column lists, treating all
+    columns but key_columns as attributes, without intermediate records"""
+    attr_columns = [column for column in df.columns if column not in key_columns]
+    attr_keys = [str(column) for column in attr_columns]
+
+    if len(attr_columns) == 0:
+        return [{} for _ in range(len(df))]
+
+    return [
+        dict(zip(attr_keys, values))
+        for values in zip(*(df[column].tolist() for column in attr_columns))
+    ]
+
+
+def check_edge_endpoints(nid: np.ndarray, edge_dfs: EdgeDFs) -> None:
+    """Raises naming the edge type of any edge endpoints which are not in nid,
+    whatever the validation level, for builders which index endpoints"""
+    for edge_df in edge_dfs.members:
+        dangling_nid = find_missing(ids=eid_array(df=edge_df.df).ravel(), reference=nid)
+        if len(dangling_nid) > 0:
+            raise ValueError(
+                f"{edge_df.etype.value} edges have endpoints "
+                f"{format_ids(ids=dangling_nid)} which are not node ids in node "
+                "dataframes"
+            )
+
+
+def digraph_from_element_dfs(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
+    """Fills the dict of dicts storage of an empty DiGraph in one pass over
+    column arrays. Every edge shares one attribute dict between successor and
+    predecessor adjacency exactly like DiGraph.add_edges_from would do"""
+    nx_g = DiGraph()
+    # Storage dicts of networkx graphs are private and so missing from stubs
+    node = nx_g._node  # type: ignore[attr-defined]
+    succ = nx_g._succ  # type: ignore[attr-defined]
+    pred = nx_g._pred  # type: ignore[attr-defined]
+
+    for node_df in node_dfs.members:
+        df = node_df.df
+        node.update(
+            zip(
+                df[NodeAttrKey.nid.value].tolist(),
+                attr_dicts_from_df(df=df, key_columns=[NodeAttrKey.nid.value]),
+            )
+        )
+    for nid in node:
+        succ[nid] = {}
+        pred[nid] = {}
+
+    # Checked even with validation off, since storage dicts are filled as is
+    check_edge_endpoints(nid=node_dfs.nid_array(), edge_dfs=edge_dfs)
+
+    for edge_df in edge_dfs.members:
+        df = edge_df.df
+        for u, v, attr in zip(
+            df[EdgeAttrKey.src.value].tolist(),
+            df[EdgeAttrKey.dst.value].tolist(),
+            attr_dicts_from_df(
+                df=df, key_columns=[EdgeAttrKey.src.value, EdgeAttrKey.dst.value]
+            ),
+        ):
+            succ[u][v] = attr
+            pred[v][u] = attr
+
+    return nx_g
+
+
+def csr_graph_from_element_dfs(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> CSRGraph:
+    """Builds CSR arrays straight from node and edge dataframes without
+    creating any per element python objects"""
+    ntype_to_df = {
+        node_df.ntype.value: node_df.df.sort_values(NodeAttrKey.nid.value).reset_index(
+            drop=True
+        )
+        for node_df in node_dfs.members
+    }
+
+    list_nid = [df[NodeAttrKey.nid.value].to_numpy() for df in ntype_to_df.values()]
+    nid = np.concatenate(list_nid).astype(np.int64)
+    ntype_code = np.repeat(
+        np.arange(len(list_nid), dtype=np.int16), [len(a) for a in list_nid]
+    )
+    order = np.argsort(nid, kind="stable")
+    nid, ntype_code = nid[order], ntype_code[order]
+
+    edge_columns = {
+        EdgeAttrKey.src.value,
+        EdgeAttrKey.dst.value,
+        EdgeAttrKey.etype.value,
+    }
+    for edge_df in edge_dfs.members:
+        if set(edge_df.df.columns) != edge_columns:
+            raise ValueError(
+                f"{edge_df.etype.value} edge dataframe has columns "
+                f"{edge_df.df.columns.tolist()} instead of {sorted(edge_columns)}"
+            )
+    # Searchsorted would otherwise map missing endpoints to neighbouring nodes
+    check_edge_endpoints(nid=nid, edge_dfs=edge_dfs)
+
+    src = np.concatenate(
+        [eid_array(df=edge_df.df)[:, 0] for edge_df in edge_dfs.members]
+        + [np.empty(0, dtype=np.int64)]
+    )
+    dst = np.concatenate(
+        [eid_array(df=edge_df.df)[:, 1] for edge_df in edge_dfs.members]
+        + [np.empty(0, dtype=np.int64)]
+    )
+    etype_code, etypes = pd.factorize(
+        np.concatenate(
+            [
+                edge_df.df[EdgeAttrKey.etype.value].to_numpy(dtype=object)
+                for edge_df in edge_dfs.members
+            ]
+            + [np.empty(0, dtype=object)]
+        )
+    )
+
+    indptr, indices, etype_code = build_csr_arrays(
+        num_nodes=len(nid),
+        u_index=np.searchsorted(nid, src),
+        v_index=np.searchsorted(nid, dst),
+        etype_code=etype_code.astype(np.int16),
+    )
+
+    meta = CSRGraphMeta(
+        directed=True,
+        num_nodes=len(nid),
+        num_edges=len(indices),
+        ntypes=list(ntype_to_df),
+        etypes=[str(etype) for etype in etypes],
+    )
+
+    return CSRGraph(
+        meta=meta,
+        nid=nid,
+        ntype_code=ntype_code,
+        indptr=indptr,
+        indices=indices,
+        etype_code=etype_code,
+        ntype_to_df=ntype_to_df,
+    )
+
+
+def prepare_element_dfs(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> None:
     # Remove original edges because edges are replaced by paths
     edge_dfs.members = [
         edge_df
@@ -110,14 +302,12 @@ def _assemble_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
     # Sanity check input
     validate_node_dfs_and_edge_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
 
-    # Transform graph elements into networkx graph compatible form
-    node_tuples = node_tuples_from_node_dfs(node_dfs=node_dfs)
-    edge_tuples = edge_tuples_from_edge_dfs(edge_dfs=edge_dfs)
 
-    # Initialise the knowledge graph
-    nx_g = DiGraph()
-    nx_g.add_nodes_from(node_tuples)
-    nx_g.add_edges_from(edge_tuples)
+def _assemble_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
+    prepare_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    # Initialise the knowledge graph straight from columns of graph elements
+    nx_g = digraph_from_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
 
     logger.info(
         f"Initialised knowledge graph has {nx_g.number_of_nodes()} nodes "
@@ -125,3 +315,16 @@ def _assemble_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
     )
 
     return nx_g
+
+
+def _assemble_csr_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> CSRGraph:
+    prepare_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    csr_graph = csr_graph_from_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    logger.info(
+        f"Initialised CSR knowledge graph has {csr_graph.number_of_nodes()} nodes "
+        f"and {csr_graph.number_of_edges()} edges"
+    )
+
+    return csr_graph
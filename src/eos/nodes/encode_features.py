@@ -1,37 +1,236 @@
+import hashlib
 import logging
 from dataclasses import dataclass
-from typing import Generator, List, Tuple
+from enum import Enum
+from typing import Generator, List, Optional, Protocol, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+import pandas as pd
 
 from eos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey
+from eos.data_interfaces.embedding_cache_data_interface import (
+    EMBEDDING_DTYPE,
+    EmbeddingCacheDataInterface,
+)
 from eos.data_interfaces.node_dfs_data_interface import NodeAttrKey, NodeDFs, NodeType
+from eos.data_interfaces.streamed_encoding_data_interface import (
+    EncodeProgress,
+    StreamedEncodingDataInterface,
+)
+from eos.nodes.encoding_precision import EncodingPrecision, quantise_encoding
 
 logger = logging.getLogger(__name__)
 
 
+# Text features encoded by _encode_features in order
+ENCODED_ATTR_KEYS: Tuple[NodeAttrKey, ...] = (
+    NodeAttrKey.theme,
+    NodeAttrKey.description,
+    NodeAttrKey.sector,
+)
+
+# Texts encoded and written to disk at a time by stream_encode_list_text
+STREAM_CHUNK_SIZE = 8192
+
+
+class EncoderBackend(str, Enum):
+    torch = "torch"  # SentenceTransformer with PyTorch
+    onnx = "onnx"  # Exported graph run by ONNX Runtime
+    onnx_int8 = "onnx_int8"  # Exported graph with int8 quantised weights
+
+    @property
+    def quantised(self) -> bool:
+        return self == EncoderBackend.onnx_int8
+
+
 @dataclass
 class FeatureEncoding:
     attr_key: NodeAttrKey | EdgeAttrKey
     encoding: np.ndarray
 
 
-def encode_list_text(  # type: ignore[no-any-unimported]
-    model: SentenceTransformer,
+class TextEncoder(Protocol):
+    """Anything encoding texts like SentenceTransformer.encode, e.g. a
+    SentenceTransformer itself or a pool of them in worker processes"""
+
+    def encode(self, sentences: List[str], show_progress_bar: bool) -> np.ndarray: ...
+
+
+def encode_list_text(model: TextEncoder, list_text: List[str]) -> np.ndarray:
+    return model.encode(sentences=list_text, show_progress_bar=True)
+
+
+def digest_list_text(list_text: List[str]) -> List[bytes]:
+    return [
+        hashlib.blake2b(text.encode(), digest_size=16).digest() for text in list_text
+    ]
+
+
+def encode_list_text_cached(
+    model: TextEncoder,
     list_text: List[str],
+    embedding_cache_data_interface: EmbeddingCacheDataInterface,
+    model_key: str,
 ) -> np.ndarray:
-    return model.encode(sentences=list_text, show_progress_bar=True)  # type: ignore[no-any-return]
+    """Encodes each distinct text once and only if its embedding by the model
+    of model_key is not already cached, then caches the new embeddings"""
+    if len(list_text) == 0:
+        return encode_list_text(model=model, list_text=list_text)
 
+    codes, unique_text = pd.factorize(pd.Series(list_text, dtype=object))
+    list_unique_text: List[str] = unique_text.tolist()
+    text_digests = digest_list_text(list_text=list_unique_text)
 
-def _encode_features(  # type: ignore[no-any-unimported]
-    model: SentenceTransformer, node_dfs: NodeDFs
-) -> Generator[FeatureEncoding, None, None]:
+    is_found, found_vectors = embedding_cache_data_interface.load(
+        model_key=model_key, text_digests=text_digests
+    )
+    index_missing = np.flatnonzero(~is_found)
+
+    logger.info(
+        f"Encoding {len(index_missing)} of {len(list_unique_text)} distinct "
+        f"texts among {len(list_text)} texts which are not cached"
+    )
+
+    if len(index_missing) == 0:
+        unique_vectors = found_vectors
+    else:
+        missing_vectors = encode_list_text(
+            model=model, list_text=[list_unique_text[i] for i in index_missing]
+        ).astype(EMBEDDING_DTYPE)
+        embedding_cache_data_interface.save(
+            model_key=model_key,
+            text_digests=[text_digests[i] for i in index_missing],
+            vectors=missing_vectors,
+        )
+
+        unique_vectors = np.empty(
+            (len(list_unique_text), missing_vectors.shape[1]), dtype=EMBEDDING_DTYPE
+        )
+        unique_vectors[index_missing] = missing_vectors
+        if len(found_vectors) > 0:
+            unique_vectors[is_found] = found_vectors
+
+    encoding: np.ndarray = unique_vectors[codes]
+
+    return encoding
+
+
+def digest_run(model_key: str, list_text: List[str]) -> str:
+    """Identifies an encode of list_text in order by the model of model_key"""
+    run_hash = hashlib.blake2b(model_key.encode(), digest_size=16)
+    for text_digest in digest_list_text(list_text=list_text):
+        run_hash.update(text_digest)
+
+    return run_hash.hexdigest()
+
+
+def encode_list_text_maybe_cached(
+    model: TextEncoder,
+    list_text: List[str],
+    embedding_cache_data_interface: Optional[EmbeddingCacheDataInterface] = None,
+    model_key: Optional[str] = None,
+) -> np.ndarray:
+    if embedding_cache_data_interface is not None and model_key is not None:
+        return encode_list_text_cached(
+            model=model,
+            list_text=list_text,
+            embedding_cache_data_interface=embedding_cache_data_interface,
+            model_key=model_key,
+        )
+
+    return encode_list_text(model=model, list_text=list_text)
+
+
+def stream_encode_list_text(
+    model: TextEncoder,
+    list_text: List[str],
+    streamed_encoding_data_interface: StreamedEncodingDataInterface,
+    model_key: str,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    embedding_cache_data_interface: Optional[EmbeddingCacheDataInterface] = None,
+    precision: EncodingPrecision = EncodingPrecision.float32,
+) -> None:
+    """Encodes chunk_size texts at a time into their slice of a preallocated
+    memory-mapped file, so that no more than one chunk of encodings is held in
+    memory. Progress is recorded after each chunk, and an interrupted encode of
+    the same texts by the same model carries on from the last chunk done"""
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+
+    run_key = digest_run(model_key=model_key, list_text=list_text)
+
+    progress = streamed_encoding_data_interface.load_progress()
+    encoding: Optional[np.memmap] = None
+    if (
+        progress is not None
+        and progress.run_key == run_key
+        and progress.num_rows == len(list_text)
+        and progress.precision == precision
+    ):
+        encoding = streamed_encoding_data_interface.open_partial(
+            progress=progress, resume=True
+        )
+        logger.info(
+            f"Resuming encode from text {progress.num_encoded} of {len(list_text)}"
+        )
+    elif progress is not None:
+        logger.info(
+            "Discarding a partial encode of other texts, by another model or "
+            "at another precision"
+        )
+        streamed_encoding_data_interface.discard()
+        progress = None
+
+    if len(list_text) == 0:
+        streamed_encoding_data_interface.save_empty(precision=precision)
+        return
+
+    for start in range(
+        0 if progress is None else progress.num_encoded, len(list_text), chunk_size
+    ):
+        chunk_encoding = encode_list_text_maybe_cached(
+            model=model,
+            list_text=list_text[start : start + chunk_size],
+            embedding_cache_data_interface=embedding_cache_data_interface,
+            model_key=model_key,
+        )
+        if progress is None or encoding is None:
+            progress = EncodeProgress(
+                run_key=run_key,
+                num_rows=len(list_text),
+                dim=chunk_encoding.shape[1],
+                precision=precision,
+                num_encoded=0,
+            )
+            encoding = streamed_encoding_data_interface.open_partial(
+                progress=progress, resume=False
+            )
+
+        encoding[start : start + len(chunk_encoding)] = quantise_encoding(
+            encoding=chunk_encoding, precision=precision
+        )
+        encoding.flush()
+
+        # Only recorded once the rows are on disk
+        progress.num_encoded = start + len(chunk_encoding)
+        streamed_encoding_data_interface.save_progress(progress=progress)
+
+        logger.info(
+            f"Encoded and wrote {progress.num_encoded} of {len(list_text)} texts"
+        )
+
+    if encoding is not None:
+        streamed_encoding_data_interface.complete(encoding=encoding)
+
+
+def gather_raw_features(
+    node_dfs: NodeDFs,
+) -> List[Tuple[NodeAttrKey | EdgeAttrKey, List[str]]]:
+    """Returns texts of each feature in ENCODED_ATTR_KEYS"""
     # Index feature dataframes by types
     ntype_to_df = node_dfs.to_dict()
 
-    # Gather input raw features
-    raw_features: List[Tuple[NodeAttrKey | EdgeAttrKey, List[str]]] = [
+    return [
         (
             NodeAttrKey.theme,
             ntype_to_df[NodeType.theme][NodeAttrKey.theme.value].tolist(),
@@ -46,10 +245,26 @@ def _encode_features(  # type: ignore[no-any-unimported]
         ),
     ]
 
+
+def _encode_features(
+    model: TextEncoder,
+    node_dfs: NodeDFs,
+    embedding_cache_data_interface: Optional[EmbeddingCacheDataInterface] = None,
+    model_key: Optional[str] = None,
+) -> Generator[FeatureEncoding, None, None]:
+    """With an embedding cache, model_key must identify model so that
+    embeddings of different models are never mixed up"""
+    if embedding_cache_data_interface is not None and model_key is None:
+        raise ValueError("A model key is required to use an embedding cache")
+
     # Yield encoding for one feature at a time to optimise memory usage
-    for attr_key, list_text in raw_features:
+    for attr_key, list_text in gather_raw_features(node_dfs=node_dfs):
         logger.info(f"Encoding feature {attr_key} of length {len(list_text)}...")
-        yield FeatureEncoding(
-            attr_key=attr_key,
-            encoding=encode_list_text(model=model, list_text=list_text),
+        encoding = encode_list_text_maybe_cached(
+            model=model,
+            list_text=list_text,
+            embedding_cache_data_interface=embedding_cache_data_interface,
+            model_key=model_key,
         )
+
+        yield FeatureEncoding(attr_key=attr_key, encoding=encoding)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, List, Optional, Type
+
+import numpy as np
+
+from eos.nodes.encode_features import TextEncoder
+
+logger = logging.getLogger(__name__)
+
+# Batches per task, which trades scheduling overhead against load balancing
+BATCHES_PER_CHUNK = 8
+NUM_PROGRESS_LOGS = 20
+
+# Model of the current worker process, loaded once by _init_worker
+_worker_model: Optional[TextEncoder] = None
+
+
+def load_sentence_transformer(path_model: Path) -> TextEncoder:
+    # Imported here so that only processes which encode pay for importing torch
+    from sentence_transformers import SentenceTransformer
+
+    model: TextEncoder = SentenceTransformer(model_name_or_path=str(path_model))
+
+    return model
+
+
+def chunk_by_length(list_text: List[str], chunk_size: int) -> List[np.ndarray]:
+    """Splits text indices sorted by descending text length into chunks, so
+    that texts batched together are of similar lengths and need little padding
+    and the slowest chunks are handed out first. Character counts stand in for
+    token counts as in SentenceTransformer.encode"""
+    lengths = np.fromiter((len(text) for text in list_text), dtype=np.int64)
+    order = np.argsort(-lengths, kind="stable")
+
+    return [order[i : i + chunk_size] for i in range(0, len(order), chunk_size)]
+
+
+def _init_worker(
+    model_loader: Callable[[Path], TextEncoder], path_model: Path, num_threads: int
+) -> None:
+    global _worker_model
+
+    # Workers share cores so each one must not spawn a thread per core
+    try:
+        import torch
+
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    _worker_model = model_loader(path_model)
+
+
+def _encode_chunk(list_text: List[str], batch_size: int) -> np.ndarray:
+    if _worker_model is None:
+        raise RuntimeError("Encoding worker has not loaded a model")
+
+    # Encoders which accept a batch size are given one
+    encode: Callable[..., np.ndarray] = _worker_model.encode
+    encoding: np.ndarray = encode(
+        sentences=list_text, batch_size=batch_size, show_progress_bar=False
+    )
+
+    return encoding
+
+
+class EncodePool:
+    """Encodes texts in num_workers processes, each holding its own model
+    loaded from path_model by model_loader. Texts are sorted by length and
+    handed out in chunks of similar lengths, and encodings are returned in
+    the order of the texts given. Use as a context manager to shut down the
+    workers"""
+
+    def __init__(
+        self,
+        path_model: Path,
+        num_workers: int,
+        batch_size: int = 32,
+        model_loader: Callable[[Path], TextEncoder] = load_sentence_transformer,
+    ) -> None:
+        if num_workers < 1:
+            raise ValueError(f"Number of workers must be positive, got {num_workers}")
+        if batch_size < 1:
+            raise ValueError(f"Batch size must be positive, got {batch_size}")
+
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+
+        # Spawned rather than forked so that no thread pool state is inherited
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                model_loader,
+                path_model,
+                max(1, (os.cpu_count() or 1) // num_workers),
+            ),
+        )
+
+        logger.info(
+            f"Started {num_workers} encoding workers loading models from {path_model}"
+        )
+
+    def __enter__(self) -> EncodePool:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def encode(self, sentences: List[str], show_progress_bar: bool) -> np.ndarray:
+        chunks = chunk_by_length(
+            list_text=sentences, chunk_size=self.batch_size * BATCHES_PER_CHUNK
+        )
+        futures = [
+            self.executor.submit(
+                _encode_chunk, [sentences[i] for i in chunk], self.batch_size
+            )
+            for chunk in chunks
+        ]
+
+        encoding: Optional[np.ndarray] = None
+        for i, (chunk, future) in enumerate(zip(chunks, futures)):
+            chunk_encoding = future.result()
+            if encoding is None:
+                encoding = np.empty(
+                    (len(sentences),) + chunk_encoding.shape[1:],
+                    dtype=chunk_encoding.dtype,
+                )
+            encoding[chunk] = chunk_encoding
+
+            if (
+                show_progress_bar
+                and (i + 1) % max(1, len(chunks) // NUM_PROGRESS_LOGS) == 0
+            ):
+                logger.info(f"Encoded {i + 1} of {len(chunks)} chunks of texts")
+
+        if encoding is None:
+            return np.empty((0,), dtype=np.float32)
+
+        return encoding
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import orjson
+
+from eos.data_interfaces.embedding_cache_data_interface import EMBEDDING_DTYPE
+from eos.nodes.encode_features import TextEncoder
+
+logger = logging.getLogger(__name__)
+
+# Texts sent per request, which bounds the size of messages either way
+DAEMON_REQUEST_SIZE = 4096
+CONNECT_TIMEOUT = 1.0  # Seconds to wait for a daemon before falling back
+
+FRAME_HEADER = struct.Struct(">Q")
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> bytes:
+    (size,) = FRAME_HEADER.unpack(_recv_exactly(sock=sock, size=FRAME_HEADER.size))
+
+    return _recv_exactly(sock=sock, size=size)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    num_received = 0
+    while num_received < size:
+        num_bytes = sock.recv_into(view[num_received:])
+        if num_bytes == 0:
+            raise ConnectionError("Connection closed in the middle of a message")
+        num_received += num_bytes
+
+    return bytes(buffer)
+
+
+class _EncodeRequestHandler(socketserver.BaseRequestHandler):
+    """Answers requests of one connection until the client closes it. A
+    request is a json frame of an op, and an encode reply is a json frame of
+    the shape followed by a frame of float32 encodings"""
+
+    server: EncoderDaemon
+
+    def handle(self) -> None:
+        while True:
+            try:
+                request: Dict[str, Any] = orjson.loads(recv_frame(sock=self.request))
+            except ConnectionError:
+                return
+
+            if request["op"] == "info":
+                send_frame(
+                    sock=self.request,
+                    payload=orjson.dumps({"model_key": self.server.model_key}),
+                )
+                continue
+
+            try:
+                with self.server.encode_lock:
+                    encoding = np.ascontiguousarray(
+                        self.server.model.encode(
+                            sentences=request["list_text"], show_progress_bar=False
+                        ),
+                        dtype=EMBEDDING_DTYPE,
+                    )
+            except Exception as e:
+                logger.exception("Failed to encode a request")
+                send_frame(sock=self.request, payload=orjson.dumps({"error": str(e)}))
+                continue
+
+            send_frame(
+                sock=self.request, payload=orjson.dumps({"shape": encoding.shape})
+            )
+            send_frame(sock=self.request, payload=encoding.tobytes())
+
+
+class EncoderDaemon(socketserver.ThreadingUnixStreamServer):
+    """Keeps model loaded and encodes texts sent to a Unix socket at
+    path_socket. Each connection has its own thread, but encodes run one at a
+    time so that they never compete for the cores the model uses"""
+
+    daemon_threads = True
+
+    def __init__(self, path_socket: Path, model: TextEncoder, model_key: str) -> None:
+        self.path_socket = path_socket
+        self.model = model
+        self.model_key = model_key
+        self.encode_lock = threading.Lock()
+
+        # A socket file left by a daemon which did not shut down cleanly
+        if path_socket.exists():
+            daemon_encoder = connect_encoder_daemon(path_socket=path_socket)
+            if daemon_encoder is not None:
+                daemon_encoder.close()
+                raise ValueError(f"An encoder daemon is already serving {path_socket}")
+            path_socket.unlink()
+
+        path_socket.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(path_socket), _EncodeRequestHandler)
+
+        logger.info(f"Serving encodes by model {model_key} on {path_socket}")
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path_socket.unlink(missing_ok=True)
+
+
+class DaemonEncoder:
+    """Encodes texts with an EncoderDaemon, sending them in requests of
+    DAEMON_REQUEST_SIZE texts over one connection"""
+
+    def __init__(self, path_socket: Path, sock: socket.socket, model_key: str) -> None:
+        self.path_socket = path_socket
+        self.sock = sock
+        self.model_key = model_key
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def encode(self, sentences: List[str], show_progress_bar: bool) -> np.ndarray:
+        list_encoding: List[np.ndarray] = []
+        for start in range(0, len(sentences), DAEMON_REQUEST_SIZE):
+            send_frame(
+                sock=self.sock,
+                payload=orjson.dumps(
+                    {
+                        "op": "encode",
+                        "list_text": sentences[start : start + DAEMON_REQUEST_SIZE],
+                    }
+                ),
+            )
+            reply: Dict[str, Any] = orjson.loads(recv_frame(sock=self.sock))
+            if "error" in reply:
+                raise RuntimeError(
+                    f"Encoder daemon on {self.path_socket} failed: {reply['error']}"
+                )
+
+            list_encoding.append(
+                np.frombuffer(recv_frame(sock=self.sock), dtype=EMBEDDING_DTYPE)
+                .reshape(reply["shape"])
+                .copy()
+            )
+
+            if show_progress_bar:
+                logger.info(
+                    f"Encoded {min(start + DAEMON_REQUEST_SIZE, len(sentences))} of "
+                    f"{len(sentences)} texts with the encoder daemon"
+                )
+
+        if len(list_encoding) == 0:
+            return np.empty((0,), dtype=EMBEDDING_DTYPE)
+
+        return np.concatenate(list_encoding)
+
+
+def connect_encoder_daemon(
+    path_socket: Path, model_key: Optional[str] = None
+) -> Optional[DaemonEncoder]:
+    """Returns None unless a daemon answers on path_socket and, if model_key
+    is given, serves the model of model_key"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(path_socket))
+        send_frame(sock=sock, payload=orjson.dumps({"op": "info"}))
+        daemon_model_key: str = orjson.loads(recv_frame(sock=sock))["model_key"]
+    except OSError:
+        sock.close()
+        return None
+
+    if model_key is not None and daemon_model_key != model_key:
+        logger.info(
+            f"Encoder daemon on {path_socket} serves model {daemon_model_key} "
+            f"rather than {model_key}"
+        )
+        sock.close()
+        return None
+
+    # Encodes of large requests take longer than connecting
+    sock.settimeout(None)
+
+    return DaemonEncoder(path_socket=path_socket, sock=sock, model_key=daemon_model_key)
@@ -0,0 +1,159 @@
+import logging
+from enum import Enum
+from typing import Generator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from eos.data_interfaces.embedding_cache_data_interface import EMBEDDING_DTYPE
+
+logger = logging.getLogger(__name__)
+
+# Rows dequantised at a time by readers of stored encodings
+ENCODING_BLOCK_SIZE = 1 << 16
+
+INT8_MAX = 127
+
+
+class EncodingPrecision(str, Enum):
+    float32 = "float32"
+    float16 = "float16"
+    int8 = "int8"  # Codes scaled per row by the row's largest absolute value
+
+
+def encoding_dtype(precision: EncodingPrecision, dim: int) -> np.dtype:
+    """Int8 encodings are one record per row of a float32 scale followed by
+    dim int8 codes, so that a single .npy file holds them and rows are
+    contiguous for block reads"""
+    dtype: np.dtype = (
+        np.dtype([("scale", EMBEDDING_DTYPE), ("codes", np.int8, (dim,))])
+        if precision == EncodingPrecision.int8
+        else np.dtype(precision.value)
+    )
+
+    return dtype
+
+
+def encoding_shape(
+    precision: EncodingPrecision, num_rows: int, dim: int
+) -> Tuple[int, ...]:
+    return (num_rows,) if precision == EncodingPrecision.int8 else (num_rows, dim)
+
+
+def stored_precision(stored: np.ndarray) -> EncodingPrecision:
+    if stored.dtype.names == ("scale", "codes"):
+        return EncodingPrecision.int8
+    if stored.dtype == np.float16:
+        return EncodingPrecision.float16
+
+    return EncodingPrecision.float32
+
+
+def quantise_encoding(encoding: np.ndarray, precision: EncodingPrecision) -> np.ndarray:
+    if precision != EncodingPrecision.int8:
+        return encoding.astype(np.dtype(precision.value), copy=False)
+
+    scale = np.abs(encoding).max(axis=1, initial=0.0).astype(EMBEDDING_DTYPE)
+    scale /= INT8_MAX
+
+    stored = np.empty(
+        len(encoding), dtype=encoding_dtype(precision=precision, dim=encoding.shape[1])
+    )
+    stored["scale"] = scale
+    # Rows of zeros have a scale of zero and codes of zero
+    stored["codes"] = np.rint(
+        encoding / np.where(scale > 0, scale, 1.0)[:, np.newaxis]
+    ).astype(np.int8)
+
+    return stored
+
+
+def dequantise_encoding(stored: np.ndarray) -> np.ndarray:
+    """Returns float32 encodings of stored rows of any precision"""
+    if stored_precision(stored=stored) == EncodingPrecision.int8:
+        encoding: np.ndarray = (
+            stored["codes"].astype(EMBEDDING_DTYPE) * stored["scale"][:, np.newaxis]
+        )
+        return encoding
+
+    return np.asarray(stored, dtype=EMBEDDING_DTYPE)
+
+
+def iter_dequantised_blocks(
+    stored: np.ndarray, block_size: int = ENCODING_BLOCK_SIZE
+) -> Generator[Tuple[int, np.ndarray], None, None]:
+    """Yields the first row index and float32 encodings of each block of
+    block_size rows, reading stored, which may be memory-mapped, one block at
+    a time"""
+    if block_size < 1:
+        raise ValueError(f"Block size must be positive, got {block_size}")
+
+    for start in range(0, len(stored), block_size):
+        yield start, dequantise_encoding(stored=stored[start : start + block_size])
+
+
+def count_rows(list_stored: List[np.ndarray]) -> int:
+    """Returns the number of rows shared by stored encodings of the same rows"""
+    if len({len(stored) for stored in list_stored}) != 1:
+        raise ValueError(
+            f"Encodings of {[len(stored) for stored in list_stored]} rows "
+            "cannot be averaged"
+        )
+
+    return len(list_stored[0])
+
+
+def mean_dequantised_rows(
+    list_stored: List[np.ndarray], rows: Union[slice, np.ndarray]
+) -> np.ndarray:
+    """Averages the given rows of stored encodings into float32, reading only
+    those rows if stored encodings are memory-mapped"""
+    mean = dequantise_encoding(stored=list_stored[0][rows])
+    # Float32 rows are dequantised to a view, which may be read-only
+    if np.may_share_memory(mean, list_stored[0]):
+        mean = mean.copy()
+    for stored in list_stored[1:]:
+        mean += dequantise_encoding(stored=stored[rows])
+    mean /= len(list_stored)
+
+    return mean
+
+
+def iter_mean_dequantised_blocks(
+    list_stored: List[np.ndarray],
+    block_size: int = ENCODING_BLOCK_SIZE,
+    list_start: Optional[List[int]] = None,
+) -> Generator[Tuple[int, np.ndarray], None, None]:
+    """Yields the first row index and float32 average of stored encodings of
+    each block of block_size rows, in the order of list_start if given, so
+    that averaging is fused with reading a block at a time"""
+    if block_size < 1:
+        raise ValueError(f"Block size must be positive, got {block_size}")
+
+    num_rows = count_rows(list_stored=list_stored)
+    if list_start is None:
+        list_start = list(range(0, num_rows, block_size))
+
+    for start in list_start:
+        yield start, mean_dequantised_rows(
+            list_stored=list_stored, rows=slice(start, start + block_size)
+        )
+
+
+def mean_dequantised(
+    list_stored: List[np.ndarray], block_size: int = ENCODING_BLOCK_SIZE
+) -> np.ndarray:
+    """Averages stored encodings of the same rows into one float32 matrix,
+    dequantising a block at a time so that neither float32 copies of whole
+    inputs nor whole intermediate sums are allocated"""
+    mean: np.ndarray = np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+    for start, block in iter_mean_dequantised_blocks(
+        list_stored=list_stored, block_size=block_size
+    ):
+        if start == 0:
+            mean = np.empty(
+                (count_rows(list_stored=list_stored), block.shape[1]),
+                dtype=EMBEDDING_DTYPE,
+            )
+        mean[start : start + len(block)] = block
+
+    return mean
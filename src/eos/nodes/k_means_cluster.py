@@ -1,68 +1,117 @@
 import logging
-from typing import List, Tuple
+from typing import Optional, Tuple
 
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+
+from eos.data_interfaces.k_search_checkpoint_data_interface import (
+    KSearchCheckpointDataInterface,
+)
+from eos.nodes.encoding_precision import ENCODING_BLOCK_SIZE, mean_dequantised
+from eos.nodes.k_search import KSearch
+from eos.nodes.k_selection import KSelectionConfig, select_n_clusters
+from eos.nodes.segment_reduction import Aggregation, reduce_segments
 
 logger = logging.getLogger(__name__)
 
 
-def cluster_encoding(encoding: np.ndarray) -> np.ndarray:
+def search_clusters(
+    encoding: np.ndarray,
+    num_workers: int = 1,
+    k_search_checkpoint_data_interface: Optional[KSearchCheckpointDataInterface] = None,
+    k_selection_config: KSelectionConfig = KSelectionConfig(),
+) -> Tuple[int, np.ndarray]:
+    """Returns the number of clusters and labels of the KMeans fit of the best
+    score by the criterion of k_selection_config among numbers of clusters
+    from a fifth to a half of the number of rows which its strategy
+    evaluates"""
     # Identify the number of clusters
-    # TODO: Identify a better strategy to tune the hyperparameter grid
     n_lowest = encoding.shape[0] // 5
     n_highest = encoding.shape[0] // 2
-    silhouette_scores: List[Tuple[int, float]] = []
-    for n_clusters in range(n_lowest, n_highest):
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42).fit(encoding)
-        score = float(silhouette_score(encoding, kmeans.labels_))
-        silhouette_scores.append((n_clusters, score))
-
-    optimal_n_clusters = sorted(silhouette_scores, key=lambda x: x[1], reverse=True)[0][
-        0
-    ]
-
-    # Cluster with optimised hyperparameter
-    kmeans = KMeans(n_clusters=optimal_n_clusters, random_state=42).fit(encoding)
-    labels = kmeans.labels_
+    if n_highest <= n_lowest:
+        raise ValueError(
+            f"Too few rows ({encoding.shape[0]}) to search numbers of clusters"
+        )
+
+    # The best candidate is kept rather than fitted again
+    with KSearch(
+        encoding=encoding,
+        num_workers=num_workers,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+        criterion=k_selection_config.criterion,
+        sample_size=k_selection_config.sample_size,
+    ) as k_search:
+        select_n_clusters(
+            k_search=k_search,
+            n_lowest=n_lowest,
+            n_highest=n_highest - 1,
+            config=k_selection_config,
+        )
+
+        return k_search.best()
+
+
+def cluster_encoding(
+    encoding: np.ndarray,
+    num_workers: int = 1,
+    k_search_checkpoint_data_interface: Optional[KSearchCheckpointDataInterface] = None,
+    k_selection_config: KSelectionConfig = KSelectionConfig(),
+) -> np.ndarray:
+    """Labels encoding with the best KMeans fit found by search_clusters"""
+    _, labels = search_clusters(
+        encoding=encoding,
+        num_workers=num_workers,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+        k_selection_config=k_selection_config,
+    )
 
-    return labels  # type: ignore[no-any-return]
+    return labels
 
 
 def derive_sub_industry_encoding(
-    per_theme_encoding: np.ndarray, sub_industry_label: np.ndarray
+    per_theme_encoding: np.ndarray,
+    sub_industry_label: np.ndarray,
+    aggregation: Aggregation = Aggregation.mean,
 ) -> np.ndarray:
-    # Identify unique labels which are sorted by default
-    unique_labels = np.unique(sub_industry_label)
-    as_list_sub_industry_encoding = []
-
-    for label in unique_labels:
-        # Filter encodings by sub industry
-        grouped_theme_encoding = per_theme_encoding[sub_industry_label == label]
-
-        # Aggregate encodings within the group (mean pooling for now)
-        group_encoding = np.mean(grouped_theme_encoding, axis=0)
-
-        # Append sub industry encoding
-        as_list_sub_industry_encoding.append(group_encoding)
-
-    # Use ndarray instead of list
-    sub_industry_encoding = np.array(as_list_sub_industry_encoding)
+    """Aggregates encodings of themes per sub industry, in ascending order of
+    labels, in a single pass over themes"""
+    sub_industry_encoding = reduce_segments(
+        values=per_theme_encoding,
+        segment_ids=sub_industry_label,
+        aggregation=aggregation,
+    )
 
     return sub_industry_encoding
 
 
 def _cluster_for_sub_and_industries(
-    theme_encoding: np.ndarray, description_encoding: np.ndarray
+    theme_encoding: np.ndarray,
+    description_encoding: np.ndarray,
+    block_size: int = ENCODING_BLOCK_SIZE,
+    num_workers: int = 1,
+    k_search_checkpoint_data_interface: Optional[KSearchCheckpointDataInterface] = None,
+    k_selection_config: KSelectionConfig = KSelectionConfig(),
+    aggregation: Aggregation = Aggregation.mean,
 ) -> Tuple[np.ndarray, np.ndarray]:
+    """Encodings may be stored at any EncodingPrecision and memory-mapped, and
+    are dequantised block_size rows at a time. Candidate numbers of clusters
+    are fitted in num_workers processes and chosen among as
+    k_selection_config decides. With a checkpoint data interface, an
+    interrupted search resumes where it stopped. Encodings of themes are
+    aggregated into those of sub industries as aggregation decides"""
     # Average encodings as a simple baseline
     # Sector encoding is ignored if all input data is of the same sector
     # TODO: Experiment with transformer or GCN based embedding aggregation
-    per_theme_encoding = (theme_encoding + description_encoding) / 2
+    per_theme_encoding = mean_dequantised(
+        list_stored=[theme_encoding, description_encoding], block_size=block_size
+    )
 
     # Cluster for sub industry level
-    sub_industry_label = cluster_encoding(per_theme_encoding)
+    sub_industry_label = cluster_encoding(
+        encoding=per_theme_encoding,
+        num_workers=num_workers,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+        k_selection_config=k_selection_config,
+    )
 
     logger.info(
         f"Clustering results in {len(np.unique(sub_industry_label))} "
@@ -71,11 +120,18 @@ def _cluster_for_sub_and_industries(
 
     # Aggregate per theme encoding to obtain per sub industry encoding
     per_sub_industry_encoding = derive_sub_industry_encoding(
-        per_theme_encoding=per_theme_encoding, sub_industry_label=sub_industry_label
+        per_theme_encoding=per_theme_encoding,
+        sub_industry_label=sub_industry_label,
+        aggregation=aggregation,
     )
 
     # Cluster for industry level
-    industry_label = cluster_encoding(per_sub_industry_encoding)
+    industry_label = cluster_encoding(
+        encoding=per_sub_industry_encoding,
+        num_workers=num_workers,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+        k_selection_config=k_selection_config,
+    )
 
     logger.info(
         f"Clustering results in {len(np.unique(industry_label))} " "industry labels"
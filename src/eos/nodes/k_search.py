@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from enum import Enum
+from pathlib import Path
+from types import TracebackType
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import (
+    calinski_harabasz_score,
+    davies_bouldin_score,
+    pairwise_distances,
+    silhouette_score,
+)
+
+from eos.data_interfaces.k_search_checkpoint_data_interface import (
+    KCandidate,
+    KSearchCheckpoint,
+    KSearchCheckpointDataInterface,
+)
+
+logger = logging.getLogger(__name__)
+
+RANDOM_STATE = 42
+SILHOUETTE_SAMPLE_SIZE = 2000
+
+
+class KCriterion(str, Enum):
+    """Scores of KMeans candidates, higher being better for all of them"""
+
+    # Exact, over pairwise distances computed once per encoding, O(n^2)
+    silhouette = "silhouette"
+    # Over a sample of rows drawn with the random state, O(sample^2)
+    sampled_silhouette = "sampled_silhouette"
+    calinski_harabasz = "calinski_harabasz"  # O(n k)
+    davies_bouldin = "davies_bouldin"  # Negated, O(n k)
+
+
+# Encoding and distances of the current worker process, set by _init_worker
+_worker_encoding: Optional[np.ndarray] = None
+_worker_distances: Optional[np.ndarray] = None
+
+
+def score_labels(
+    encoding: np.ndarray,
+    labels: np.ndarray,
+    criterion: KCriterion = KCriterion.silhouette,
+    distances: Optional[np.ndarray] = None,
+    sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+    random_state: int = RANDOM_STATE,
+) -> float:
+    """Distances, if given, are pairwise distances between rows of encoding
+    reused by the exact silhouette"""
+    if criterion == KCriterion.silhouette:
+        if distances is not None:
+            return float(silhouette_score(distances, labels, metric="precomputed"))
+        return float(silhouette_score(encoding, labels))
+    if criterion == KCriterion.sampled_silhouette:
+        return float(
+            silhouette_score(
+                encoding,
+                labels,
+                sample_size=min(sample_size, len(encoding)),
+                random_state=random_state,
+            )
+        )
+    if criterion == KCriterion.calinski_harabasz:
+        return float(calinski_harabasz_score(encoding, labels))
+
+    return -float(davies_bouldin_score(encoding, labels))
+
+
+def fit_candidate(
+    encoding: np.ndarray,
+    n_clusters: int,
+    random_state: int = RANDOM_STATE,
+    criterion: KCriterion = KCriterion.silhouette,
+    distances: Optional[np.ndarray] = None,
+    sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+) -> Tuple[float, np.ndarray]:
+    """Returns the score by criterion and labels of a KMeans fit"""
+    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state).fit(encoding)
+    labels: np.ndarray = kmeans.labels_
+    score = score_labels(
+        encoding=encoding,
+        labels=labels,
+        criterion=criterion,
+        distances=distances,
+        sample_size=sample_size,
+        random_state=random_state,
+    )
+
+    return score, labels
+
+
+def digest_search(
+    encoding: np.ndarray,
+    random_state: int,
+    criterion: KCriterion = KCriterion.silhouette,
+    sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+) -> str:
+    """Identifies a search by the encoding searched and its settings"""
+    encoding = np.ascontiguousarray(encoding)
+
+    settings = f"{encoding.dtype.str}{encoding.shape}{random_state}{criterion.value}"
+    if criterion == KCriterion.sampled_silhouette:
+        settings += str(sample_size)
+
+    search_hash = hashlib.blake2b(digest_size=16)
+    search_hash.update(settings.encode())
+    search_hash.update(memoryview(encoding).cast("B"))
+
+    return search_hash.hexdigest()
+
+
+def _init_worker(
+    encoding: np.ndarray, path_distances: Optional[Path], num_threads: int
+) -> None:
+    global _worker_encoding, _worker_distances
+
+    # Workers share cores so each one must not spawn a thread per core
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=num_threads)
+
+    _worker_encoding = encoding
+    # Memory-mapped so that all workers read the same pages of one file
+    if path_distances is not None:
+        _worker_distances = np.load(path_distances, mmap_mode="r")
+
+
+def _fit_candidate_in_worker(
+    n_clusters: int, random_state: int, criterion: KCriterion, sample_size: int
+) -> Tuple[int, float, np.ndarray]:
+    if _worker_encoding is None:
+        raise RuntimeError("K search worker has not received an encoding")
+
+    score, labels = fit_candidate(
+        encoding=_worker_encoding,
+        n_clusters=n_clusters,
+        random_state=random_state,
+        criterion=criterion,
+        distances=_worker_distances,
+        sample_size=sample_size,
+    )
+
+    return n_clusters, score, labels
+
+
+class KSearch:
+    """Fits and scores KMeans candidates of an encoding for given numbers of
+    clusters, in num_workers processes if more than one, and keeps the labels
+    of the best candidate so that it never has to be fitted again. Scores are
+    remembered across calls of evaluate and, with a checkpoint data
+    interface, across runs, so an interrupted search resumes with candidates
+    not yet evaluated. For the exact silhouette, pairwise distances are
+    computed once and shared by all candidates, through a memory-mapped
+    temporary file with workers. Use as a context manager to shut down the
+    workers and remove the file"""
+
+    def __init__(
+        self,
+        encoding: np.ndarray,
+        num_workers: int = 1,
+        k_search_checkpoint_data_interface: Optional[
+            KSearchCheckpointDataInterface
+        ] = None,
+        random_state: int = RANDOM_STATE,
+        criterion: KCriterion = KCriterion.silhouette,
+        sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+    ) -> None:
+        if num_workers < 1:
+            raise ValueError(f"Number of workers must be positive, got {num_workers}")
+
+        self.encoding = encoding
+        self.random_state = random_state
+        self.criterion = criterion
+        self.sample_size = sample_size
+        self.k_search_checkpoint_data_interface = k_search_checkpoint_data_interface
+        self.search_key = digest_search(
+            encoding=encoding,
+            random_state=random_state,
+            criterion=criterion,
+            sample_size=sample_size,
+        )
+
+        self.scores: Dict[int, float] = {}
+        self.best_n_clusters: Optional[int] = None
+        self.best_labels: Optional[np.ndarray] = None
+        if k_search_checkpoint_data_interface is not None:
+            checkpointed = k_search_checkpoint_data_interface.load(
+                search_key=self.search_key
+            )
+            if checkpointed is not None:
+                checkpoint, self.best_labels = checkpointed
+                self.best_n_clusters = checkpoint.best_n_clusters
+                self.scores = {
+                    candidate.n_clusters: candidate.score
+                    for candidate in checkpoint.candidates
+                }
+
+        self.distances: Optional[np.ndarray] = None
+        self.dir_distances: Optional[tempfile.TemporaryDirectory[str]] = None
+        path_distances: Optional[Path] = None
+        if criterion == KCriterion.silhouette:
+            self.distances = pairwise_distances(encoding).astype(np.float32)
+            logger.info(
+                f"Computed pairwise distances of {len(encoding)} rows taking "
+                f"{self.distances.nbytes / (1 << 20):.1f} MiB for exact silhouettes"
+            )
+
+            if num_workers > 1:
+                self.dir_distances = tempfile.TemporaryDirectory()
+                path_distances = Path(self.dir_distances.name) / "distances.npy"
+                np.save(path_distances, self.distances)
+
+        # Spawned rather than forked so that no OpenMP state is inherited
+        self.executor: Optional[ProcessPoolExecutor] = None
+        if num_workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    encoding,
+                    path_distances,
+                    max(1, (os.cpu_count() or 1) // num_workers),
+                ),
+            )
+
+    def __enter__(self) -> KSearch:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.dir_distances is not None:
+            self.dir_distances.cleanup()
+
+    def evaluate(self, list_n_clusters: List[int]) -> Dict[int, float]:
+        """Returns scores of the given numbers of clusters, fitting only
+        candidates which have not been evaluated before"""
+        list_n_clusters_new = sorted(set(list_n_clusters) - set(self.scores))
+        if len(list_n_clusters_new) > 0:
+            logger.info(
+                f"Fitting {len(list_n_clusters_new)} KMeans candidates with "
+                f"{list_n_clusters_new[0]} to {list_n_clusters_new[-1]} clusters"
+            )
+
+        if self.executor is None:
+            for n_clusters in list_n_clusters_new:
+                score, labels = fit_candidate(
+                    encoding=self.encoding,
+                    n_clusters=n_clusters,
+                    random_state=self.random_state,
+                    criterion=self.criterion,
+                    distances=self.distances,
+                    sample_size=self.sample_size,
+                )
+                self._record(n_clusters=n_clusters, score=score, labels=labels)
+        else:
+            futures: List[Future[Tuple[int, float, np.ndarray]]] = [
+                self.executor.submit(
+                    _fit_candidate_in_worker,
+                    n_clusters,
+                    self.random_state,
+                    self.criterion,
+                    self.sample_size,
+                )
+                for n_clusters in list_n_clusters_new
+            ]
+            for future in as_completed(futures):
+                n_clusters, score, labels = future.result()
+                self._record(n_clusters=n_clusters, score=score, labels=labels)
+
+        return {n_clusters: self.scores[n_clusters] for n_clusters in list_n_clusters}
+
+    def _record(self, n_clusters: int, score: float, labels: np.ndarray) -> None:
+        self.scores[n_clusters] = score
+
+        # Ties go to fewer clusters whatever order candidates finish in
+        if (
+            self.best_n_clusters is None
+            or self.best_labels is None
+            or (score, -n_clusters)
+            > (self.scores[self.best_n_clusters], -self.best_n_clusters)
+        ):
+            self.best_n_clusters = n_clusters
+            self.best_labels = labels
+
+        if self.k_search_checkpoint_data_interface is not None:
+            self.k_search_checkpoint_data_interface.save(
+                checkpoint=KSearchCheckpoint(
+                    search_key=self.search_key,
+                    candidates=[
+                        KCandidate(n_clusters=k, score=k_score)
+                        for k, k_score in sorted(self.scores.items())
+                    ],
+                    best_n_clusters=self.best_n_clusters,
+                ),
+                best_labels=self.best_labels,
+            )
+
+    def best(self) -> Tuple[int, np.ndarray]:
+        """Returns the number of clusters and labels of the best candidate"""
+        if self.best_n_clusters is None or self.best_labels is None:
+            raise ValueError("No KMeans candidates have been evaluated")
+
+        return self.best_n_clusters, self.best_labels
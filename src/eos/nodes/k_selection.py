@@ -0,0 +1,196 @@
+import logging
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from eos.nodes.k_search import SILHOUETTE_SAMPLE_SIZE, KCriterion, KSearch
+
+logger = logging.getLogger(__name__)
+
+INVERSE_GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+class KSelection(str, Enum):
+    exhaustive = "exhaustive"  # Every candidate in the range
+    coarse_to_fine = "coarse_to_fine"  # Grids narrowing around the best candidate
+    golden_section = "golden_section"  # Bracketing, assuming one peak of scores
+
+
+@dataclass(frozen=True)
+class KSelectionConfig:
+    strategy: KSelection = KSelection.exhaustive
+    budget: Optional[int] = None  # Most candidates evaluated, unlimited if None
+    num_points: int = 8  # Candidates per round of coarse_to_fine
+    # Rounds stop once they raise the best score by no more than this
+    min_improvement: Optional[float] = None
+    criterion: KCriterion = KCriterion.silhouette  # Score candidates are ranked by
+    sample_size: int = SILHOUETTE_SAMPLE_SIZE  # Rows of a sampled silhouette
+
+
+def spread_n_clusters(n_lowest: int, n_highest: int, num: int) -> List[int]:
+    """Returns at most num evenly spread numbers of clusters from n_lowest to
+    n_highest inclusive, always including both ends if num > 1"""
+    if num <= 0:
+        return []
+    if num == 1:
+        return [(n_lowest + n_highest) // 2]
+
+    return sorted(set(np.linspace(n_lowest, n_highest, num).round().astype(int)))
+
+
+class _Budget:
+    def __init__(self, k_search: KSearch, budget: Optional[int]) -> None:
+        self.k_search = k_search
+        self.budget = budget
+        self.num_start = len(k_search.scores)
+
+    def remaining(self) -> Optional[int]:
+        if self.budget is None:
+            return None
+
+        return max(0, self.budget - (len(self.k_search.scores) - self.num_start))
+
+    def evaluate(self, list_n_clusters: List[int]) -> Dict[int, float]:
+        """Evaluates candidates while the budget lasts, spreading them out if
+        not all of them fit in it, and returns scores of those evaluated"""
+        remaining = self.remaining()
+        list_n_clusters_new = sorted(set(list_n_clusters) - set(self.k_search.scores))
+        if remaining is not None and len(list_n_clusters_new) > remaining:
+            list_n_clusters_new = [
+                list_n_clusters_new[i]
+                for i in spread_n_clusters(0, len(list_n_clusters_new) - 1, remaining)
+            ]
+        self.k_search.evaluate(list_n_clusters=list_n_clusters_new)
+
+        return {
+            n_clusters: self.k_search.scores[n_clusters]
+            for n_clusters in list_n_clusters
+            if n_clusters in self.k_search.scores
+        }
+
+
+def _best_in_range(k_search: KSearch, n_lowest: int, n_highest: int) -> int:
+    return max(
+        (k for k in k_search.scores if n_lowest <= k <= n_highest),
+        key=lambda k: (k_search.scores[k], -k),
+    )
+
+
+def _is_stalled(
+    previous_score: Optional[float], score: float, min_improvement: Optional[float]
+) -> bool:
+    return (
+        min_improvement is not None
+        and previous_score is not None
+        and score - previous_score <= min_improvement
+    )
+
+
+def search_exhaustive(
+    k_search: KSearch, n_lowest: int, n_highest: int, config: KSelectionConfig
+) -> None:
+    _Budget(k_search=k_search, budget=config.budget).evaluate(
+        list_n_clusters=list(range(n_lowest, n_highest + 1))
+    )
+
+
+def search_coarse_to_fine(
+    k_search: KSearch, n_lowest: int, n_highest: int, config: KSelectionConfig
+) -> None:
+    """Evaluates num_points candidates spread over the range, then over the
+    range between the neighbours of the best candidate, until neighbours are
+    adjacent numbers. Candidates of a round are evaluated in parallel"""
+    if config.num_points < 3:
+        raise ValueError(
+            f"Coarse to fine needs 3 points a round, got {config.num_points}"
+        )
+
+    budget = _Budget(k_search=k_search, budget=config.budget)
+    lowest, highest = n_lowest, n_highest
+    previous_score: Optional[float] = None
+    while budget.remaining() != 0:
+        list_n_clusters = spread_n_clusters(lowest, highest, config.num_points)
+        budget.evaluate(list_n_clusters=list_n_clusters)
+
+        best_n_clusters = _best_in_range(k_search, n_lowest, n_highest)
+        score = k_search.scores[best_n_clusters]
+        step = max(
+            (b - a for a, b in zip(list_n_clusters, list_n_clusters[1:])), default=0
+        )
+        if step <= 1 or _is_stalled(previous_score, score, config.min_improvement):
+            break
+
+        previous_score = score
+        lowest = max(n_lowest, best_n_clusters - step + 1)
+        highest = min(n_highest, best_n_clusters + step - 1)
+
+
+def search_golden_section(
+    k_search: KSearch, n_lowest: int, n_highest: int, config: KSelectionConfig
+) -> None:
+    """Narrows a bracket by comparing two inner candidates at golden ratio
+    points, reusing one of them each step, then evaluates what is left of the
+    bracket. Finds the best candidate if scores rise to a single peak and then
+    fall, and a local peak otherwise"""
+    budget = _Budget(k_search=k_search, budget=config.budget)
+
+    def inner(lowest: int, highest: int) -> List[int]:
+        offset = round((highest - lowest) * INVERSE_GOLDEN_RATIO)
+        return [highest - offset, lowest + offset]
+
+    lowest, highest = n_lowest, n_highest
+    previous_score: Optional[float] = None
+    # Narrower brackets have no two distinct inner points
+    while highest - lowest > 4:
+        scores = budget.evaluate(list_n_clusters=inner(lowest, highest))
+        if len(scores) < 2:
+            return
+
+        left, right = inner(lowest, highest)
+        if scores[left] >= scores[right]:
+            highest = right
+        else:
+            lowest = left
+
+        score = k_search.scores[_best_in_range(k_search, n_lowest, n_highest)]
+        if _is_stalled(previous_score, score, config.min_improvement):
+            return
+        previous_score = score
+
+    budget.evaluate(list_n_clusters=list(range(lowest, highest + 1)))
+
+
+K_SELECTION_TO_SEARCH: Dict[
+    KSelection, Callable[[KSearch, int, int, KSelectionConfig], None]
+] = {
+    KSelection.exhaustive: search_exhaustive,
+    KSelection.coarse_to_fine: search_coarse_to_fine,
+    KSelection.golden_section: search_golden_section,
+}
+
+
+def select_n_clusters(
+    k_search: KSearch, n_lowest: int, n_highest: int, config: KSelectionConfig
+) -> int:
+    """Evaluates candidates from n_lowest to n_highest inclusive as the
+    strategy of config decides and returns the best number of clusters"""
+    if n_highest < n_lowest:
+        raise ValueError(f"No numbers of clusters from {n_lowest} to {n_highest}")
+    if config.budget is not None and config.budget < 1:
+        raise ValueError(f"Budget must be positive, got {config.budget}")
+
+    num_start = len(k_search.scores)
+    K_SELECTION_TO_SEARCH[config.strategy](k_search, n_lowest, n_highest, config)
+
+    best_n_clusters = _best_in_range(k_search, n_lowest, n_highest)
+    logger.info(
+        f"Selected {best_n_clusters} clusters by {config.strategy.value} search "
+        f"of {config.criterion.value} over {n_lowest} to {n_highest} after "
+        f"evaluating "
+        f"{len(k_search.scores) - num_start} new candidates"
+    )
+
+    return best_n_clusters
@@ -0,0 +1,267 @@
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import pairwise_distances_argmin_min
+
+from eos.data_interfaces.embedding_cache_data_interface import EMBEDDING_DTYPE
+from eos.data_interfaces.k_search_checkpoint_data_interface import (
+    KSearchCheckpointDataInterface,
+)
+from eos.nodes.encoding_precision import (
+    ENCODING_BLOCK_SIZE,
+    count_rows,
+    iter_mean_dequantised_blocks,
+    mean_dequantised_rows,
+)
+from eos.nodes.k_means_cluster import cluster_encoding, search_clusters
+from eos.nodes.k_search import RANDOM_STATE
+from eos.nodes.k_selection import KSelectionConfig
+from eos.nodes.segment_reduction import Aggregation, distance_weights, segment_sum
+
+logger = logging.getLogger(__name__)
+
+
+class ClusterBackend(str, Enum):
+    kmeans = "kmeans"  # Averaged encodings held in memory
+    mini_batch = "mini_batch"  # Encodings streamed a block at a time
+
+
+@dataclass(frozen=True)
+class MiniBatchConfig:
+    n_clusters: Optional[int] = None  # Searched on a sample of rows if None
+    sample_size: int = 10000  # Rows the number of clusters is searched on
+    batch_size: int = 1024  # Rows of each update of centres
+    num_epochs: int = 3  # Streaming passes updating centres
+    random_state: int = RANDOM_STATE
+
+
+def sample_rows(
+    num_rows: int, sample_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    # Sorted so that memory-mapped rows are read front to back
+    return np.sort(rng.choice(num_rows, size=min(sample_size, num_rows), replace=False))
+
+
+def estimate_n_clusters(
+    list_stored: List[np.ndarray],
+    mini_batch_config: MiniBatchConfig = MiniBatchConfig(),
+    num_workers: int = 1,
+    k_search_checkpoint_data_interface: Optional[KSearchCheckpointDataInterface] = None,
+    k_selection_config: KSelectionConfig = KSelectionConfig(),
+) -> int:
+    """Searches numbers of clusters on a sample of rows as for in-memory
+    clustering and scales the best one to all rows, so that it remains the
+    same fraction of the number of rows"""
+    num_rows = count_rows(list_stored=list_stored)
+    rows = sample_rows(
+        num_rows=num_rows,
+        sample_size=mini_batch_config.sample_size,
+        rng=np.random.default_rng(seed=mini_batch_config.random_state),
+    )
+
+    n_clusters_sample, _ = search_clusters(
+        encoding=mean_dequantised_rows(list_stored=list_stored, rows=rows),
+        num_workers=num_workers,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+        k_selection_config=k_selection_config,
+    )
+    n_clusters = max(1, round(n_clusters_sample * num_rows / len(rows)))
+
+    logger.info(
+        f"Estimated {n_clusters} clusters of {num_rows} rows from "
+        f"{n_clusters_sample} clusters of a sample of {len(rows)} rows"
+    )
+
+    return n_clusters
+
+
+def fit_mini_batch_kmeans(
+    list_stored: List[np.ndarray],
+    n_clusters: int,
+    block_size: int = ENCODING_BLOCK_SIZE,
+    mini_batch_config: MiniBatchConfig = MiniBatchConfig(),
+) -> np.ndarray:
+    """Fits n_clusters centres to the average of stored encodings, which may be
+    memory-mapped. Centres are initialised on a sample of rows, then updated
+    with batches of shuffled rows of blocks visited in random order, for
+    num_epochs passes over the rows. Only one block of rows is held at a
+    time"""
+    num_rows = count_rows(list_stored=list_stored)
+    if not 1 <= n_clusters <= num_rows:
+        raise ValueError(f"Cannot fit {n_clusters} clusters to {num_rows} rows")
+    if mini_batch_config.batch_size < 1:
+        raise ValueError(
+            f"Batch size must be positive, got {mini_batch_config.batch_size}"
+        )
+    if mini_batch_config.num_epochs < 1:
+        raise ValueError(
+            f"Number of epochs must be positive, got {mini_batch_config.num_epochs}"
+        )
+
+    rng = np.random.default_rng(seed=mini_batch_config.random_state)
+    model = MiniBatchKMeans(
+        n_clusters=n_clusters,
+        batch_size=mini_batch_config.batch_size,
+        compute_labels=False,
+        random_state=mini_batch_config.random_state,
+    )
+
+    # Initialisation needs at least n_clusters rows, sampled as by fit
+    rows = sample_rows(
+        num_rows=num_rows,
+        sample_size=max(3 * n_clusters, mini_batch_config.batch_size),
+        rng=rng,
+    )
+    model.partial_fit(mean_dequantised_rows(list_stored=list_stored, rows=rows))
+
+    list_start = list(range(0, num_rows, block_size))
+    for epoch in range(mini_batch_config.num_epochs):
+        for _, block in iter_mean_dequantised_blocks(
+            list_stored=list_stored,
+            block_size=block_size,
+            list_start=[list_start[i] for i in rng.permutation(len(list_start))],
+        ):
+            block = block[rng.permutation(len(block))]
+            for start in range(0, len(block), mini_batch_config.batch_size):
+                model.partial_fit(block[start : start + mini_batch_config.batch_size])
+
+        logger.info(
+            f"Updated {n_clusters} centres over {num_rows} rows in epoch "
+            f"{epoch + 1} of {mini_batch_config.num_epochs}"
+        )
+
+    centres: np.ndarray = model.cluster_centers_
+
+    return centres
+
+
+def assign_to_centres(
+    centres: np.ndarray,
+    list_stored: List[np.ndarray],
+    block_size: int = ENCODING_BLOCK_SIZE,
+    aggregation: Aggregation = Aggregation.mean,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns labels of the average of stored encodings by the nearest of
+    centres and the aggregated encoding of each cluster, in one more pass over
+    a block at a time, or two for a weighted mean, whose centroids are the
+    centres. Clusters no row is nearest to are dropped and labels renumbered,
+    so that labels are consecutive as those of KMeans"""
+    num_rows = count_rows(list_stored=list_stored)
+    n_clusters, dim = centres.shape
+
+    labels = np.empty(num_rows, dtype=np.int32)
+    distances = np.empty(num_rows, dtype=EMBEDDING_DTYPE)
+    sums = np.zeros((n_clusters, dim), dtype=np.float64)
+    for start, block in iter_mean_dequantised_blocks(
+        list_stored=list_stored, block_size=block_size
+    ):
+        block_labels, block_distances = pairwise_distances_argmin_min(block, centres)
+        labels[start : start + len(block)] = block_labels
+        distances[start : start + len(block)] = block_distances
+        sums += segment_sum(
+            values=block, segment_ids=block_labels, num_segments=n_clusters
+        )
+
+    counts = np.bincount(labels, minlength=n_clusters)
+    non_empty = counts > 0
+    weight_sums = counts.astype(np.float64)
+
+    if aggregation == Aggregation.weighted_mean:
+        scales = np.bincount(labels, weights=distances, minlength=n_clusters)
+        scales[non_empty] /= counts[non_empty]
+
+        sums[:] = 0.0
+        for start, block in iter_mean_dequantised_blocks(
+            list_stored=list_stored, block_size=block_size
+        ):
+            block_labels = labels[start : start + len(block)]
+            sums += segment_sum(
+                values=block,
+                segment_ids=block_labels,
+                num_segments=n_clusters,
+                weights=distance_weights(
+                    distances=distances[start : start + len(block)],
+                    scales=scales[block_labels],
+                ),
+            )
+        weight_sums = np.bincount(
+            labels,
+            weights=distance_weights(distances=distances, scales=scales[labels]),
+            minlength=n_clusters,
+        )
+
+    if not non_empty.all():
+        logger.info(f"Dropping {n_clusters - non_empty.sum()} empty clusters")
+        labels = (np.cumsum(non_empty, dtype=np.int32) - 1)[labels]
+
+    if aggregation == Aggregation.sum:
+        cluster_encoding = sums[non_empty].astype(EMBEDDING_DTYPE)
+    else:
+        cluster_encoding = (
+            sums[non_empty] / weight_sums[non_empty, np.newaxis]
+        ).astype(EMBEDDING_DTYPE)
+
+    return labels, cluster_encoding
+
+
+def _cluster_for_sub_and_industries_streamed(
+    theme_encoding: np.ndarray,
+    description_encoding: np.ndarray,
+    block_size: int = ENCODING_BLOCK_SIZE,
+    num_workers: int = 1,
+    k_search_checkpoint_data_interface: Optional[KSearchCheckpointDataInterface] = None,
+    k_selection_config: KSelectionConfig = KSelectionConfig(),
+    mini_batch_config: MiniBatchConfig = MiniBatchConfig(),
+    aggregation: Aggregation = Aggregation.mean,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Clusters themes as _cluster_for_sub_and_industries does, but with
+    MiniBatchKMeans over encodings streamed a block_size rows at a time, so
+    that encodings larger than memory can be clustered. Sub industries,
+    whose encodings are accumulated while themes are labelled, are few enough
+    to be clustered in memory"""
+    list_stored = [theme_encoding, description_encoding]
+
+    # Cluster for sub industry level
+    n_clusters = mini_batch_config.n_clusters
+    if n_clusters is None:
+        n_clusters = estimate_n_clusters(
+            list_stored=list_stored,
+            mini_batch_config=mini_batch_config,
+            num_workers=num_workers,
+            k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+            k_selection_config=k_selection_config,
+        )
+    centres = fit_mini_batch_kmeans(
+        list_stored=list_stored,
+        n_clusters=n_clusters,
+        block_size=block_size,
+        mini_batch_config=mini_batch_config,
+    )
+    sub_industry_label, per_sub_industry_encoding = assign_to_centres(
+        centres=centres,
+        list_stored=list_stored,
+        block_size=block_size,
+        aggregation=aggregation,
+    )
+
+    logger.info(
+        f"Clustering results in {len(per_sub_industry_encoding)} sub industry labels"
+    )
+
+    # Cluster for industry level
+    industry_label = cluster_encoding(
+        encoding=per_sub_industry_encoding,
+        num_workers=num_workers,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+        k_selection_config=k_selection_config,
+    )
+
+    logger.info(
+        f"Clustering results in {len(np.unique(industry_label))} industry labels"
+    )
+
+    return sub_industry_label, industry_label
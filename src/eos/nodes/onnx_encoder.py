@@ -0,0 +1,299 @@
+import inspect
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from eos.data_interfaces.embedding_cache_data_interface import EMBEDDING_DTYPE
+from eos.data_interfaces.onnx_encoder_data_interface import (
+    OnnxEncoderConfig,
+    OnnxEncoderDataInterface,
+    PoolingMode,
+)
+from eos.nodes.encode_features import TextEncoder, encode_list_text
+from eos.nodes.encode_pool import chunk_by_length
+
+logger = logging.getLogger(__name__)
+
+ONNX_OPSET_VERSION = 14
+MIN_COSINE_SIMILARITY = 0.99  # Against PyTorch encodings of the same texts
+
+
+def pool_token_embeddings(
+    token_embeddings: np.ndarray,
+    attention_mask: np.ndarray,
+    pooling_mode: PoolingMode,
+) -> np.ndarray:
+    """Reduces (batch, sequence, dim) token embeddings to sentence embeddings
+    as the Pooling module of a sentence transformer does"""
+    if pooling_mode == PoolingMode.cls:
+        cls_embeddings: np.ndarray = token_embeddings[:, 0]
+        return cls_embeddings
+
+    mask = attention_mask[:, :, np.newaxis].astype(token_embeddings.dtype)
+    if pooling_mode == PoolingMode.max:
+        max_embeddings: np.ndarray = np.where(
+            mask > 0, token_embeddings, np.finfo(token_embeddings.dtype).min
+        ).max(axis=1)
+        return max_embeddings
+
+    mean_embeddings: np.ndarray = (token_embeddings * mask).sum(axis=1) / np.clip(
+        mask.sum(axis=1), 1e-9, None
+    )
+
+    return mean_embeddings
+
+
+def get_pooling_mode(pooling_config: Dict[str, Any]) -> PoolingMode:
+    """Reads the pooling mode from the config of a Pooling module, which holds
+    either a pooling_mode value or one pooling_mode_*_tokens flag per mode"""
+    if "pooling_mode" in pooling_config:
+        return PoolingMode(pooling_config["pooling_mode"])
+
+    flag_to_pooling_mode = {
+        "pooling_mode_cls_token": PoolingMode.cls,
+        "pooling_mode_mean_tokens": PoolingMode.mean,
+        "pooling_mode_max_tokens": PoolingMode.max,
+    }
+    pooling_modes = [
+        pooling_mode
+        for flag, pooling_mode in flag_to_pooling_mode.items()
+        if pooling_config.get(flag, False)
+    ]
+    other_flags = [
+        key
+        for key, value in pooling_config.items()
+        if key.startswith("pooling_mode_") and key not in flag_to_pooling_mode and value
+    ]
+    if len(pooling_modes) != 1 or len(other_flags) > 0:
+        raise ValueError(
+            f"Pooling config {pooling_config} does not set exactly one of "
+            f"{[pooling_mode.value for pooling_mode in PoolingMode]}"
+        )
+
+    return pooling_modes[0]
+
+
+def min_cosine_similarity(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Returns the lowest cosine similarity between paired rows"""
+    if len(reference) == 0:
+        raise ValueError("Cannot compare encodings without any reference rows")
+
+    dot = (reference * candidate).sum(axis=1)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+
+    return float((dot / np.clip(norms, 1e-12, None)).min())
+
+
+class OnnxEncoder:
+    """Encodes texts with a sentence transformer exported by
+    export_onnx_encoder, running its graph with ONNX Runtime on CPU and its
+    pooling and normalisation with NumPy. Only numpy, onnxruntime and the
+    tokenizer are loaded, not torch"""
+
+    def __init__(
+        self,
+        path_dir_onnx: Path,
+        quantised: bool = False,
+        batch_size: int = 32,
+        num_threads: Optional[int] = None,
+    ) -> None:
+        onnx_encoder_data_interface = OnnxEncoderDataInterface(dirpath=path_dir_onnx)
+        config = onnx_encoder_data_interface.load_config()
+        if config is None:
+            raise ValueError(f"No ONNX encoder has been exported to {path_dir_onnx}")
+        if quantised and not config.quantised:
+            raise ValueError(
+                f"No int8 ONNX encoder has been exported to {path_dir_onnx}"
+            )
+
+        self.config = config
+        self.batch_size = batch_size
+        self.tokenizer = onnx_encoder_data_interface.load_tokenizer()
+        self.session = onnx_encoder_data_interface.load_session(
+            quantised=quantised, num_threads=num_threads
+        )
+
+    def encode(
+        self,
+        sentences: List[str],
+        show_progress_bar: bool,
+        batch_size: Optional[int] = None,
+    ) -> np.ndarray:
+        batches = chunk_by_length(
+            list_text=sentences,
+            chunk_size=self.batch_size if batch_size is None else batch_size,
+        )
+
+        encoding = np.empty((len(sentences), 0), dtype=EMBEDDING_DTYPE)
+        for i, batch in enumerate(batches):
+            batch_encoding = self._encode_batch(list_text=[sentences[j] for j in batch])
+            if i == 0:
+                encoding = np.empty(
+                    (len(sentences), batch_encoding.shape[1]), dtype=EMBEDDING_DTYPE
+                )
+            encoding[batch] = batch_encoding
+
+            if show_progress_bar and (i + 1) % 100 == 0:
+                logger.info(f"Encoded {i + 1} of {len(batches)} batches of texts")
+
+        return encoding
+
+    def _encode_batch(self, list_text: List[str]) -> np.ndarray:
+        inputs = self.tokenizer(
+            list_text,
+            padding=True,
+            truncation=True,
+            max_length=self.config.max_seq_length,
+            return_tensors="np",
+        )
+        (token_embeddings,) = self.session.run(
+            ["token_embeddings"],
+            {name: inputs[name].astype(np.int64) for name in self.config.input_names},
+        )
+
+        embeddings = pool_token_embeddings(
+            token_embeddings=token_embeddings,
+            attention_mask=inputs["attention_mask"],
+            pooling_mode=self.config.pooling_mode,
+        )
+        if self.config.normalize:
+            embeddings = embeddings / np.clip(
+                np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None
+            )
+
+        batch_encoding: np.ndarray = embeddings.astype(EMBEDDING_DTYPE)
+
+        return batch_encoding
+
+
+def load_onnx_encoder(
+    path_model: Path, quantised: bool = False, num_threads: Optional[int] = None
+) -> TextEncoder:
+    """Model loader of OnnxEncoder objects for EncodePool workers"""
+    return OnnxEncoder(
+        path_dir_onnx=path_model, quantised=quantised, num_threads=num_threads
+    )
+
+
+def export_onnx_encoder(
+    path_sentence_transformer: Path,
+    path_dir_onnx: Path,
+    model_digest: str,
+    quantise: bool,
+    list_text_check: List[str],
+) -> OnnxEncoderConfig:
+    """Exports the transformer of a sentence transformer to an ONNX graph
+    emitting token embeddings, optionally quantises its weights to int8, and
+    fails unless encodings of list_text_check by each exported graph stay
+    within MIN_COSINE_SIMILARITY of PyTorch encodings. An export of the same
+    model is reused"""
+    onnx_encoder_data_interface = OnnxEncoderDataInterface(dirpath=path_dir_onnx)
+    config = onnx_encoder_data_interface.load_config()
+    if (
+        config is not None
+        and config.model_digest == model_digest
+        and (config.quantised or not quantise)
+    ):
+        logger.info(f"Reusing ONNX encoder exported to {path_dir_onnx}")
+        return config
+    if len(list_text_check) == 0:
+        raise ValueError("Cannot check an ONNX export without any texts")
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize
+
+    model: Any = SentenceTransformer(model_name_or_path=str(path_sentence_transformer))
+    transformer: Any = model[0]
+    pooling: Any = model[1]
+
+    path_dir_onnx.mkdir(parents=True, exist_ok=True)
+    onnx_encoder_data_interface.path_config.unlink(missing_ok=True)
+    transformer.tokenizer.save_pretrained(
+        str(onnx_encoder_data_interface.path_dir_tokenizer)
+    )
+
+    dummy_inputs = transformer.tokenizer(
+        ["An example text to trace the graph with"], return_tensors="pt"
+    )
+    input_names: List[str] = list(dummy_inputs.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    # Later versions of torch default to an exporter needing onnxscript
+    export_kwargs: Dict[str, Any] = (
+        {"dynamo": False}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters
+        else {}
+    )
+
+    class TokenEmbeddings(torch.nn.Module):
+        """Takes tokenizer outputs positionally and returns only the last
+        hidden state, which makes the traced graph independent of keyword
+        handling and of other outputs of the underlying model"""
+
+        def __init__(self) -> None:
+            super().__init__()
+            self.auto_model = transformer.auto_model
+
+        def forward(self, *inputs: Any) -> Any:
+            return self.auto_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings().eval(),
+            args=tuple(dummy_inputs[name] for name in input_names),
+            f=str(onnx_encoder_data_interface.path_model(quantised=False)),
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET_VERSION,
+            **export_kwargs,
+        )
+    logger.info(f"Exported {path_sentence_transformer} to an ONNX graph")
+
+    if quantise:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            model_input=onnx_encoder_data_interface.path_model(quantised=False),
+            model_output=onnx_encoder_data_interface.path_model(quantised=True),
+            weight_type=QuantType.QInt8,
+        )
+        logger.info("Quantised weights of the ONNX graph to int8")
+
+    config = OnnxEncoderConfig(
+        model_digest=model_digest,
+        input_names=input_names,
+        pooling_mode=get_pooling_mode(pooling_config=pooling.get_config_dict()),
+        normalize=any(isinstance(module, Normalize) for module in model),
+        max_seq_length=model.max_seq_length,
+        quantised=quantise,
+    )
+
+    # The config is removed again unless every exported graph passes the check
+    reference = encode_list_text(model=model, list_text=list_text_check)
+    onnx_encoder_data_interface.save_config(config=config)
+    for quantised in [False, True] if quantise else [False]:
+        candidate = OnnxEncoder(path_dir_onnx=path_dir_onnx, quantised=quantised)
+        similarity = min_cosine_similarity(
+            reference=reference,
+            candidate=candidate.encode(
+                sentences=list_text_check, show_progress_bar=False
+            ),
+        )
+        if similarity < MIN_COSINE_SIMILARITY:
+            onnx_encoder_data_interface.path_config.unlink()
+            raise ValueError(
+                f"{'Int8' if quantised else 'Float'} ONNX encoder output has "
+                f"a cosine similarity of {similarity:.4f} with PyTorch output, "
+                f"below {MIN_COSINE_SIMILARITY}"
+            )
+        logger.info(
+            f"{'Int8' if quantised else 'Float'} ONNX encoder output has a "
+            f"minimum cosine similarity of {similarity:.4f} with PyTorch output"
+        )
+
+    return config
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Tuple
+from typing import Tuple
 
 import numpy as np
 import pandas as pd
@@ -17,6 +17,8 @@ from eos.data_interfaces.node_dfs_data_interface import (
     NodeDFs,
     NodeType,
 )
+from eos.nodes.utils_dtypes import enum_column
+from eos.nodes.utils_validation import find_duplicates, find_missing, format_ids
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +31,7 @@ def parse_sub_industry_nodes(sub_industry_label: np.ndarray) -> NodeDF:
     # During node dataframe aggregation, node ids will be reassigned
     nid = np.arange(len(unique_label))
 
-    ntype = np.array([NodeType.sub_industry.value] * len(nid))
+    ntype = enum_column(member=NodeType.sub_industry, length=len(nid))
 
     df_sub_industry = pd.DataFrame(
         {
@@ -55,7 +57,7 @@ def parse_industry_nodes(industry_label: np.ndarray) -> NodeDF:
     # Placeholders
     nid = np.arange(len(unique_label))
 
-    ntype = np.array([NodeType.industry.value] * len(nid))
+    ntype = enum_column(member=NodeType.industry, length=len(nid))
 
     df_industry = pd.DataFrame(
         {
@@ -74,21 +76,14 @@ def parse_industry_nodes(industry_label: np.ndarray) -> NodeDF:
 
 
 def reassign_consecutive_nid(node_df_reassign: NodeDF, node_dfs: NodeDFs) -> NodeDF:
-    # Obtain all existing node ids
-    existing_nid: List[int] = []
-    for node_df in node_dfs.members:
-        df = node_df.df
-        existing_nid.extend(df[NodeAttrKey.nid.value].tolist())
-
-    # Increment to-be-reassigned node dataframe's nid column values
-    max_nid = max(existing_nid)
-    node_df_reassign.df[NodeAttrKey.nid.value] = (
-        node_df_reassign.df[NodeAttrKey.nid.value].to_numpy() + max_nid + 1
-    )
+    # Placeholder node ids count up from zero so they are shifted into a block
+    # allocated above the high water mark of existing node ids
+    placeholder_nid = node_df_reassign.df[NodeAttrKey.nid.value].to_numpy()
+    offset = node_dfs.allocate_nid(num=int(placeholder_nid.max(initial=-1)) + 1)
 
-    logger.info(
-        f"Incremented {node_df_reassign.ntype.value} node ids by " f"{max_nid + 1}"
-    )
+    node_df_reassign.df[NodeAttrKey.nid.value] = placeholder_nid + offset
+
+    logger.info(f"Incremented {node_df_reassign.ntype.value} node ids by {offset}")
 
     return node_df_reassign
 
@@ -96,11 +91,17 @@ def reassign_consecutive_nid(node_df_reassign: NodeDF, node_dfs: NodeDFs) -> Nod
 def return_index_of_uniques_given_instances(
     uniques: np.ndarray, instances: np.ndarray
 ) -> np.ndarray:
-    if len(uniques) != len(np.unique(uniques)):
-        raise ValueError("Input uniques array is not unique")
-
-    if not set(instances) <= set(uniques):
-        raise ValueError("At least one instance value does not exist in uniques array")
+    duplicates = find_duplicates(ids=uniques)
+    if len(duplicates) > 0:
+        raise ValueError(
+            f"Input uniques array is not unique with duplicates {format_ids(duplicates)}"
+        )
+
+    missing = find_missing(ids=instances, reference=uniques)
+    if len(missing) > 0:
+        raise ValueError(
+            f"Instance values {format_ids(missing)} do not exist in uniques array"
+        )
 
     # Get sorted index of the array with unique values
     sorted_indices = np.argsort(uniques)
@@ -126,13 +127,16 @@ def parse_theme_to_sub_industry_edges(
 
     # Sub industry node ids are assumed to have been reassigned
     # to avoid duplicate node ids
-    eid_ndarray = np.column_stack((df_theme[NodeAttrKey.nid.value].to_numpy(), dst_nid))
-    eid: List[Tuple[int, int]] = list(map(tuple, eid_ndarray))
+    src_nid = df_theme[NodeAttrKey.nid.value].to_numpy()
 
-    etype = np.array([EdgeType.theme_to_sub_industry.value] * len(eid))
+    etype = enum_column(member=EdgeType.theme_to_sub_industry, length=len(src_nid))
 
     df_theme_to_sub_industry = pd.DataFrame(
-        {EdgeAttrKey.eid.value: eid, EdgeAttrKey.etype.value: etype}
+        {
+            EdgeAttrKey.src.value: src_nid,
+            EdgeAttrKey.dst.value: dst_nid,
+            EdgeAttrKey.etype.value: etype,
+        }
     )
 
     logger.info(
@@ -158,15 +162,16 @@ def parse_sub_industry_to_industry_edges(
 
     # Industry node ids are assumed to have been reassigned
     # to avoid duplicate node ids
-    eid_ndarray = np.column_stack(
-        (df_sub_industry[NodeAttrKey.nid.value].to_numpy(), dst_nid)
-    )
-    eid: List[Tuple[int, int]] = list(map(tuple, eid_ndarray))
+    src_nid = df_sub_industry[NodeAttrKey.nid.value].to_numpy()
 
-    etype = np.array([EdgeType.sub_industry_to_industry.value] * len(eid))
+    etype = enum_column(member=EdgeType.sub_industry_to_industry, length=len(src_nid))
 
     df_sub_industry_to_industry = pd.DataFrame(
-        {EdgeAttrKey.eid.value: eid, EdgeAttrKey.etype.value: etype}
+        {
+            EdgeAttrKey.src.value: src_nid,
+            EdgeAttrKey.dst.value: dst_nid,
+            EdgeAttrKey.etype.value: etype,
+        }
     )
 
     logger.info(
@@ -190,14 +195,24 @@ def parse_industry_to_sector_edges(
 ) -> EdgeDF:
     # Use heuristics to link all industry nodes to all sector nodes
     # The assumption is there's only one sector node
-    nid_src = df_industry[NodeAttrKey.nid.value].to_list()
-    nid_dst = df_sector[NodeAttrKey.nid.value].to_list()
-    eid: List[Tuple[int, int]] = list(zip(nid_src, nid_dst * len(nid_src)))
-
-    etype = np.array([EdgeType.industry_to_sector.value] * len(eid))
+    nid_src = df_industry[NodeAttrKey.nid.value].to_numpy()
+    # Cycling no sector node ids would link industries to zero-filled ids
+    if len(df_sector) == 0 and len(nid_src) > 0:
+        raise ValueError(
+            f"Cannot link {len(nid_src)} industry nodes to sector nodes "
+            "because the sector dataframe is empty"
+        )
+    # Sector node ids are cycled over industry node ids
+    nid_dst = np.resize(df_sector[NodeAttrKey.nid.value].to_numpy(), len(nid_src))
+
+    etype = enum_column(member=EdgeType.industry_to_sector, length=len(nid_src))
 
     df_industry_to_sector = pd.DataFrame(
-        {EdgeAttrKey.eid.value: eid, EdgeAttrKey.etype.value: etype}
+        {
+            EdgeAttrKey.src.value: nid_src,
+            EdgeAttrKey.dst.value: nid_dst,
+            EdgeAttrKey.etype.value: etype,
+        }
     )
 
     logger.info(
@@ -224,14 +239,14 @@ def parse_interm_layer_node_dfs(
         node_df_reassign=sub_industry_node_df, node_dfs=base_node_dfs
     )
 
-    base_node_dfs.members.append(sub_industry_node_df)  # Iteratively resolve conflict
+    base_node_dfs.append(sub_industry_node_df)  # Iteratively resolve conflict
     base_node_dfs.validate()
 
     industry_node_df = reassign_consecutive_nid(
         node_df_reassign=industry_node_df, node_dfs=base_node_dfs
     )
 
-    base_node_dfs.members.append(industry_node_df)
+    base_node_dfs.append(industry_node_df)
     base_node_dfs.validate()
 
     logger.info(
@@ -1,12 +1,18 @@
 import logging
 from pprint import pformat
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 from pandas import DataFrame
 
-from eos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey
-from eos.data_interfaces.node_dfs_data_interface import NodeAttrKey
+from eos.data_interfaces.edge_dfs_data_interface import eid_array
+from eos.data_interfaces.node_dfs_data_interface import (
+    NidIndex,
+    NodeAttrKey,
+    NodeDFs,
+    NodeType,
+)
+from eos.nodes.utils_validation import format_ids
 
 logger = logging.getLogger(__name__)
 
@@ -28,21 +34,41 @@ def get_out_edge_view(eid: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
 
 
 def map_nid_to_attr_val(
-    nid_src_or_dst: List[np.ndarray], nid: np.ndarray, attr_val: np.ndarray
+    nid_src_or_dst: List[np.ndarray],
+    nid: np.ndarray,
+    attr_val: np.ndarray,
+    nid_index: Optional[NidIndex] = None,
+    member: Optional[int] = None,
 ) -> List[np.ndarray]:
-    """Input is assumed to be related to one node type only"""
+    """Input is assumed to be related to one node type only. With the nid_index
+    of node dataframes and the position of the member whose dataframe holds
+    nid and attr_val, rows are found in the cached index instead of sorting
+    nid again"""
     # Input edge member node ids could be two-dimensional (e.g. groups of nodes)
     flat_nid_src_or_dst = np.concatenate(nid_src_or_dst).ravel()
 
-    # Sort all node ids
-    sorting_index = np.argsort(nid)
-    sorted_nid = nid[sorting_index]
-
-    # Find edge member node ids' index in sorted all node ids
-    cross_index_on_sorted = np.searchsorted(sorted_nid, flat_nid_src_or_dst)
-
-    # Map cross index back to original unsorted node ids
-    cross_index = sorting_index[cross_index_on_sorted]
+    if nid_index is not None:
+        if member is None:
+            raise ValueError("A node id index requires the member holding attr_val")
+
+        located_member, cross_index = nid_index.locate(nid=flat_nid_src_or_dst)
+        # Rows of other members do not index attr_val
+        is_other = located_member != member
+        if np.any(is_other):
+            raise ValueError(
+                f"Node ids {format_ids(ids=np.unique(flat_nid_src_or_dst[is_other]))} "
+                f"are not of the node type of member {member}"
+            )
+    else:
+        # Sort all node ids
+        sorting_index = np.argsort(nid)
+        sorted_nid = nid[sorting_index]
+
+        # Find edge member node ids' index in sorted all node ids
+        cross_index_on_sorted = np.searchsorted(sorted_nid, flat_nid_src_or_dst)
+
+        # Map cross index back to original unsorted node ids
+        cross_index = sorting_index[cross_index_on_sorted]
 
     # Obtain attribute values ordered by edge member node ids
     mapped_attr_val_flat = attr_val[cross_index]
@@ -58,11 +84,38 @@ def map_nid_to_attr_val(
     return mapped_attr_val
 
 
+def _member_position(node_dfs: NodeDFs, ntype: NodeType) -> int:
+    if ntype not in node_dfs.ntypes:
+        raise ValueError(f"Node dataframes have no {ntype.value} nodes")
+
+    return node_dfs.ntypes.index(ntype)
+
+
+def map_nid_to_node_attr_val(
+    nid_src_or_dst: List[np.ndarray],
+    node_dfs: NodeDFs,
+    ntype: NodeType,
+    attr_key: NodeAttrKey,
+) -> List[np.ndarray]:
+    """Maps node ids of ntype to values of an attribute through the cached
+    node id index of node_dfs"""
+    member = _member_position(node_dfs=node_dfs, ntype=ntype)
+    df = node_dfs.members[member].df
+
+    return map_nid_to_attr_val(
+        nid_src_or_dst=nid_src_or_dst,
+        nid=df[NodeAttrKey.nid.value].to_numpy(),
+        attr_val=df[attr_key.value].to_numpy(),
+        nid_index=node_dfs.nid_index(),
+        member=member,
+    )
+
+
 def collect_input_for_sub_industry(
-    df_theme_to_sub_industry: DataFrame, df_theme: DataFrame, df_sub_industry: DataFrame
+    df_theme_to_sub_industry: DataFrame, node_dfs: NodeDFs
 ) -> Dict[int, List[str]]:
     # Identify theme-to-sub-industry edge ids
-    eid: np.ndarray = np.array(df_theme_to_sub_industry[EdgeAttrKey.eid.value].tolist())
+    eid: np.ndarray = eid_array(df=df_theme_to_sub_industry)
 
     # Obtain reversed edge ids
     eid_reverse: np.ndarray = eid[:, [1, 0]]
@@ -70,16 +123,18 @@ def collect_input_for_sub_industry(
     # Map sub industry node ids to their target theme node ids
     unique_nid_sub_industry, split_nid_theme = get_out_edge_view(eid=eid_reverse)
     # Retrieve associated sub industry labels
-    label_nested = map_nid_to_attr_val(
+    label_nested = map_nid_to_node_attr_val(
         nid_src_or_dst=[unique_nid_sub_industry],
-        nid=df_sub_industry[NodeAttrKey.nid.value].to_numpy(),
-        attr_val=df_sub_industry[NodeAttrKey.label.value].to_numpy(),
+        node_dfs=node_dfs,
+        ntype=NodeType.sub_industry,
+        attr_key=NodeAttrKey.label,
     )
     label = label_nested[0]  # Only one dimension
-    split_theme = map_nid_to_attr_val(
+    split_theme = map_nid_to_node_attr_val(
         nid_src_or_dst=split_nid_theme,
-        nid=df_theme[NodeAttrKey.nid.value].to_numpy(),
-        attr_val=df_theme[NodeAttrKey.theme.value].to_numpy(),
+        node_dfs=node_dfs,
+        ntype=NodeType.theme,
+        attr_key=NodeAttrKey.theme,
     )
 
     sub_industry_label_to_split_theme: Dict[int, List[str]] = {
@@ -95,14 +150,11 @@ def collect_input_for_sub_industry(
 
 def collect_input_for_industry(
     df_sub_industry_to_industry: DataFrame,
-    df_sub_industry: DataFrame,
-    df_industry: DataFrame,
+    node_dfs: NodeDFs,
     sub_industry_label_to_split_theme: Dict[int, List[str]],
 ) -> Dict[int, List[List[str]]]:
     # Identify sub-industry-to-industry edge ids
-    eid: np.ndarray = np.array(
-        df_sub_industry_to_industry[EdgeAttrKey.eid.value].tolist()
-    )
+    eid: np.ndarray = eid_array(df=df_sub_industry_to_industry)
 
     # Obtain reversed edge ids
     eid_reverse: np.ndarray = eid[:, [1, 0]]
@@ -111,16 +163,18 @@ def collect_input_for_industry(
     unique_nid_industry, split_nid_sub_industry = get_out_edge_view(eid=eid_reverse)
 
     # Retrieve associated sub industry labels
-    industry_label_nested = map_nid_to_attr_val(
+    industry_label_nested = map_nid_to_node_attr_val(
         nid_src_or_dst=[unique_nid_industry],
-        nid=df_industry[NodeAttrKey.nid.value].to_numpy(),
-        attr_val=df_industry[NodeAttrKey.label.value].to_numpy(),
+        node_dfs=node_dfs,
+        ntype=NodeType.industry,
+        attr_key=NodeAttrKey.label,
     )
     industry_label = industry_label_nested[0]  # only one dimension
-    split_sub_industry_label = map_nid_to_attr_val(
+    split_sub_industry_label = map_nid_to_node_attr_val(
         nid_src_or_dst=split_nid_sub_industry,
-        nid=df_sub_industry[NodeAttrKey.nid.value].to_numpy(),
-        attr_val=df_sub_industry[NodeAttrKey.label.value].to_numpy(),
+        node_dfs=node_dfs,
+        ntype=NodeType.sub_industry,
+        attr_key=NodeAttrKey.label,
     )
 
     # TODO: Vectorise the following logic
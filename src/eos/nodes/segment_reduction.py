@@ -0,0 +1,100 @@
+from enum import Enum
+from typing import Optional, Tuple
+
+import numpy as np
+import scipy.sparse
+
+
+class Aggregation(str, Enum):
+    mean = "mean"
+    sum = "sum"
+    # Rows further from the centroid of their segment weigh less
+    weighted_mean = "weighted_mean"
+
+
+def compact_segment_ids(segment_ids: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Renumbers non-negative segment ids to consecutive ones in ascending
+    order of ids, as np.unique would, in linear time. Returns the new ids and
+    the number of segments"""
+    if len(segment_ids) > 0 and segment_ids.min() < 0:
+        raise ValueError("Segment ids must be non-negative")
+
+    present = np.bincount(segment_ids) > 0
+    new_ids: np.ndarray = (np.cumsum(present) - 1)[segment_ids]
+
+    return new_ids, int(present.sum())
+
+
+def segment_sum(
+    values: np.ndarray,
+    segment_ids: np.ndarray,
+    num_segments: int,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Sums rows of values, each scaled by its weight if given, per segment
+    in one pass, as the product of a sparse segment by row indicator matrix
+    with values"""
+    indicator = scipy.sparse.csr_matrix(
+        (
+            (
+                np.ones(len(segment_ids), dtype=values.dtype)
+                if weights is None
+                else weights.astype(values.dtype, copy=False)
+            ),
+            (segment_ids, np.arange(len(segment_ids))),
+        ),
+        shape=(num_segments, len(segment_ids)),
+    )
+    sums: np.ndarray = np.asarray(indicator @ values)
+
+    return sums
+
+
+def distance_weights(distances: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Weights rows by exp(-distance / scale), where distance is from the
+    centroid of their segment and scale the mean such distance of the
+    segment, so that weights do not depend on the scale of encodings"""
+    weights: np.ndarray = np.exp(-distances / np.where(scales > 0, scales, 1.0))
+
+    return weights
+
+
+def reduce_segments(
+    values: np.ndarray,
+    segment_ids: np.ndarray,
+    aggregation: Aggregation = Aggregation.mean,
+) -> np.ndarray:
+    """Aggregates rows of values per segment, in ascending order of segment
+    ids, in time linear in the number of rows whatever the number of
+    segments. Centroids weighting a weighted mean are the segment means"""
+    segment_ids, num_segments = compact_segment_ids(segment_ids=segment_ids)
+
+    sums = segment_sum(
+        values=values, segment_ids=segment_ids, num_segments=num_segments
+    )
+    if aggregation == Aggregation.sum:
+        return sums
+
+    counts = np.bincount(segment_ids, minlength=num_segments)
+    means: np.ndarray = (sums / counts[:, np.newaxis]).astype(values.dtype)
+    if aggregation == Aggregation.mean:
+        return means
+
+    distances = np.linalg.norm(values - means[segment_ids], axis=1)
+    scales = np.bincount(segment_ids, weights=distances, minlength=num_segments)
+    weights = distance_weights(
+        distances=distances, scales=(scales / counts)[segment_ids]
+    )
+    weighted_means: np.ndarray = (
+        segment_sum(
+            values=values,
+            segment_ids=segment_ids,
+            num_segments=num_segments,
+            weights=weights,
+        )
+        / np.bincount(segment_ids, weights=weights, minlength=num_segments)[
+            :, np.newaxis
+        ]
+    ).astype(values.dtype)
+
+    return weighted_means
@@ -1,6 +1,8 @@
 import logging
-from typing import List, Tuple
+from typing import Tuple
 
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
 
 from eos.data_interfaces.edge_dfs_data_interface import (
@@ -15,76 +17,86 @@ from eos.data_interfaces.node_dfs_data_interface import (
     NodeDFs,
     NodeType,
 )
-from eos.data_interfaces.src_themes_data_interface import SourceThemes
+from eos.data_interfaces.src_themes_data_interface import (
+    SourceThemeAttrKey,
+    SourceThemes,
+)
+from eos.nodes.utils_dtypes import TEXT_DTYPE, enum_column
 
 logger = logging.getLogger(__name__)
 
 
+def assign_theme_and_sector_nids(
+    sector_codes: np.ndarray, n_sectors: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Assigns node ids in order of appearance, with each sector taking the id
+    right after the first theme it is seen with, e.g. codes [0, 0, 1] yield
+    theme nids [0, 2, 3] and sector nids [1, 4]"""
+    n_themes = len(sector_codes)
+
+    # Mark the first theme of every sector in order of appearance
+    index_first_theme = np.full(n_sectors, n_themes, dtype=np.int64)
+    np.minimum.at(index_first_theme, sector_codes, np.arange(n_themes))
+    is_first_theme = np.zeros(n_themes, dtype=np.int64)
+    is_first_theme[index_first_theme] = 1
+
+    # Every sector seen before a theme shifts its nid by one
+    nid_theme = np.arange(n_themes) + np.cumsum(is_first_theme) - is_first_theme
+    nid_sector = nid_theme[index_first_theme] + 1
+
+    return nid_theme, nid_sector
+
+
 def _source_themes_to_element_dfs(
     source_themes: SourceThemes,
 ) -> Tuple[NodeDFs, EdgeDFs]:
-    # Iterables for Theme node data
-    nids_theme: List[int] = []
-    ntypes_theme: List[str] = []
-    themes: List[str] = []
-    descriptions: List[str] = []
-
-    # Iterables for Sector node data
-    nids_sector: List[int] = []
-    ntypes_sector: List[str] = []
-    sectors: List[str] = []
-
-    # Iterables for ThemeToSector edge data
-    eids_tts: List[Tuple[int, int]] = []
-    etype_tts: List[str] = []
-
-    # Execute collection of graph elements
-    curr_nid: int = 0
-    for source_theme in source_themes.members:
-        # Collect data for Theme nodes
-        nid_theme = curr_nid
-        curr_nid += 1
-
-        nids_theme.append(nid_theme)
-        ntypes_theme.append(NodeType.theme.value)
-        themes.append(source_theme.theme)
-        descriptions.append(source_theme.description)
-
-        # Skip Sector node data collection if already exists
-        if source_theme.sector not in sectors:
-            # Collect data for Sector nodes
-            nid_sector = curr_nid
-            curr_nid += 1
-
-            nids_sector.append(nid_sector)
-            ntypes_sector.append(NodeType.sector.value)
-            sectors.append(source_theme.sector)
-
-        # Collect data for ThemeToSector edges
-        i_sector = sectors.index(source_theme.sector)
-        nid_sector = nids_sector[i_sector]
-
-        eids_tts.append((nid_theme, nid_sector))
-        etype_tts.append(EdgeType.theme_to_sector.value)
-
-    # Compile DataFrame objects from iterables
+    df_source_themes = source_themes.df
+
+    # Factorise sectors so that codes index sectors in order of appearance
+    sector_codes, sectors = pd.factorize(
+        df_source_themes[SourceThemeAttrKey.sector.value]
+    )
+    nid_theme, nid_sector = assign_theme_and_sector_nids(
+        sector_codes=sector_codes, n_sectors=len(sectors)
+    )
+
+    # Each theme links to the sector node its code points at
+    nid_tts_dst = nid_sector[sector_codes]
+
+    # Compile DataFrame objects from arrays
     df_theme = DataFrame(
         {
-            NodeAttrKey.nid.value: nids_theme,
-            NodeAttrKey.ntype.value: ntypes_theme,
-            NodeAttrKey.theme.value: themes,
-            NodeAttrKey.description.value: descriptions,
+            NodeAttrKey.nid.value: nid_theme,
+            NodeAttrKey.ntype.value: enum_column(
+                member=NodeType.theme, length=len(nid_theme)
+            ),
+            NodeAttrKey.theme.value: df_source_themes[SourceThemeAttrKey.theme.value]
+            .astype(TEXT_DTYPE)
+            .array,
+            NodeAttrKey.description.value: df_source_themes[
+                SourceThemeAttrKey.description.value
+            ]
+            .astype(TEXT_DTYPE)
+            .array,
         }
     )
     df_sector = DataFrame(
         {
-            NodeAttrKey.nid.value: nids_sector,
-            NodeAttrKey.ntype.value: ntypes_sector,
-            NodeAttrKey.sector.value: sectors,
+            NodeAttrKey.nid.value: nid_sector,
+            NodeAttrKey.ntype.value: enum_column(
+                member=NodeType.sector, length=len(nid_sector)
+            ),
+            NodeAttrKey.sector.value: sectors.astype(TEXT_DTYPE).array,
         }
     )
     df_tts = DataFrame(
-        {EdgeAttrKey.eid.value: eids_tts, EdgeAttrKey.etype.value: etype_tts}
+        {
+            EdgeAttrKey.src.value: nid_theme,
+            EdgeAttrKey.dst.value: nid_tts_dst,
+            EdgeAttrKey.etype.value: enum_column(
+                member=EdgeType.theme_to_sector, length=len(nid_theme)
+            ),
+        }
     )
 
     logger.info(
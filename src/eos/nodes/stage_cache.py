@@ -0,0 +1,171 @@
+import hashlib
+import logging
+import sys
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Set
+
+import orjson
+
+from eos.data_interfaces.columnar_dfs_data_interface import remove_path
+from eos.data_interfaces.stage_cache_data_interface import (
+    DigestMemo,
+    StageCacheDataInterface,
+    StageCacheEntry,
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+
+
+def digest_file(path: Path, digest_memo: DigestMemo) -> str:
+    """Hashes file content unless its size, modification time and inode are
+    unchanged since it was last hashed"""
+    stat = path.stat()
+    fingerprint: List[int | str] = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    memo_key = str(path.resolve())
+    memo = digest_memo.get(memo_key)
+    if memo is not None and memo[:3] == fingerprint:
+        return str(memo[3])
+
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            file_hash.update(chunk)
+    digest = file_hash.hexdigest()
+
+    digest_memo[memo_key] = fingerprint + [digest]
+
+    return digest
+
+
+def digest_path(path: Path, digest_memo: DigestMemo) -> str:
+    """Hashes a file, or relative paths and contents of files in a directory"""
+    if not path.is_dir():
+        return digest_file(path=path, digest_memo=digest_memo)
+
+    dir_hash = hashlib.sha256()
+    for path_file in sorted(path.rglob("*")):
+        if path_file.is_file():
+            dir_hash.update(path_file.relative_to(path).as_posix().encode())
+            dir_hash.update(
+                digest_file(path=path_file, digest_memo=digest_memo).encode()
+            )
+
+    return dir_hash.hexdigest()
+
+
+def stage_name(stage: partial) -> str:
+    module_name = stage.func.__module__
+
+    # Pipelines run with "python -m" are imported as __main__
+    if module_name == "__main__":
+        spec = getattr(sys.modules["__main__"], "__spec__", None)
+        module_name = spec.name if spec is not None else module_name
+
+    return f"{module_name}.{stage.func.__name__}"
+
+
+def digest_code() -> str:
+    """Hashes sources of all loaded eos modules, including a pipeline run as
+    __main__, as the code version of a stage"""
+    code_hash = hashlib.sha256()
+
+    for module_name, module in sorted(sys.modules.items()):
+        spec = getattr(module, "__spec__", None)
+        name = spec.name if spec is not None else module_name
+        module_file = getattr(module, "__file__", None)
+
+        if (name == "eos" or name.startswith("eos.")) and module_file is not None:
+            code_hash.update(name.encode())
+            code_hash.update(Path(module_file).read_bytes())
+
+    return code_hash.hexdigest()
+
+
+def digest_stage_key(
+    stage: partial,
+    inputs: List[Path],
+    digest_memo: DigestMemo,
+    exclude_params: Optional[Set[str]] = None,
+) -> str:
+    # Paths only locate inputs and outputs so only other arguments are parameters
+    exclude_params = set() if exclude_params is None else exclude_params
+    params = {
+        k: v
+        for k, v in sorted(stage.keywords.items())
+        if not isinstance(v, Path) and k not in exclude_params
+    }
+
+    key_hash = hashlib.sha256()
+    key_hash.update(stage_name(stage=stage).encode())
+    key_hash.update(digest_code().encode())
+    key_hash.update(orjson.dumps(params, option=orjson.OPT_SORT_KEYS))
+    for path_input in inputs:
+        key_hash.update(digest_path(path=path_input, digest_memo=digest_memo).encode())
+
+    return key_hash.hexdigest()
+
+
+def run_cached_stage(
+    stage: partial,
+    inputs: List[Path],
+    outputs: List[Path],
+    path_dir_cache: Optional[Path] = None,
+    exclude_params: Optional[Set[str]] = None,
+) -> None:
+    """Runs a pipeline function with all arguments bound unless outputs of a
+    run with identical inputs, parameters and code are cached, in which case
+    they are restored instead. Without path_dir_cache, always runs the stage.
+    Parameters in exclude_params, which only affect performance, are left out
+    of the cache key"""
+    if path_dir_cache is None:
+        stage()
+        return
+
+    stage_cache_data_interface = StageCacheDataInterface(dirpath=path_dir_cache)
+    digest_memo = stage_cache_data_interface.load_digest_memo()
+
+    name = stage_name(stage=stage)
+    key = digest_stage_key(
+        stage=stage,
+        inputs=inputs,
+        digest_memo=digest_memo,
+        exclude_params=exclude_params,
+    )
+
+    entry = stage_cache_data_interface.load_entry(key=key)
+    if entry is not None:
+        logger.info(f"Skipping {name} because its outputs are cached under {key}")
+
+        for cached_output, path_output in zip(entry.outputs, outputs):
+            stage_cache_data_interface.restore_object(
+                cached_output=cached_output, path=path_output
+            )
+        stage_cache_data_interface.save_digest_memo(digest_memo=digest_memo)
+
+        return
+
+    logger.info(f"Running {name} because no outputs are cached under {key}")
+
+    # New files rather than rewrites keep hard linked cache objects intact
+    for path_output in outputs:
+        remove_path(path_output)
+
+    stage()
+
+    entry = StageCacheEntry(
+        stage=name,
+        key=key,
+        outputs=[
+            stage_cache_data_interface.save_object(
+                path=path_output,
+                digest=digest_path(path=path_output, digest_memo=digest_memo),
+            )
+            for path_output in outputs
+        ],
+    )
+    stage_cache_data_interface.save_entry(entry=entry)
+    stage_cache_data_interface.save_digest_memo(digest_memo=digest_memo)
@@ -0,0 +1,62 @@
+from enum import Enum
+from typing import Any, Dict, List, Type, Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+# Arrow-backed strings hold text in one contiguous buffer instead of one python
+# object per row, and map onto Arrow and Parquet string columns without copies
+TEXT_DTYPE = pd.StringDtype(storage="pyarrow")
+
+
+def enum_dtype(enum_class: Type[Enum]) -> pd.CategoricalDtype:
+    """Categories are all values of enum_class in definition order, so that
+    codes mean the same member in every dataframe of a collection"""
+    return pd.CategoricalDtype(categories=[member.value for member in enum_class])
+
+
+def enum_column(member: Enum, length: int) -> pd.Categorical:
+    """Returns a categorical column repeating one enum value without creating
+    length string objects"""
+    enum_class = type(member)
+    code = list(enum_class).index(member)
+
+    return pd.Categorical.from_codes(
+        codes=np.full(length, code, dtype=np.int8), dtype=enum_dtype(enum_class)
+    )
+
+
+def compact_df(
+    df: DataFrame, enum_columns: Dict[str, Type[Enum]], text_columns: List[str]
+) -> DataFrame:
+    """Casts enum columns to enum categoricals and text columns to Arrow-backed
+    strings. Columns which are absent or already compact are left untouched
+    and df itself is returned if nothing needs casting"""
+    column_to_dtype: Dict[str, Union[pd.CategoricalDtype, "pd.StringDtype[Any]"]] = {
+        column: enum_dtype(enum_class) for column, enum_class in enum_columns.items()
+    }
+    column_to_dtype.update({column: TEXT_DTYPE for column in text_columns})
+
+    casts = {
+        column: dtype
+        for column, dtype in column_to_dtype.items()
+        if column in df.columns and df[column].dtype != dtype
+    }
+    if len(casts) == 0:
+        return df
+
+    # Casting would silently turn values outside an enum into missing values
+    for column, enum_class in enum_columns.items():
+        if column in casts:
+            categories = [member.value for member in enum_class]
+            undefined_values = set(df[column].dropna().unique()) - set(categories)
+            if len(undefined_values) > 0:
+                raise ValueError(
+                    f"Column {column} has values {sorted(undefined_values)} "
+                    f"which are not among {enum_class.__name__} values {categories}"
+                )
+
+    compacted: DataFrame = df.astype(casts)
+
+    return compacted
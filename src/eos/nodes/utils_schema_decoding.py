@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import dataclasses
+import typing
+from enum import Enum
+from typing import Any, Callable, Dict, Mapping, Tuple, Type, TypeVar, Union
+
+T = TypeVar("T")
+
+Decoder = Callable[[Any], Any]
+
+
+class SchemaError(ValueError):
+    """Raised when decoded json does not match a dataclass schema. path locates
+    the offending value from the root, e.g. ("members", 3, "ntype")"""
+
+    def __init__(self, message: str, path: Tuple[Union[str, int], ...] = ()) -> None:
+        self.message = message
+        self.path = path
+
+        super().__init__(f"{message} at {self.path_str}")
+
+    @property
+    def path_str(self) -> str:
+        return "$" + "".join(
+            f"[{key}]" if isinstance(key, int) else f".{key}" for key in self.path
+        )
+
+    def prefixed(self, key: Union[str, int]) -> SchemaError:
+        return SchemaError(message=self.message, path=(key,) + self.path)
+
+
+def compile_decoder(
+    data_class: Type[T], type_hooks: Mapping[Any, Decoder] = {}
+) -> Callable[[Any], T]:
+    """Walks type hints of data_class once and returns a decoder mapping json
+    data onto it without any further reflection. Values of types in type_hooks
+    are converted by their hooks, enums are cast from their values and json
+    scalars are checked but never coerced"""
+    decoder: Callable[[Any], T] = _compile(tp=data_class, type_hooks=type_hooks)
+
+    return decoder
+
+
+def _compile(tp: Any, type_hooks: Mapping[Any, Decoder]) -> Decoder:
+    if tp in type_hooks:
+        return _compile_hook(hook=type_hooks[tp], tp=tp)
+    if dataclasses.is_dataclass(tp):
+        return _compile_dataclass(data_class=tp, type_hooks=type_hooks)
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return _compile_enum(enum_class=tp)
+    if tp in (str, int, float, bool):
+        return _compile_scalar(tp=tp)
+    if tp is Any:
+        return _identity
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin is list:
+        return _compile_list(item_decoder=_compile(tp=args[0], type_hooks=type_hooks))
+    if origin is dict and args[0] is str:
+        return _compile_dict(value_decoder=_compile(tp=args[1], type_hooks=type_hooks))
+    if origin is Union and len(args) == 2 and type(None) in args:
+        return _compile_optional(
+            decoder=_compile(
+                tp=next(arg for arg in args if arg is not type(None)),
+                type_hooks=type_hooks,
+            )
+        )
+
+    raise TypeError(f"Type {tp} does not have corresponding decoding logic defined")
+
+
+def _identity(data: Any) -> Any:
+    return data
+
+
+def _compile_hook(hook: Decoder, tp: Any) -> Decoder:
+    def decode_hook(data: Any) -> Any:
+        try:
+            return hook(data)
+        except SchemaError:
+            raise
+        except (TypeError, ValueError) as e:
+            raise SchemaError(f"Failed to decode {tp.__name__}: {e}") from None
+
+    return decode_hook
+
+
+def _compile_scalar(tp: type) -> Decoder:
+    # bool is a subclass of int but json booleans are never valid integers
+    accepted: Tuple[type, ...] = (int, float) if tp is float else (tp,)
+    rejected: Tuple[type, ...] = () if tp is bool else (bool,)
+
+    def decode_scalar(data: Any) -> Any:
+        if not isinstance(data, accepted) or isinstance(data, rejected):
+            raise SchemaError(f"Expected {tp.__name__} but found {type(data).__name__}")
+
+        return data
+
+    return decode_scalar
+
+
+def _compile_enum(enum_class: Type[Enum]) -> Decoder:
+    value_to_member: Dict[Any, Enum] = {member.value: member for member in enum_class}
+
+    def decode_enum(data: Any) -> Any:
+        try:
+            return value_to_member[data]
+        except (KeyError, TypeError):
+            raise SchemaError(
+                f"{data!r} is not one of {enum_class.__name__} "
+                f"values {list(value_to_member)}"
+            ) from None
+
+    return decode_enum
+
+
+def _compile_list(item_decoder: Decoder) -> Decoder:
+    def decode_list(data: Any) -> Any:
+        if not isinstance(data, list):
+            raise SchemaError(f"Expected list but found {type(data).__name__}")
+
+        try:
+            return [item_decoder(item) for item in data]
+        except SchemaError:
+            # Decode again one item at a time only to locate the failing one
+            for i, item in enumerate(data):
+                try:
+                    item_decoder(item)
+                except SchemaError as e:
+                    raise e.prefixed(i) from None
+            raise
+
+    return decode_list
+
+
+def _compile_dict(value_decoder: Decoder) -> Decoder:
+    def decode_dict(data: Any) -> Any:
+        if not isinstance(data, dict):
+            raise SchemaError(f"Expected object but found {type(data).__name__}")
+
+        decoded: Dict[str, Any] = {}
+        for key, value in data.items():
+            try:
+                decoded[key] = value_decoder(value)
+            except SchemaError as e:
+                raise e.prefixed(key) from None
+
+        return decoded
+
+    return decode_dict
+
+
+def _compile_optional(decoder: Decoder) -> Decoder:
+    def decode_optional(data: Any) -> Any:
+        return None if data is None else decoder(data)
+
+    return decode_optional
+
+
+def _compile_dataclass(data_class: Any, type_hooks: Mapping[Any, Decoder]) -> Decoder:
+    # Resolves postponed annotations of modules using "from __future__ import"
+    type_hints = typing.get_type_hints(data_class)
+
+    field_decoders: Tuple[Tuple[str, Decoder], ...] = tuple(
+        (field.name, _compile(tp=type_hints[field.name], type_hooks=type_hooks))
+        for field in dataclasses.fields(data_class)
+        if field.init
+    )
+    field_names = frozenset(name for name, _ in field_decoders)
+    required_names = frozenset(
+        field.name
+        for field in dataclasses.fields(data_class)
+        if field.init
+        and field.default is dataclasses.MISSING
+        and field.default_factory is dataclasses.MISSING
+    )
+
+    def decode_dataclass(data: Any) -> Any:
+        if not isinstance(data, dict):
+            raise SchemaError(
+                f"Expected object for {data_class.__name__} "
+                f"but found {type(data).__name__}"
+            )
+
+        kwargs: Dict[str, Any] = {}
+        for name, field_decoder in field_decoders:
+            if name not in data:
+                if name in required_names:
+                    raise SchemaError(
+                        f"Missing field of {data_class.__name__}", path=(name,)
+                    )
+                continue
+
+            try:
+                kwargs[name] = field_decoder(data[name])
+            except SchemaError as e:
+                raise e.prefixed(name) from None
+
+        if len(kwargs) != len(data):
+            unexpected_names = sorted(set(data) - field_names)
+            if len(unexpected_names) > 0:
+                raise SchemaError(
+                    f"Unexpected fields {unexpected_names} of {data_class.__name__}"
+                )
+
+        return data_class(**kwargs)
+
+    return decode_dataclass
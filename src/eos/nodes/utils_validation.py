@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+import os
+from enum import Enum
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_LEVEL_ENV_VAR = "EOS_VALIDATION_LEVEL"
+MAX_REPORTED_IDS = 10
+
+
+class ValidationLevel(str, Enum):
+    off = "off"  # No integrity checks at all
+    fast = "fast"  # Vectorised checks of id uniqueness and edge endpoints
+    full = "full"  # Also checks id dtypes and endpoint node types of edge types
+
+    @classmethod
+    def from_env(cls) -> ValidationLevel:
+        return cls(os.environ.get(VALIDATION_LEVEL_ENV_VAR, cls.full.value))
+
+
+def resolve_validation_level(level: Optional[ValidationLevel]) -> ValidationLevel:
+    """Explicit levels win over the EOS_VALIDATION_LEVEL environment variable"""
+    return ValidationLevel.from_env() if level is None else level
+
+
+def format_ids(ids: np.ndarray) -> str:
+    shown = ids[:MAX_REPORTED_IDS].tolist()
+    more = len(ids) - len(shown)
+
+    return f"{shown}" + (f" and {more} more" if more > 0 else "")
+
+
+def find_duplicates(ids: np.ndarray) -> np.ndarray:
+    uniques, counts = np.unique(ids, return_counts=True)
+    duplicates: np.ndarray = uniques[counts > 1]
+
+    return duplicates
+
+
+def find_missing(ids: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Returns sorted unique ids which are not in reference"""
+    missing: np.ndarray = np.unique(ids[~np.isin(ids, reference)])
+
+    return missing
@@ -3,31 +3,41 @@ from pathlib import Path
 from eos.data_interfaces.edge_dfs_data_interface import EdgeDFsDataInterface
 from eos.data_interfaces.node_dfs_data_interface import NodeDFsDataInterface
 from eos.data_interfaces.nx_g_data_interface import NXGDataInterface
-from eos.nodes.assemble_kg import _assemble_kg
+from eos.nodes.assemble_kg import _assemble_csr_kg, _assemble_kg
 
 
 def assemble_kg(path_node_dfs: Path, path_edge_dfs: Path, path_nx_g: Path) -> None:
     # Data Access - Input
-    node_dfs_data_interface = NodeDFsDataInterface(filepath=path_node_dfs)
+    node_dfs_data_interface = NodeDFsDataInterface(
+        filepath=path_node_dfs, memory_map=True
+    )
     node_dfs = node_dfs_data_interface.load()
     node_dfs.validate()
 
-    edge_dfs_data_interface = EdgeDFsDataInterface(filepath=path_edge_dfs)
+    edge_dfs_data_interface = EdgeDFsDataInterface(
+        filepath=path_edge_dfs, memory_map=True
+    )
     edge_dfs = edge_dfs_data_interface.load()
     edge_dfs.validate()
 
-    # Task Processing
-    nx_g = _assemble_kg(node_dfs=node_dfs, edge_dfs=edge_dfs)
-
-    # Data Access - Output
+    # Task Processing & Data Access - Output
     nx_g_data_interface = NXGDataInterface(filepath=path_nx_g)
-    nx_g_data_interface.save(nx_g=nx_g)
+
+    if nx_g_data_interface.is_csr:
+        # CSR arrays are built without going through networkx at all
+        csr_graph = _assemble_csr_kg(node_dfs=node_dfs, edge_dfs=edge_dfs)
+        nx_g_data_interface.save_csr(csr_graph=csr_graph)
+    else:
+        nx_g = _assemble_kg(node_dfs=node_dfs, edge_dfs=edge_dfs)
+        nx_g_data_interface.save(nx_g=nx_g)
 
 
 if __name__ == "__main__":
     import argparse
+    from functools import partial
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -55,11 +65,26 @@ if __name__ == "__main__":
         required=True,
         help="Path to which a constructed networkx graph is saved",
     )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    assemble_kg(
-        path_node_dfs=args.path_node_dfs,
-        path_edge_dfs=args.path_edge_dfs,
-        path_nx_g=args.path_nx_g,
+    run_cached_stage(
+        stage=partial(
+            assemble_kg,
+            path_node_dfs=args.path_node_dfs,
+            path_edge_dfs=args.path_edge_dfs,
+            path_nx_g=args.path_nx_g,
+        ),
+        inputs=[args.path_node_dfs, args.path_edge_dfs],
+        outputs=[args.path_nx_g],
+        path_dir_cache=args.path_dir_cache,
     )
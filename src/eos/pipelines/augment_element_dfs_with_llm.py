@@ -12,8 +12,12 @@ def augment_element_dfs_with_llm(
     path_llm_node_dfs: Path,
 ) -> None:
     # Data Acess - Input
-    base_node_dfs_data_interface = NodeDFsDataInterface(filepath=path_base_node_dfs)
-    node_dfs = base_node_dfs_data_interface.load()
+    base_node_dfs_data_interface = NodeDFsDataInterface(
+        filepath=path_base_node_dfs, memory_map=True
+    )
+    node_dfs = base_node_dfs_data_interface.load(
+        ntypes=[NodeType.sub_industry, NodeType.industry]
+    )
     node_dfs.validate()
     i_sub_industry = node_dfs.ntypes.index(NodeType.sub_industry)
     i_industry = node_dfs.ntypes.index(NodeType.industry)
@@ -29,26 +33,29 @@ def augment_element_dfs_with_llm(
     industry_eval = industry_eval_data_interface.load()
 
     # Task Processing
-    (
-        node_dfs.members[i_sub_industry],
-        node_dfs.members[i_industry],
-    ) = _augment_element_dfs_with_llm(
+    sub_industry_node_df, industry_node_df = _augment_element_dfs_with_llm(
         sub_industry_node_df=node_dfs.members[i_sub_industry],
         industry_node_df=node_dfs.members[i_industry],
         df_sub_industry_eval=sub_industry_eval.to_df(),
         df_industry_eval=industry_eval.to_df(),
     )
+    node_dfs.replace(node_df=sub_industry_node_df)
+    node_dfs.replace(node_df=industry_node_df)
     node_dfs.validate()
 
     # Data Access - Output
     llm_node_dfs_data_interface = NodeDFsDataInterface(filepath=path_llm_node_dfs)
-    llm_node_dfs_data_interface.save(node_dfs=node_dfs)
+    llm_node_dfs_data_interface.save_partial(
+        node_dfs=node_dfs, path_base=path_base_node_dfs
+    )
 
 
 if __name__ == "__main__":
     import argparse
+    from functools import partial
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -84,12 +91,31 @@ if __name__ == "__main__":
         required=True,
         help="Path to which LLM augmented node dataframes are saved",
     )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    augment_element_dfs_with_llm(
-        path_base_node_dfs=args.path_base_node_dfs,
-        path_sub_industry_eval=args.path_sub_industry_eval,
-        path_industry_eval=args.path_industry_eval,
-        path_llm_node_dfs=args.path_llm_node_dfs,
+    run_cached_stage(
+        stage=partial(
+            augment_element_dfs_with_llm,
+            path_base_node_dfs=args.path_base_node_dfs,
+            path_sub_industry_eval=args.path_sub_industry_eval,
+            path_industry_eval=args.path_industry_eval,
+            path_llm_node_dfs=args.path_llm_node_dfs,
+        ),
+        inputs=[
+            args.path_base_node_dfs,
+            args.path_sub_industry_eval,
+            args.path_industry_eval,
+        ],
+        outputs=[args.path_llm_node_dfs],
+        path_dir_cache=args.path_dir_cache,
     )
@@ -1,9 +1,22 @@
 import logging
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 
+from eos.data_interfaces.k_search_checkpoint_data_interface import (
+    KSearchCheckpointDataInterface,
+)
+from eos.nodes.encoding_precision import ENCODING_BLOCK_SIZE, stored_precision
 from eos.nodes.k_means_cluster import _cluster_for_sub_and_industries
+from eos.nodes.k_search import SILHOUETTE_SAMPLE_SIZE, KCriterion
+from eos.nodes.k_selection import KSelection, KSelectionConfig
+from eos.nodes.mini_batch_cluster import (
+    ClusterBackend,
+    MiniBatchConfig,
+    _cluster_for_sub_and_industries_streamed,
+)
+from eos.nodes.segment_reduction import Aggregation
 
 logger = logging.getLogger(__name__)
 
@@ -13,24 +26,77 @@ def cluster_for_sub_and_industries(
     path_description_encoding: Path,
     path_sub_industry_label: Path,
     path_industry_label: Path,
+    block_size: int = ENCODING_BLOCK_SIZE,
+    num_workers: int = 1,
+    path_dir_k_search: Optional[Path] = None,
+    k_selection: KSelection = KSelection.exhaustive,
+    k_budget: Optional[int] = None,
+    k_num_points: int = KSelectionConfig.num_points,
+    k_min_improvement: Optional[float] = None,
+    k_criterion: KCriterion = KCriterion.silhouette,
+    k_sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+    cluster_backend: ClusterBackend = ClusterBackend.kmeans,
+    n_clusters: Optional[int] = None,
+    mini_batch_size: int = MiniBatchConfig.batch_size,
+    num_epochs: int = MiniBatchConfig.num_epochs,
+    cluster_sample_size: int = MiniBatchConfig.sample_size,
+    sub_industry_aggregation: Aggregation = Aggregation.mean,
 ) -> None:
     # Data Access - Input
-    theme_encoding: np.ndarray = np.load(path_theme_encoding)
+    # Memory-mapped so that only a block at a time is read and dequantised
+    theme_encoding: np.ndarray = np.load(path_theme_encoding, mmap_mode="r")
     logger.info(
-        f"Loaded encoded themes shaped {theme_encoding.shape} "
-        f"from {path_theme_encoding}"
+        f"Loaded {stored_precision(stored=theme_encoding).value} encoded themes "
+        f"of {len(theme_encoding)} rows from {path_theme_encoding}"
     )
 
-    description_encoding: np.ndarray = np.load(path_description_encoding)
+    description_encoding: np.ndarray = np.load(path_description_encoding, mmap_mode="r")
     logger.info(
-        f"Loaded encoded descriptions shaped {description_encoding.shape} "
-        f"from {path_description_encoding}"
+        f"Loaded {stored_precision(stored=description_encoding).value} encoded "
+        f"descriptions of {len(description_encoding)} rows from "
+        f"{path_description_encoding}"
     )
 
     # Task Processing
-    sub_industry_label, industry_label = _cluster_for_sub_and_industries(
-        theme_encoding=theme_encoding, description_encoding=description_encoding
+    k_search_checkpoint_data_interface = (
+        None
+        if path_dir_k_search is None
+        else KSearchCheckpointDataInterface(dirpath=path_dir_k_search)
     )
+    k_selection_config = KSelectionConfig(
+        strategy=k_selection,
+        budget=k_budget,
+        num_points=k_num_points,
+        min_improvement=k_min_improvement,
+        criterion=k_criterion,
+        sample_size=k_sample_size,
+    )
+    if cluster_backend == ClusterBackend.mini_batch:
+        sub_industry_label, industry_label = _cluster_for_sub_and_industries_streamed(
+            theme_encoding=theme_encoding,
+            description_encoding=description_encoding,
+            block_size=block_size,
+            num_workers=num_workers,
+            k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+            k_selection_config=k_selection_config,
+            mini_batch_config=MiniBatchConfig(
+                n_clusters=n_clusters,
+                sample_size=cluster_sample_size,
+                batch_size=mini_batch_size,
+                num_epochs=num_epochs,
+            ),
+            aggregation=sub_industry_aggregation,
+        )
+    else:
+        sub_industry_label, industry_label = _cluster_for_sub_and_industries(
+            theme_encoding=theme_encoding,
+            description_encoding=description_encoding,
+            block_size=block_size,
+            num_workers=num_workers,
+            k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+            k_selection_config=k_selection_config,
+            aggregation=sub_industry_aggregation,
+        )
 
     # Data Access - Output
     np.save(path_sub_industry_label, sub_industry_label)
@@ -48,8 +114,10 @@ def cluster_for_sub_and_industries(
 
 if __name__ == "__main__":
     import argparse
+    from functools import partial
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -85,12 +153,171 @@ if __name__ == "__main__":
         help="Path to which industry membership labels of ordered "
         "sub industry labels are saved",
     )
+    parser.add_argument(
+        "-bs",
+        "--block_size",
+        type=int,
+        default=ENCODING_BLOCK_SIZE,
+        help="Number of rows of encodings read and dequantised at a time",
+    )
+    parser.add_argument(
+        "-nw",
+        "--num_workers",
+        type=int,
+        default=1,
+        help="Number of worker processes fitting candidate numbers of clusters "
+        "in parallel, or 1 to fit them in this process",
+    )
+    parser.add_argument(
+        "-pdks",
+        "--path_dir_k_search",
+        type=Path,
+        default=None,
+        help="Path to a directory checkpointing scores of candidate numbers of "
+        "clusters, so that an interrupted search resumes where it stopped",
+    )
+    parser.add_argument(
+        "-ks",
+        "--k_selection",
+        type=KSelection,
+        choices=list(KSelection),
+        default=KSelection.exhaustive,
+        help="Evaluates every candidate number of clusters, rounds of candidates "
+        "narrowing around the best one, or a golden section search assuming "
+        "scores have a single peak",
+    )
+    parser.add_argument(
+        "-kb",
+        "--k_budget",
+        type=int,
+        default=None,
+        help="Most candidate numbers of clusters evaluated per clustering level",
+    )
+    parser.add_argument(
+        "-knp",
+        "--k_num_points",
+        type=int,
+        default=KSelectionConfig.num_points,
+        help="Number of candidate numbers of clusters of each coarse to fine "
+        "round, which keeps every worker busy if at least the number of workers",
+    )
+    parser.add_argument(
+        "-kmi",
+        "--k_min_improvement",
+        type=float,
+        default=None,
+        help="Stops a coarse to fine or golden section search once a round "
+        "raises the best score by no more than this",
+    )
+    parser.add_argument(
+        "-kc",
+        "--k_criterion",
+        type=KCriterion,
+        choices=list(KCriterion),
+        default=KCriterion.silhouette,
+        help="Score candidate numbers of clusters are ranked by. The exact "
+        "silhouette holds pairwise distances of all rows in memory, the others "
+        "scale to larger encodings",
+    )
+    parser.add_argument(
+        "-kss",
+        "--k_sample_size",
+        type=int,
+        default=SILHOUETTE_SAMPLE_SIZE,
+        help="Number of rows a sampled silhouette is computed over",
+    )
+    parser.add_argument(
+        "-cb",
+        "--cluster_backend",
+        type=ClusterBackend,
+        choices=list(ClusterBackend),
+        default=ClusterBackend.kmeans,
+        help="Clusters themes with KMeans over encodings held in memory, or with "
+        "MiniBatchKMeans over encodings streamed a block at a time, for "
+        "encodings larger than memory",
+    )
+    parser.add_argument(
+        "-nc",
+        "--n_clusters",
+        type=int,
+        default=None,
+        help="Number of sub industries of the mini_batch backend, searched on a "
+        "sample of themes if not given",
+    )
+    parser.add_argument(
+        "-mbs",
+        "--mini_batch_size",
+        type=int,
+        default=MiniBatchConfig.batch_size,
+        help="Number of themes of each update of the mini_batch backend",
+    )
+    parser.add_argument(
+        "-ne",
+        "--num_epochs",
+        type=int,
+        default=MiniBatchConfig.num_epochs,
+        help="Number of passes over themes of the mini_batch backend",
+    )
+    parser.add_argument(
+        "-css",
+        "--cluster_sample_size",
+        type=int,
+        default=MiniBatchConfig.sample_size,
+        help="Number of themes the mini_batch backend searches the number of "
+        "sub industries on",
+    )
+    parser.add_argument(
+        "-sia",
+        "--sub_industry_aggregation",
+        type=Aggregation,
+        choices=list(Aggregation),
+        default=Aggregation.mean,
+        help="Aggregates encodings of themes into those of sub industries by "
+        "mean, sum, or mean weighing themes less the further they are from the "
+        "centroid of their sub industry",
+    )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    cluster_for_sub_and_industries(
-        path_theme_encoding=args.path_theme_encoding,
-        path_description_encoding=args.path_description_encoding,
-        path_sub_industry_label=args.path_sub_industry_label,
-        path_industry_label=args.path_industry_label,
+    run_cached_stage(
+        stage=partial(
+            cluster_for_sub_and_industries,
+            path_theme_encoding=args.path_theme_encoding,
+            path_description_encoding=args.path_description_encoding,
+            path_sub_industry_label=args.path_sub_industry_label,
+            path_industry_label=args.path_industry_label,
+            block_size=args.block_size,
+            num_workers=args.num_workers,
+            path_dir_k_search=args.path_dir_k_search,
+            k_selection=args.k_selection,
+            k_budget=args.k_budget,
+            k_num_points=args.k_num_points,
+            k_min_improvement=args.k_min_improvement,
+            k_criterion=args.k_criterion,
+            k_sample_size=args.k_sample_size,
+            cluster_backend=args.cluster_backend,
+            n_clusters=args.n_clusters,
+            mini_batch_size=args.mini_batch_size,
+            num_epochs=args.num_epochs,
+            cluster_sample_size=args.cluster_sample_size,
+            sub_industry_aggregation=args.sub_industry_aggregation,
+        ),
+        inputs=[args.path_theme_encoding, args.path_description_encoding],
+        outputs=[args.path_sub_industry_label, args.path_industry_label],
+        path_dir_cache=args.path_dir_cache,
+        # Mini batches are shuffled within blocks, so centres depend on blocks
+        exclude_params=(
+            {"block_size", "num_workers"}
+            if args.cluster_backend == ClusterBackend.kmeans
+            else {"num_workers"}
+        ),
     )
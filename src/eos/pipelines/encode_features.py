@@ -1,49 +1,236 @@
 import logging
+import os
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
+from typing import Callable, List, Optional
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
-from eos.data_interfaces.node_dfs_data_interface import NodeDFsDataInterface
-from eos.nodes.encode_features import _encode_features
+from eos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey
+from eos.data_interfaces.embedding_cache_data_interface import (
+    EmbeddingCacheDataInterface,
+)
+from eos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDFsDataInterface,
+    NodeType,
+)
+from eos.data_interfaces.streamed_encoding_data_interface import (
+    StreamedEncodingDataInterface,
+)
+from eos.nodes.encode_features import (
+    ENCODED_ATTR_KEYS,
+    STREAM_CHUNK_SIZE,
+    EncoderBackend,
+    TextEncoder,
+    _encode_features,
+    gather_raw_features,
+    stream_encode_list_text,
+)
+from eos.nodes.encode_pool import EncodePool, load_sentence_transformer
+from eos.nodes.encoder_daemon import connect_encoder_daemon
+from eos.nodes.encoding_precision import EncodingPrecision, quantise_encoding
+from eos.nodes.onnx_encoder import export_onnx_encoder, load_onnx_encoder
+from eos.nodes.stage_cache import digest_path
 
 logger = logging.getLogger(__name__)
 
+# Number of texts on which exported encoders are checked against PyTorch
+NUM_ONNX_CHECK_TEXTS = 256
+
+
+def return_path_feature_encoding(
+    path_dir_feature_encoding: Path, attr_key: NodeAttrKey | EdgeAttrKey
+) -> Path:
+    filename: str = attr_key.value
+    path_feature_encoding = (path_dir_feature_encoding / filename).with_suffix(".npy")
+
+    return path_feature_encoding
+
+
+def open_text_encoder(
+    stack: ExitStack,
+    path_sentence_transformer: Path,
+    model_digest: str,
+    encoder_backend: EncoderBackend,
+    path_dir_onnx: Optional[Path],
+    num_workers: int,
+    batch_size: int,
+    path_encoder_socket: Optional[Path],
+    list_text_check: List[str],
+) -> TextEncoder:
+    """Returns an encoder daemon serving the model if one answers, otherwise
+    loads the model, in a pool of worker processes if num_workers > 1, after
+    exporting it for ONNX backends. stack closes what is opened"""
+    if path_encoder_socket is not None:
+        daemon_encoder = connect_encoder_daemon(
+            path_socket=path_encoder_socket,
+            model_key=f"{model_digest}-{encoder_backend.value}",
+        )
+        if daemon_encoder is not None:
+            logger.info(f"Encoding with the encoder daemon on {path_encoder_socket}")
+            stack.callback(daemon_encoder.close)
+            return daemon_encoder
+
+        logger.info(
+            f"Loading the model because no encoder daemon of the same model and "
+            f"backend answers on {path_encoder_socket}"
+        )
+
+    path_model = path_sentence_transformer
+    model_loader: Callable[[Path], TextEncoder] = load_sentence_transformer
+    if encoder_backend != EncoderBackend.torch:
+        if path_dir_onnx is None:
+            raise ValueError(f"{encoder_backend} backend requires an ONNX directory")
+
+        export_onnx_encoder(
+            path_sentence_transformer=path_sentence_transformer,
+            path_dir_onnx=path_dir_onnx,
+            model_digest=model_digest,
+            quantise=encoder_backend.quantised,
+            list_text_check=list_text_check,
+        )
+
+        path_model = path_dir_onnx
+        model_loader = partial(
+            load_onnx_encoder,
+            quantised=encoder_backend.quantised,
+            # Pool workers share cores so each one must not use all of them
+            num_threads=(
+                max(1, (os.cpu_count() or 1) // num_workers)
+                if num_workers > 1
+                else None
+            ),
+        )
+
+    if num_workers > 1:
+        return stack.enter_context(
+            EncodePool(
+                path_model=path_model,
+                num_workers=num_workers,
+                batch_size=batch_size,
+                model_loader=model_loader,
+            )
+        )
+
+    return model_loader(path_model)
+
 
 def encode_features(
     path_node_dfs: Path,
     path_sentence_transformer: Path,
     path_dir_feature_encoding: Path,
+    path_embedding_cache: Optional[Path] = None,
+    num_workers: int = 1,
+    batch_size: int = 32,
+    encoder_backend: EncoderBackend = EncoderBackend.torch,
+    path_dir_onnx: Optional[Path] = None,
+    stream_chunk_size: Optional[int] = None,
+    encoding_precision: EncodingPrecision = EncodingPrecision.float32,
+    path_encoder_socket: Optional[Path] = None,
 ) -> None:
+    """With stream_chunk_size, encodings are written to disk that many texts
+    at a time and an interrupted run resumes from the last chunk written. If
+    an encoder daemon of the same model and backend answers on
+    path_encoder_socket, it encodes instead of a model loaded by this run"""
     # Data Access - Input
-    node_dfs_data_interface = NodeDFsDataInterface(filepath=path_node_dfs)
-    node_dfs = node_dfs_data_interface.load()
+    node_dfs_data_interface = NodeDFsDataInterface(
+        filepath=path_node_dfs, memory_map=True
+    )
+    node_dfs = node_dfs_data_interface.load(
+        ntypes=[NodeType.theme, NodeType.sector],
+        columns=[
+            NodeAttrKey.theme.value,
+            NodeAttrKey.description.value,
+            NodeAttrKey.sector.value,
+        ],
+    )
+
+    # Model files rather than their location identify the model
+    model_digest = digest_path(path=path_sentence_transformer, digest_memo={})
+
+    # Backends encode slightly differently so they never share vectors
+    model_key = f"{model_digest}-{encoder_backend.value}"
 
-    model = SentenceTransformer(model_name_or_path=str(path_sentence_transformer))
+    embedding_cache_data_interface: Optional[EmbeddingCacheDataInterface] = None
+    if path_embedding_cache is not None:
+        embedding_cache_data_interface = EmbeddingCacheDataInterface(
+            filepath=path_embedding_cache
+        )
 
-    # Task Processing & Data Access - Output
+    # Data Access - Output
     if not path_dir_feature_encoding.exists():
         logger.info(
             f"Creating {path_dir_feature_encoding} because it does not yet exist"
         )
         path_dir_feature_encoding.mkdir(parents=True, exist_ok=True)
 
-    for feature_encoding in _encode_features(model=model, node_dfs=node_dfs):
-        path_feature_encoding = (
-            path_dir_feature_encoding / feature_encoding.attr_key.value
-        ).with_suffix(".npy")
+    # Task Processing
+    with ExitStack() as stack:
+        model = open_text_encoder(
+            stack=stack,
+            path_sentence_transformer=path_sentence_transformer,
+            model_digest=model_digest,
+            encoder_backend=encoder_backend,
+            path_dir_onnx=path_dir_onnx,
+            num_workers=num_workers,
+            batch_size=batch_size,
+            path_encoder_socket=path_encoder_socket,
+            list_text_check=node_dfs.to_dict()[NodeType.theme][
+                NodeAttrKey.description.value
+            ]
+            .head(NUM_ONNX_CHECK_TEXTS)
+            .tolist(),
+        )
 
-        np.save(file=path_feature_encoding, arr=feature_encoding.encoding)
+        if stream_chunk_size is not None:
+            for attr_key, list_text in gather_raw_features(node_dfs=node_dfs):
+                logger.info(f"Streaming encoding of feature {attr_key}...")
+                stream_encode_list_text(
+                    model=model,
+                    list_text=list_text,
+                    streamed_encoding_data_interface=StreamedEncodingDataInterface(
+                        filepath=return_path_feature_encoding(
+                            path_dir_feature_encoding=path_dir_feature_encoding,
+                            attr_key=attr_key,
+                        )
+                    ),
+                    model_key=model_key,
+                    chunk_size=stream_chunk_size,
+                    embedding_cache_data_interface=embedding_cache_data_interface,
+                    precision=encoding_precision,
+                )
+            return
 
-        logger.info(
-            f"Saved encoding for feature {feature_encoding.attr_key} to {path_feature_encoding}"
-        )
+        for feature_encoding in _encode_features(
+            model=model,
+            node_dfs=node_dfs,
+            embedding_cache_data_interface=embedding_cache_data_interface,
+            model_key=model_key,
+        ):
+            path_feature_encoding = return_path_feature_encoding(
+                path_dir_feature_encoding=path_dir_feature_encoding,
+                attr_key=feature_encoding.attr_key,
+            )
+
+            np.save(
+                file=path_feature_encoding,
+                arr=quantise_encoding(
+                    encoding=feature_encoding.encoding, precision=encoding_precision
+                ),
+            )
+
+            logger.info(
+                f"Saved encoding for feature {feature_encoding.attr_key} to {path_feature_encoding}"
+            )
 
 
 if __name__ == "__main__":
     import argparse
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -73,11 +260,112 @@ if __name__ == "__main__":
         help="Path to a directory into which feature encodings "
         "are saved one at a time",
     )
+    parser.add_argument(
+        "-pec",
+        "--path_embedding_cache",
+        type=Path,
+        default=None,
+        help="Path to a SQLite file caching embeddings by model and text, so "
+        "that only texts not encoded by the same model before are encoded",
+    )
+    parser.add_argument(
+        "-nw",
+        "--num_workers",
+        type=int,
+        default=1,
+        help="Number of worker processes each encoding texts of similar lengths "
+        "with its own copy of the model, or 1 to encode in this process",
+    )
+    parser.add_argument(
+        "-bs",
+        "--batch_size",
+        type=int,
+        default=32,
+        help="Number of texts encoded together by each worker process",
+    )
+    parser.add_argument(
+        "-eb",
+        "--encoder_backend",
+        type=EncoderBackend,
+        choices=list(EncoderBackend),
+        default=EncoderBackend.torch,
+        help="Runs the sentence transformer with PyTorch, or exports it once to "
+        "ONNX, optionally with int8 quantised weights, and runs it with ONNX "
+        "Runtime",
+    )
+    parser.add_argument(
+        "-pdo",
+        "--path_dir_onnx",
+        type=Path,
+        default=None,
+        help="Path to a directory to which the sentence transformer is exported "
+        "for ONNX backends and from which the export is reused",
+    )
+    parser.add_argument(
+        "-scs",
+        "--stream_chunk_size",
+        type=int,
+        nargs="?",
+        const=STREAM_CHUNK_SIZE,
+        default=None,
+        help="Writes encodings into memory-mapped files this many texts at a "
+        f"time ({STREAM_CHUNK_SIZE} if no number is given) instead of holding "
+        "each feature's encoding in memory, and resumes an interrupted run "
+        "from the last chunk written",
+    )
+    parser.add_argument(
+        "-ep",
+        "--encoding_precision",
+        type=EncodingPrecision,
+        choices=list(EncodingPrecision),
+        default=EncodingPrecision.float32,
+        help="Saves encodings as float32, float16 or int8 codes with a float32 "
+        "scale per row, which readers dequantise a block at a time",
+    )
+    parser.add_argument(
+        "-pes",
+        "--path_encoder_socket",
+        type=Path,
+        default=None,
+        help="Path to the Unix socket of an encoder daemon started with "
+        "eos.pipelines.serve_encoder, which encodes instead of a model loaded "
+        "by this run if it serves the same model and backend",
+    )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    encode_features(
-        path_node_dfs=args.path_node_dfs,
-        path_sentence_transformer=args.path_sentence_transformer,
-        path_dir_feature_encoding=args.path_dir_feature_encoding,
+    run_cached_stage(
+        stage=partial(
+            encode_features,
+            path_node_dfs=args.path_node_dfs,
+            path_sentence_transformer=args.path_sentence_transformer,
+            path_dir_feature_encoding=args.path_dir_feature_encoding,
+            path_embedding_cache=args.path_embedding_cache,
+            num_workers=args.num_workers,
+            batch_size=args.batch_size,
+            encoder_backend=args.encoder_backend,
+            path_dir_onnx=args.path_dir_onnx,
+            stream_chunk_size=args.stream_chunk_size,
+            encoding_precision=args.encoding_precision,
+            path_encoder_socket=args.path_encoder_socket,
+        ),
+        inputs=[args.path_node_dfs, args.path_sentence_transformer],
+        outputs=[
+            return_path_feature_encoding(
+                path_dir_feature_encoding=args.path_dir_feature_encoding,
+                attr_key=attr_key,
+            )
+            for attr_key in ENCODED_ATTR_KEYS
+        ],
+        path_dir_cache=args.path_dir_cache,
+        exclude_params={"num_workers", "batch_size", "stream_chunk_size"},
     )
@@ -49,8 +49,10 @@ def eval_llm_output(
 
 if __name__ == "__main__":
     import argparse
+    from functools import partial
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -85,12 +87,27 @@ if __name__ == "__main__":
         required=True,
         help="Path to which typed industry clusters evaluation is saved",
     )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    eval_llm_output(
-        path_sub_industry_clusters=args.path_sub_industry_clusters,
-        path_industry_clusters=args.path_industry_clusters,
-        path_sub_industry_eval=args.path_sub_industry_eval,
-        path_industry_eval=args.path_industry_eval,
+    run_cached_stage(
+        stage=partial(
+            eval_llm_output,
+            path_sub_industry_clusters=args.path_sub_industry_clusters,
+            path_industry_clusters=args.path_industry_clusters,
+            path_sub_industry_eval=args.path_sub_industry_eval,
+            path_industry_eval=args.path_industry_eval,
+        ),
+        inputs=[args.path_sub_industry_clusters, args.path_industry_clusters],
+        outputs=[args.path_sub_industry_eval, args.path_industry_eval],
+        path_dir_cache=args.path_dir_cache,
     )
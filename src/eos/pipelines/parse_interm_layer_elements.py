@@ -16,11 +16,15 @@ def parse_interm_layer_elements(
     path_interm_edge_dfs: Path,
 ) -> None:
     # Data Access - Input
-    base_node_dfs_data_interface = NodeDFsDataInterface(filepath=path_base_node_dfs)
+    base_node_dfs_data_interface = NodeDFsDataInterface(
+        filepath=path_base_node_dfs, memory_map=True
+    )
     base_node_dfs = base_node_dfs_data_interface.load()
     base_node_dfs.validate()
 
-    base_edge_dfs_data_interface = EdgeDFsDataInterface(filepath=path_base_edge_dfs)
+    base_edge_dfs_data_interface = EdgeDFsDataInterface(
+        filepath=path_base_edge_dfs, memory_map=True
+    )
     base_edge_dfs = base_edge_dfs_data_interface.load()
     base_edge_dfs.validate()
 
@@ -45,8 +49,10 @@ def parse_interm_layer_elements(
 
 if __name__ == "__main__":
     import argparse
+    from functools import partial
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -96,14 +102,34 @@ if __name__ == "__main__":
         required=True,
         help="Path to which intermediate layer edge dataframes are saved",
     )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    parse_interm_layer_elements(
-        path_base_node_dfs=args.path_base_node_dfs,
-        path_base_edge_dfs=args.path_base_edge_dfs,
-        path_sub_industry_label=args.path_sub_industry_label,
-        path_industry_label=args.path_industry_label,
-        path_interm_node_dfs=args.path_interm_node_dfs,
-        path_interm_edge_dfs=args.path_interm_edge_dfs,
+    run_cached_stage(
+        stage=partial(
+            parse_interm_layer_elements,
+            path_base_node_dfs=args.path_base_node_dfs,
+            path_base_edge_dfs=args.path_base_edge_dfs,
+            path_sub_industry_label=args.path_sub_industry_label,
+            path_industry_label=args.path_industry_label,
+            path_interm_node_dfs=args.path_interm_node_dfs,
+            path_interm_edge_dfs=args.path_interm_edge_dfs,
+        ),
+        inputs=[
+            args.path_base_node_dfs,
+            args.path_base_edge_dfs,
+            args.path_sub_industry_label,
+            args.path_industry_label,
+        ],
+        outputs=[args.path_interm_node_dfs, args.path_interm_edge_dfs],
+        path_dir_cache=args.path_dir_cache,
     )
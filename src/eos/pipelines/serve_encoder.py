@@ -0,0 +1,104 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+from eos.data_interfaces.onnx_encoder_data_interface import OnnxEncoderDataInterface
+from eos.nodes.encode_features import EncoderBackend, TextEncoder
+from eos.nodes.encode_pool import load_sentence_transformer
+from eos.nodes.encoder_daemon import EncoderDaemon
+from eos.nodes.onnx_encoder import load_onnx_encoder
+from eos.nodes.stage_cache import digest_path
+
+logger = logging.getLogger(__name__)
+
+
+def serve_encoder(
+    path_sentence_transformer: Path,
+    path_encoder_socket: Path,
+    encoder_backend: EncoderBackend = EncoderBackend.torch,
+    path_dir_onnx: Optional[Path] = None,
+) -> None:
+    # Keyed like encode_features so that only runs with the same model use it
+    model_digest = digest_path(path=path_sentence_transformer, digest_memo={})
+    model_key = f"{model_digest}-{encoder_backend.value}"
+
+    model: TextEncoder
+    if encoder_backend == EncoderBackend.torch:
+        model = load_sentence_transformer(path_model=path_sentence_transformer)
+    elif path_dir_onnx is None:
+        raise ValueError(f"{encoder_backend} backend requires an ONNX directory")
+    else:
+        # Exported and checked by a previous run of encode_features, which
+        # does not export again while connected to a daemon of the same key
+        config = OnnxEncoderDataInterface(dirpath=path_dir_onnx).load_config()
+        if config is None or config.model_digest != model_digest:
+            raise ValueError(
+                f"ONNX export in {path_dir_onnx} is not of the sentence "
+                f"transformer in {path_sentence_transformer}, export it again "
+                "with a run of encode_features"
+            )
+        model = load_onnx_encoder(
+            path_model=path_dir_onnx, quantised=encoder_backend.quantised
+        )
+
+    with EncoderDaemon(
+        path_socket=path_encoder_socket, model=model, model_key=model_key
+    ) as encoder_daemon:
+        try:
+            encoder_daemon.serve_forever()
+        except KeyboardInterrupt:
+            logger.info(f"Stopped serving encodes on {path_encoder_socket}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from eos.nodes.project_logging import default_logging
+
+    default_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Keeps a sentence transformer loaded and serves encodes to "
+        "encode_features runs on a Unix socket until interrupted"
+    )
+    parser.add_argument(
+        "-pst",
+        "--path_sentence_transformer",
+        type=Path,
+        required=True,
+        help="Path to a directory from which a sentence transformer ideally optimised "
+        "for semantic similarity is loaded",
+    )
+    parser.add_argument(
+        "-pes",
+        "--path_encoder_socket",
+        type=Path,
+        required=True,
+        help="Path to the Unix socket on which encodes are served",
+    )
+    parser.add_argument(
+        "-eb",
+        "--encoder_backend",
+        type=EncoderBackend,
+        choices=list(EncoderBackend),
+        default=EncoderBackend.torch,
+        help="Runs the sentence transformer with PyTorch, or runs its ONNX "
+        "export with ONNX Runtime",
+    )
+    parser.add_argument(
+        "-pdo",
+        "--path_dir_onnx",
+        type=Path,
+        default=None,
+        help="Path to a directory to which encode_features exported the sentence "
+        "transformer for ONNX backends",
+    )
+
+    args = parser.parse_args()
+
+    serve_encoder(
+        path_sentence_transformer=args.path_sentence_transformer,
+        path_encoder_socket=args.path_encoder_socket,
+        encoder_backend=args.encoder_backend,
+        path_dir_onnx=args.path_dir_onnx,
+    )
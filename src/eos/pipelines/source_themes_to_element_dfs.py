@@ -28,8 +28,10 @@ def source_themes_to_element_dfs(
 
 if __name__ == "__main__":
     import argparse
+    from functools import partial
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -57,11 +59,26 @@ if __name__ == "__main__":
         required=True,
         help="Path to which edge dataframes are saved",
     )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    source_themes_to_element_dfs(
-        path_source_themes=args.path_source_themes,
-        path_node_dfs=args.path_node_dfs,
-        path_edge_dfs=args.path_edge_dfs,
+    run_cached_stage(
+        stage=partial(
+            source_themes_to_element_dfs,
+            path_source_themes=args.path_source_themes,
+            path_node_dfs=args.path_node_dfs,
+            path_edge_dfs=args.path_edge_dfs,
+        ),
+        inputs=[args.path_source_themes],
+        outputs=[args.path_node_dfs, args.path_edge_dfs],
+        path_dir_cache=args.path_dir_cache,
     )
@@ -1,29 +1,52 @@
+import logging
 from pathlib import Path
+from typing import Generator, Set
 
 from eos.data_interfaces.src_themes_data_interface import (
+    DEFAULT_CHUNK_SIZE,
     SourceThemes,
     SourceThemesDataInterface,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def type_raw_source_themes(
-    path_raw_source_themes: Path, path_source_themes: Path
+    path_raw_source_themes: Path,
+    path_source_themes: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
 ) -> None:
     # Data Access - Input & Task Processing
-    source_themes = SourceThemes.from_untyped_jsonl(filepath=path_raw_source_themes)
-    source_themes.validate()
+    seen_themes: Set[str] = set()
+
+    def typed_chunks() -> Generator[SourceThemes, None, None]:
+        for i, source_themes_chunk in enumerate(
+            SourceThemes.iter_untyped_jsonl(
+                filepath=path_raw_source_themes, chunk_size=chunk_size
+            )
+        ):
+            source_themes_chunk.validate(seen_themes=seen_themes)
+
+            logger.info(
+                f"Typed chunk {i} of {len(source_themes_chunk)} source "
+                f"themes ({len(seen_themes)} in total so far)"
+            )
+
+            yield source_themes_chunk
 
     # Data Access - Output
     source_themes_data_interface = SourceThemesDataInterface(
         filepath=path_source_themes
     )
-    source_themes_data_interface.save(source_themes=source_themes)
+    source_themes_data_interface.save_chunks(source_themes_chunks=typed_chunks())
 
 
 if __name__ == "__main__":
     import argparse
+    from functools import partial
 
     from eos.nodes.project_logging import default_logging
+    from eos.nodes.stage_cache import run_cached_stage
 
     default_logging()
 
@@ -45,10 +68,34 @@ if __name__ == "__main__":
         type=Path,
         help="Path to which typed source themes are saved",
     )
+    parser.add_argument(
+        "-cs",
+        "--chunk_size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of raw source themes typed and written at a time",
+    )
+    parser.add_argument(
+        "-pdc",
+        "--path_dir_cache",
+        type=Path,
+        default=None,
+        help="Path to a directory caching outputs of previous runs, which are "
+        "restored instead of running the stage again if inputs, parameters "
+        "and code are unchanged",
+    )
 
     args = parser.parse_args()
 
-    type_raw_source_themes(
-        path_raw_source_themes=args.path_raw_source_themes,
-        path_source_themes=args.path_source_themes,
+    run_cached_stage(
+        stage=partial(
+            type_raw_source_themes,
+            path_raw_source_themes=args.path_raw_source_themes,
+            path_source_themes=args.path_source_themes,
+            chunk_size=args.chunk_size,
+        ),
+        inputs=[args.path_raw_source_themes],
+        outputs=[args.path_source_themes],
+        path_dir_cache=args.path_dir_cache,
+        exclude_params={"chunk_size"},
     )
@@ -66,6 +66,22 @@ class TestDataPaths:
     def path_saved_edge_dfs(self) -> Path:
         return self.path_dir_output / "saved_edge_dfs.json"
 
+    @property
+    def path_saved_node_dfs_parquet(self) -> Path:
+        return self.path_dir_output / "saved_node_dfs.parquet"
+
+    @property
+    def path_saved_node_dfs_arrow(self) -> Path:
+        return self.path_dir_output / "saved_node_dfs.arrow"
+
+    @property
+    def path_saved_edge_dfs_parquet(self) -> Path:
+        return self.path_dir_output / "saved_edge_dfs.parquet"
+
+    @property
+    def path_saved_edge_dfs_arrow(self) -> Path:
+        return self.path_dir_output / "saved_edge_dfs.arrow"
+
     @property
     def path_parsed_source_themes(self) -> Path:
         return self.path_dir_output / "parsed_source_themes.json"
@@ -82,6 +98,30 @@ class TestDataPaths:
     def path_saved_nx_g(self) -> Path:
         return self.path_dir_output / "saved_nx_g.json"
 
+    @property
+    def path_saved_nx_g_csr(self) -> Path:
+        return self.path_dir_output / "saved_nx_g.csr"
+
+    @property
+    def path_dir_stage_cache(self) -> Path:
+        return self.path_dir_output / "stage_cache"
+
+    @property
+    def path_saved_embedding_cache(self) -> Path:
+        return self.path_dir_output / "embeddings.sqlite"
+
+    @property
+    def path_saved_streamed_encoding(self) -> Path:
+        return self.path_dir_output / "streamed_encoding.npy"
+
+    @property
+    def path_encoder_socket(self) -> Path:
+        return self.path_dir_output / "encoder.sock"
+
+    @property
+    def path_dir_k_search(self) -> Path:
+        return self.path_dir_output / "k_search"
+
 
 @fixture
 def test_data_paths() -> TestDataPaths:
@@ -90,7 +130,7 @@ def test_data_paths() -> TestDataPaths:
 
 @fixture
 def mock_source_themes() -> SourceThemes:
-    source_themes = SourceThemes(
+    source_themes = SourceThemes.from_members(
         members=[
             SourceTheme(theme="efg", sector="abc", description="dwmdm w w dw."),
             SourceTheme(theme="hij", sector="abc", description="dsakj sd kjsd aj."),
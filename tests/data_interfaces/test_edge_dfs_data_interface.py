@@ -1,4 +1,18 @@
-from eos.data_interfaces.edge_dfs_data_interface import EdgeDFs, EdgeDFsDataInterface
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from eos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
+    EdgeDF,
+    EdgeDFs,
+    EdgeDFsDataInterface,
+    EdgeType,
+    compact_edge_df,
+    eid_array,
+    upgrade_legacy_eid_columns,
+)
 from tests.conftest import TestDataPaths
 
 
@@ -18,3 +32,70 @@ def test_load(test_data_paths: TestDataPaths) -> None:
     edge_dfs = edge_dfs_data_interface.load()
 
     assert len(edge_dfs.members) == 1
+
+
+@pytest.mark.parametrize(
+    "path_attr", ["path_saved_edge_dfs_parquet", "path_saved_edge_dfs_arrow"]
+)
+def test_save_and_load_columnar(test_data_paths: TestDataPaths, path_attr: str) -> None:
+    filepath: Path = getattr(test_data_paths, path_attr)
+    df = pd.DataFrame(
+        {
+            EdgeAttrKey.src.value: [0, 1],
+            EdgeAttrKey.dst.value: [2, 2],
+            EdgeAttrKey.etype.value: [EdgeType.theme_to_sector.value] * 2,
+        }
+    )
+    edge_dfs = EdgeDFs(members=[EdgeDF(etype=EdgeType.theme_to_sector, df=df)])
+
+    edge_dfs_data_interface = EdgeDFsDataInterface(filepath=filepath)
+    edge_dfs_data_interface.save(edge_dfs)
+    loaded_edge_dfs = edge_dfs_data_interface.load()
+
+    assert loaded_edge_dfs.members[0].etype == EdgeType.theme_to_sector
+    assert loaded_edge_dfs.members[0].df.equals(compact_edge_df(df=df))
+
+
+def test_load_projection(test_data_paths: TestDataPaths) -> None:
+    df = pd.DataFrame(
+        {
+            EdgeAttrKey.src.value: [0, 1],
+            EdgeAttrKey.dst.value: [2, 2],
+            EdgeAttrKey.etype.value: [EdgeType.theme_to_sector.value] * 2,
+        }
+    )
+    edge_dfs_data_interface = EdgeDFsDataInterface(
+        filepath=test_data_paths.path_saved_edge_dfs_arrow
+    )
+    edge_dfs_data_interface.save(
+        EdgeDFs(members=[EdgeDF(etype=EdgeType.theme_to_sector, df=df)])
+    )
+
+    edge_dfs = edge_dfs_data_interface.load(
+        etypes=[EdgeType.theme_to_sector],
+        columns=[EdgeAttrKey.src.value, EdgeAttrKey.dst.value],
+    )
+
+    assert edge_dfs.members[0].df.columns.tolist() == [
+        EdgeAttrKey.src.value,
+        EdgeAttrKey.dst.value,
+    ]
+    assert eid_array(df=edge_dfs.members[0].df).tolist() == [[0, 2], [1, 2]]
+
+
+def test_upgrade_legacy_eid_columns() -> None:
+    df_legacy = pd.DataFrame(
+        {
+            EdgeAttrKey.eid.value: [[0, 2], [1, 2]],
+            EdgeAttrKey.etype.value: [EdgeType.theme_to_sector.value] * 2,
+        }
+    )
+
+    df = upgrade_legacy_eid_columns(df=df_legacy)
+
+    assert df.columns.tolist() == [
+        EdgeAttrKey.src.value,
+        EdgeAttrKey.dst.value,
+        EdgeAttrKey.etype.value,
+    ]
+    assert eid_array(df=df).tolist() == [[0, 2], [1, 2]]
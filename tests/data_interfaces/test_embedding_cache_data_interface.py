@@ -0,0 +1,28 @@
+import numpy as np
+
+from eos.data_interfaces.embedding_cache_data_interface import (
+    EmbeddingCacheDataInterface,
+)
+from tests.conftest import TestDataPaths
+
+
+def test_save_and_load(test_data_paths: TestDataPaths) -> None:
+    embedding_cache_data_interface = EmbeddingCacheDataInterface(
+        filepath=test_data_paths.path_saved_embedding_cache
+    )
+    vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+    embedding_cache_data_interface.save(
+        model_key="a", text_digests=[b"x", b"y", b"z"], vectors=vectors
+    )
+
+    is_found, found_vectors = embedding_cache_data_interface.load(
+        model_key="a", text_digests=[b"z", b"w", b"x"]
+    )
+    assert is_found.tolist() == [True, False, True]
+    assert np.array_equal(found_vectors, vectors[[2, 0]])
+
+    # Embeddings of other models are never returned
+    is_found, _ = embedding_cache_data_interface.load(
+        model_key="b", text_digests=[b"x"]
+    )
+    assert not is_found.any()
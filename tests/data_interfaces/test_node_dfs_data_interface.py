@@ -1,4 +1,18 @@
-from eos.data_interfaces.node_dfs_data_interface import NodeDFs, NodeDFsDataInterface
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDF,
+    NodeDFs,
+    NodeDFsDataInterface,
+    NodeType,
+    compact_node_df,
+)
+from eos.nodes.utils_validation import VALIDATION_LEVEL_ENV_VAR, ValidationLevel
 from tests.conftest import TestDataPaths
 
 
@@ -18,3 +32,205 @@ def test_load(test_data_paths: TestDataPaths) -> None:
     node_dfs = node_dfs_data_interface.load()
 
     assert len(node_dfs.members) == 2
+
+
+@pytest.mark.parametrize(
+    "path_attr", ["path_saved_node_dfs_parquet", "path_saved_node_dfs_arrow"]
+)
+def test_save_and_load_columnar(
+    mock_node_dfs: NodeDFs, test_data_paths: TestDataPaths, path_attr: str
+) -> None:
+    filepath: Path = getattr(test_data_paths, path_attr)
+    node_dfs_data_interface = NodeDFsDataInterface(filepath=filepath)
+    node_dfs_data_interface.save(mock_node_dfs)
+    node_dfs = node_dfs_data_interface.load()
+
+    assert filepath.is_dir()
+    assert node_dfs.ntypes == mock_node_dfs.ntypes
+    for node_df, mock_node_df in zip(node_dfs.members, mock_node_dfs.members):
+        assert node_df.df.equals(compact_node_df(df=mock_node_df.df))
+
+
+def test_unsupported_suffix(test_data_paths: TestDataPaths) -> None:
+    with pytest.raises(ValueError):
+        NodeDFsDataInterface(filepath=test_data_paths.path_dir_output / "a.csv")
+
+
+def test_load_memory_map(test_data_paths: TestDataPaths) -> None:
+    node_dfs = NodeDFs(
+        members=[
+            NodeDF(
+                ntype=NodeType.theme,
+                df=pd.DataFrame(
+                    {NodeAttrKey.nid.value: [0, 1], NodeAttrKey.theme.value: ["a", "b"]}
+                ),
+            )
+        ]
+    )
+    NodeDFsDataInterface(filepath=test_data_paths.path_saved_node_dfs_arrow).save(
+        node_dfs
+    )
+
+    mapped_node_dfs = NodeDFsDataInterface(
+        filepath=test_data_paths.path_saved_node_dfs_arrow, memory_map=True
+    ).load()
+    nid = mapped_node_dfs.members[0].df[NodeAttrKey.nid.value].to_numpy()
+
+    # Views of mapped buffers neither own their data nor allow writes
+    assert nid.tolist() == [0, 1]
+    assert not nid.flags.owndata
+    assert not nid.flags.writeable
+
+
+@pytest.mark.parametrize(
+    "path_attr", ["path_saved_node_dfs", "path_saved_node_dfs_arrow"]
+)
+def test_load_projection(
+    mock_node_dfs: NodeDFs, test_data_paths: TestDataPaths, path_attr: str
+) -> None:
+    node_dfs_data_interface = NodeDFsDataInterface(
+        filepath=getattr(test_data_paths, path_attr)
+    )
+    node_dfs_data_interface.save(mock_node_dfs)
+
+    node_dfs = node_dfs_data_interface.load(
+        ntypes=[NodeType.sector, NodeType.theme],
+        columns=[NodeAttrKey.description.value, NodeAttrKey.sector.value],
+    )
+    ntype_to_df = node_dfs.to_dict()
+
+    assert node_dfs.ntypes == [NodeType.sector, NodeType.theme]
+    assert ntype_to_df[NodeType.sector].columns.tolist() == [NodeAttrKey.sector.value]
+    assert ntype_to_df[NodeType.theme].columns.tolist() == [
+        NodeAttrKey.description.value
+    ]
+
+    with pytest.raises(ValueError):
+        node_dfs_data_interface.load(ntypes=[NodeType.industry])
+    with pytest.raises(ValueError):
+        node_dfs_data_interface.load(columns=[NodeAttrKey.label.value])
+
+
+def test_save_partial(mock_node_dfs: NodeDFs, test_data_paths: TestDataPaths) -> None:
+    path_base = test_data_paths.path_saved_node_dfs_arrow
+    path_partial = test_data_paths.path_dir_output / "partial_node_dfs.arrow"
+    NodeDFsDataInterface(filepath=path_base).save(mock_node_dfs)
+
+    df_sector = pd.DataFrame({NodeAttrKey.nid.value: [100]})
+    NodeDFsDataInterface(filepath=path_partial).save_partial(
+        node_dfs=NodeDFs(members=[NodeDF(ntype=NodeType.sector, df=df_sector)]),
+        path_base=path_base,
+    )
+    node_dfs = NodeDFsDataInterface(filepath=path_partial).load()
+    ntype_to_df = node_dfs.to_dict()
+
+    # Unchanged node types are hard links to files of the base store
+    path_theme = f"{NodeType.theme.value}.arrow"
+    assert node_dfs.ntypes == mock_node_dfs.ntypes
+    assert ntype_to_df[NodeType.sector].equals(df_sector)
+    assert ntype_to_df[NodeType.theme].equals(
+        compact_node_df(df=mock_node_dfs.to_dict()[NodeType.theme])
+    )
+    assert (path_partial / path_theme).samefile(path_base / path_theme)
+
+
+def test_validate_levels(monkeypatch: pytest.MonkeyPatch) -> None:
+    node_dfs = NodeDFs(
+        members=[
+            NodeDF(
+                ntype=NodeType.theme, df=pd.DataFrame({NodeAttrKey.nid.value: [0, 1]})
+            ),
+            NodeDF(
+                ntype=NodeType.sector, df=pd.DataFrame({NodeAttrKey.nid.value: [1]})
+            ),
+        ]
+    )
+
+    with pytest.raises(ValueError, match=r"Node ids \[1\] are not unique"):
+        node_dfs.validate()
+
+    node_dfs.validate(level=ValidationLevel.off)
+
+    monkeypatch.setenv(VALIDATION_LEVEL_ENV_VAR, ValidationLevel.off.value)
+    node_dfs.validate()
+
+
+def test_allocate_nid_and_nid_index() -> None:
+    node_dfs = NodeDFs(
+        members=[
+            NodeDF(
+                ntype=NodeType.theme,
+                df=pd.DataFrame(
+                    {
+                        NodeAttrKey.nid.value: [5, 1],
+                        NodeAttrKey.theme.value: ["b", "a"],
+                    }
+                ),
+            )
+        ]
+    )
+
+    assert node_dfs.max_nid() == 5
+    assert node_dfs.allocate_nid(num=2) == 6
+    assert node_dfs.allocate_nid(num=1) == 8  # Reservations are never reused
+
+    node_dfs.append(
+        NodeDF(
+            ntype=NodeType.sector,
+            df=pd.DataFrame(
+                {NodeAttrKey.nid.value: [9], NodeAttrKey.sector.value: ["c"]}
+            ),
+        )
+    )
+    assert node_dfs.max_nid() == 9
+
+    member, row = node_dfs.nid_index().locate(nid=np.array([9, 1, 5]))
+    assert member.tolist() == [1, 0, 0]
+    assert row.tolist() == [0, 1, 0]
+    assert node_dfs.attr_val(
+        nid=np.array([1, 5]), attr_key=NodeAttrKey.theme
+    ).tolist() == ["a", "b"]
+    with pytest.raises(KeyError):
+        node_dfs.nid_index().locate(nid=np.array([2]))
+
+    # Replacing a member rebuilds the index without an explicit invalidation
+    node_dfs.replace(
+        node_df=NodeDF(
+            ntype=NodeType.sector,
+            df=pd.DataFrame(
+                {NodeAttrKey.nid.value: [10, 11], NodeAttrKey.sector.value: ["c", "d"]}
+            ),
+        )
+    )
+    assert node_dfs.attr_val(
+        nid=np.array([11]), attr_key=NodeAttrKey.sector
+    ).tolist() == ["d"]
+    assert node_dfs.max_nid() == 11
+    with pytest.raises(ValueError):
+        node_dfs.replace(
+            node_df=NodeDF(
+                ntype=NodeType.industry,
+                df=pd.DataFrame({NodeAttrKey.nid.value: [12]}),
+            )
+        )
+
+    # Reassigned members rebuild the index even if a replaced dataframe of the
+    # same length is garbage collected and its identity reused
+    node_dfs.members = [
+        NodeDF(
+            ntype=NodeType.theme,
+            df=pd.DataFrame(
+                {NodeAttrKey.nid.value: [2, 3], NodeAttrKey.theme.value: ["e", "f"]}
+            ),
+        )
+    ]
+    assert node_dfs.attr_val(
+        nid=np.array([3]), attr_key=NodeAttrKey.theme
+    ).tolist() == ["f"]
+    assert node_dfs.max_nid() == 8  # Still above every id allocated
+
+    # Ids edited in place are only seen once invalidated
+    node_dfs.members[0].df[NodeAttrKey.nid.value] = [20, 3]
+    node_dfs.invalidate()
+    assert node_dfs.max_nid() == 20
+    assert node_dfs.allocate_nid(num=1) == 21
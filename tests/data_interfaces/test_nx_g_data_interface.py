@@ -16,3 +16,34 @@ def test_load(test_data_paths: TestDataPaths) -> None:
     nx_g = nx_g_data_interface.load()
 
     assert isinstance(nx_g, nx.Graph)
+
+
+def test_save_and_load_csr(mock_nx_g: nx.Graph, test_data_paths: TestDataPaths) -> None:
+    nx_g_data_interface = NXGDataInterface(filepath=test_data_paths.path_saved_nx_g_csr)
+    nx_g_data_interface.save(nx_g=mock_nx_g)
+    nx_g = nx_g_data_interface.load()
+
+    assert test_data_paths.path_saved_nx_g_csr.is_dir()
+    assert nx.utils.graphs_equal(nx_g, mock_nx_g)
+
+
+def test_load_lazy(test_data_paths: TestDataPaths) -> None:
+    di_g = nx.DiGraph()
+    di_g.add_node(5, ntype="Theme", theme="a")
+    di_g.add_node(2, ntype="Theme", theme="b")
+    di_g.add_node(9, ntype="Sector", sector="c")
+    di_g.add_edge(5, 9, etype="ThemeToSector")
+    di_g.add_edge(2, 9, etype="ThemeToSector")
+    NXGDataInterface(filepath=test_data_paths.path_saved_nx_g_csr).save(nx_g=di_g)
+
+    csr_graph = NXGDataInterface(
+        filepath=test_data_paths.path_saved_nx_g_csr, memory_map=True
+    ).load_lazy()
+
+    assert csr_graph.number_of_nodes() == 3
+    assert csr_graph.number_of_edges() == 2
+    assert csr_graph.successors(nid=5).tolist() == [9]
+    assert csr_graph.successors(nid=9).tolist() == []
+    assert csr_graph.out_etypes(nid=2) == ["ThemeToSector"]
+    assert csr_graph.node_attrs(nid=2) == {"ntype": "Theme", "theme": "b"}
+    assert nx.utils.graphs_equal(csr_graph.to_networkx(), di_g)
@@ -1,7 +1,9 @@
 import tempfile
 from pathlib import Path
+from typing import Set
 
 import orjson
+import pytest
 
 from eos.data_interfaces.src_themes_data_interface import (
     SourceThemes,
@@ -15,7 +17,7 @@ def test_from_untyped_jsonl(test_data_paths: TestDataPaths) -> None:
         filepath=test_data_paths.path_mock_untyped_jsonl
     )
 
-    assert len(source_themes.members) == 2
+    assert len(source_themes) == 2
 
 
 def test_save(test_data_paths: TestDataPaths, mock_source_themes: SourceThemes) -> None:
@@ -29,7 +31,7 @@ def test_save(test_data_paths: TestDataPaths, mock_source_themes: SourceThemes)
 
 def test_load(mock_source_themes: SourceThemes) -> None:
     with tempfile.NamedTemporaryFile(mode="wb") as f:
-        f.write(orjson.dumps(mock_source_themes))
+        f.write(orjson.dumps({"members": mock_source_themes.members}))
         f.flush()
 
         path_source_themes = Path(f.name)
@@ -39,4 +41,53 @@ def test_load(mock_source_themes: SourceThemes) -> None:
         )
         source_themes = source_themes_data_interface.load()
 
-        assert len(source_themes.members) == 2
+        assert source_themes.df.equals(mock_source_themes.df)
+
+
+def test_iter_untyped_jsonl(test_data_paths: TestDataPaths) -> None:
+    source_themes_chunks = list(
+        SourceThemes.iter_untyped_jsonl(
+            filepath=test_data_paths.path_mock_untyped_jsonl, chunk_size=1
+        )
+    )
+
+    assert len(source_themes_chunks) == 2
+    assert all(len(chunk) == 1 for chunk in source_themes_chunks)
+
+
+def test_validate_across_chunks(mock_source_themes: SourceThemes) -> None:
+    seen_themes: Set[str] = set()
+    mock_source_themes.validate(seen_themes=seen_themes)
+
+    assert len(seen_themes) == 2
+
+    with pytest.raises(ValueError):
+        mock_source_themes.validate(seen_themes=seen_themes)
+
+
+def test_save_chunks(
+    test_data_paths: TestDataPaths, mock_source_themes: SourceThemes
+) -> None:
+    source_themes_data_interface = SourceThemesDataInterface(
+        filepath=test_data_paths.path_saved_source_themes
+    )
+    n_members = source_themes_data_interface.save_chunks(
+        source_themes_chunks=[mock_source_themes, SourceThemes.from_records(records=[])]
+    )
+    source_themes = source_themes_data_interface.load()
+
+    assert n_members == 2
+    assert source_themes.df.equals(mock_source_themes.df)
+
+
+def test_from_records_rejects_unexpected_keys() -> None:
+    with pytest.raises(ValueError):
+        SourceThemes.from_records(
+            records=[{"theme": "a", "sector": "b", "description": "c", "x": "d"}]
+        )
+
+
+def test_members(mock_source_themes: SourceThemes) -> None:
+    source_themes = SourceThemes.from_members(members=mock_source_themes.members)
+
+    assert source_themes.df.equals(mock_source_themes.df)
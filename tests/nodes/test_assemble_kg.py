@@ -0,0 +1,147 @@
+from typing import Tuple
+
+import networkx as nx
+import pandas as pd
+import pytest
+from pytest import fixture
+
+from eos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
+    EdgeDF,
+    EdgeDFs,
+    EdgeType,
+)
+from eos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDF,
+    NodeDFs,
+    NodeType,
+)
+from eos.nodes.assemble_kg import (
+    csr_graph_from_element_dfs,
+    digraph_from_element_dfs,
+    edge_tuples_from_edge_dfs,
+    node_tuples_from_node_dfs,
+    validate_node_dfs_and_edge_dfs,
+)
+from eos.nodes.utils_validation import ValidationLevel
+
+
+@fixture
+def mock_element_dfs() -> Tuple[NodeDFs, EdgeDFs]:
+    node_dfs = NodeDFs(
+        members=[
+            NodeDF(
+                ntype=NodeType.theme,
+                df=pd.DataFrame(
+                    {
+                        NodeAttrKey.nid.value: [3, 0],
+                        NodeAttrKey.ntype.value: [NodeType.theme.value] * 2,
+                        NodeAttrKey.theme.value: ["a", "b"],
+                    }
+                ),
+            ),
+            NodeDF(
+                ntype=NodeType.sub_industry,
+                df=pd.DataFrame(
+                    {
+                        NodeAttrKey.nid.value: [1],
+                        NodeAttrKey.ntype.value: [NodeType.sub_industry.value],
+                        NodeAttrKey.label.value: [0],
+                    }
+                ),
+            ),
+        ]
+    )
+    edge_dfs = EdgeDFs(
+        members=[
+            EdgeDF(
+                etype=EdgeType.theme_to_sub_industry,
+                df=pd.DataFrame(
+                    {
+                        EdgeAttrKey.src.value: [3, 0],
+                        EdgeAttrKey.dst.value: [1, 1],
+                        EdgeAttrKey.etype.value: [EdgeType.theme_to_sub_industry.value]
+                        * 2,
+                    }
+                ),
+            )
+        ]
+    )
+
+    return node_dfs, edge_dfs
+
+
+def test_digraph_from_element_dfs(mock_element_dfs: Tuple[NodeDFs, EdgeDFs]) -> None:
+    node_dfs, edge_dfs = mock_element_dfs
+    nx_g_tuples = nx.DiGraph()
+    nx_g_tuples.add_nodes_from(node_tuples_from_node_dfs(node_dfs=node_dfs))
+    nx_g_tuples.add_edges_from(edge_tuples_from_edge_dfs(edge_dfs=edge_dfs))
+
+    nx_g = digraph_from_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    assert nx.utils.graphs_equal(nx_g, nx_g_tuples)
+    assert list(nx_g.predecessors(1)) == [3, 0]
+    assert nx_g.edges[3, 1] is nx_g.pred[1][3]
+
+    # Endpoints missing from node dataframes are named rather than a KeyError
+    edge_dfs.members[0].df.loc[0, EdgeAttrKey.src.value] = 7
+    with pytest.raises(
+        ValueError, match=f"{EdgeType.theme_to_sub_industry.value} edges.*7"
+    ):
+        digraph_from_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+
+def test_csr_graph_from_element_dfs(mock_element_dfs: Tuple[NodeDFs, EdgeDFs]) -> None:
+    node_dfs, edge_dfs = mock_element_dfs
+
+    csr_graph = csr_graph_from_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    assert csr_graph.nid.tolist() == [0, 1, 3]
+    assert csr_graph.successors(nid=3).tolist() == [1]
+    assert csr_graph.ntype(nid=1) == NodeType.sub_industry.value
+    assert nx.utils.graphs_equal(
+        csr_graph.to_networkx(),
+        digraph_from_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs),
+    )
+
+
+def test_csr_graph_from_element_dfs_dangling_endpoint(
+    mock_element_dfs: Tuple[NodeDFs, EdgeDFs],
+) -> None:
+    node_dfs, edge_dfs = mock_element_dfs
+
+    # Endpoints missing from node dataframes are not mapped to neighbouring nodes
+    edge_dfs.members[0].df.loc[0, EdgeAttrKey.dst.value] = 2
+    with pytest.raises(
+        ValueError, match=f"{EdgeType.theme_to_sub_industry.value} edges.*2"
+    ):
+        csr_graph_from_element_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+
+def test_validate_node_dfs_and_edge_dfs(
+    mock_element_dfs: Tuple[NodeDFs, EdgeDFs],
+) -> None:
+    node_dfs, edge_dfs = mock_element_dfs
+    validate_node_dfs_and_edge_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    df_edge = edge_dfs.members[0].df
+    df_edge[EdgeAttrKey.dst.value] = [1, 7]
+    with pytest.raises(ValueError, match=r"Edge endpoints \[7\] are not node ids"):
+        validate_node_dfs_and_edge_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    df_edge[EdgeAttrKey.src.value] = [3, 3]
+    df_edge[EdgeAttrKey.dst.value] = [1, 1]
+    with pytest.raises(ValueError, match=r"Nodes \[0\] are not endpoints"):
+        validate_node_dfs_and_edge_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    # Swapped endpoints only fail checks of node types of edge types
+    df_edge[EdgeAttrKey.src.value] = [1, 1]
+    df_edge[EdgeAttrKey.dst.value] = [3, 0]
+    validate_node_dfs_and_edge_dfs(
+        node_dfs=node_dfs, edge_dfs=edge_dfs, level=ValidationLevel.fast
+    )
+    with pytest.raises(ValueError, match=r"endpoints \[1\] which are not Theme"):
+        validate_node_dfs_and_edge_dfs(
+            node_dfs=node_dfs, edge_dfs=edge_dfs, level=ValidationLevel.full
+        )
@@ -1,11 +1,23 @@
 from unittest.mock import Mock
 
 import numpy as np
+import pytest
 from pytest import fixture
 from sentence_transformers import SentenceTransformer
 
+from eos.data_interfaces.embedding_cache_data_interface import (
+    EmbeddingCacheDataInterface,
+)
 from eos.data_interfaces.node_dfs_data_interface import NodeAttrKey, NodeDFs
-from eos.nodes.encode_features import _encode_features
+from eos.data_interfaces.streamed_encoding_data_interface import (
+    StreamedEncodingDataInterface,
+)
+from eos.nodes.encode_features import (
+    _encode_features,
+    encode_list_text_cached,
+    stream_encode_list_text,
+)
+from tests.conftest import TestDataPaths
 
 
 @fixture
@@ -42,3 +54,109 @@ def test_encode_features(  # type: ignore[no-any-unimported]
         assert (
             len(feature_encoding.encoding) == expected_lengths[i]
         ), f"Encoding length mismatch at index {i}"
+
+
+def test_encode_features_cached(
+    mock_node_dfs: NodeDFs, test_data_paths: TestDataPaths
+) -> None:
+    mock_model = Mock()
+    mock_model.encode = Mock(
+        side_effect=lambda sentences, show_progress_bar: np.array(
+            [[len(sentence), 1.0] for sentence in sentences]
+        )
+    )
+    embedding_cache_data_interface = EmbeddingCacheDataInterface(
+        filepath=test_data_paths.path_saved_embedding_cache
+    )
+
+    list_text = ["ab", "c", "ab"]
+    encoding = encode_list_text_cached(
+        model=mock_model,
+        list_text=list_text,
+        embedding_cache_data_interface=embedding_cache_data_interface,
+        model_key="model",
+    )
+    assert encoding.tolist() == [[2.0, 1.0], [1.0, 1.0], [2.0, 1.0]]
+    assert mock_model.encode.call_args.kwargs["sentences"] == ["ab", "c"]
+
+    # Only texts not cached before are encoded
+    encoding = encode_list_text_cached(
+        model=mock_model,
+        list_text=["c", "def"],
+        embedding_cache_data_interface=embedding_cache_data_interface,
+        model_key="model",
+    )
+    assert encoding.tolist() == [[1.0, 1.0], [3.0, 1.0]]
+    assert mock_model.encode.call_args.kwargs["sentences"] == ["def"]
+
+    results = list(
+        _encode_features(
+            model=mock_model,
+            node_dfs=mock_node_dfs,
+            embedding_cache_data_interface=embedding_cache_data_interface,
+            model_key="model",
+        )
+    )
+    assert [len(result.encoding) for result in results] == [2, 2, 1]
+
+
+def test_stream_encode_list_text_resumes(test_data_paths: TestDataPaths) -> None:
+    list_text = ["a", "bb", "ccc", "dddd", "eeeee"]
+    expected = [[len(text), 1.0] for text in list_text]
+    streamed_encoding_data_interface = StreamedEncodingDataInterface(
+        filepath=test_data_paths.path_saved_streamed_encoding
+    )
+
+    # The model fails on its second chunk as if the job were pre-empted
+    failing_model = Mock()
+    failing_model.encode = Mock(
+        side_effect=[
+            np.array([[len(text), 1.0] for text in list_text[:2]]),
+            RuntimeError("Pre-empted"),
+        ]
+    )
+    with pytest.raises(RuntimeError):
+        stream_encode_list_text(
+            model=failing_model,
+            list_text=list_text,
+            streamed_encoding_data_interface=streamed_encoding_data_interface,
+            model_key="model",
+            chunk_size=2,
+        )
+    progress = streamed_encoding_data_interface.load_progress()
+    assert progress is not None and progress.num_encoded == 2
+    assert not test_data_paths.path_saved_streamed_encoding.exists()
+
+    mock_model = Mock()
+    mock_model.encode = Mock(
+        side_effect=lambda sentences, show_progress_bar: np.array(
+            [[len(sentence), 1.0] for sentence in sentences]
+        )
+    )
+    stream_encode_list_text(
+        model=mock_model,
+        list_text=list_text,
+        streamed_encoding_data_interface=streamed_encoding_data_interface,
+        model_key="model",
+        chunk_size=2,
+    )
+
+    # Only texts after the last chunk written are encoded again
+    assert [call.kwargs["sentences"] for call in mock_model.encode.call_args_list] == [
+        ["ccc", "dddd"],
+        ["eeeee"],
+    ]
+    assert np.load(test_data_paths.path_saved_streamed_encoding).tolist() == expected
+    assert streamed_encoding_data_interface.load_progress() is None
+
+    # A finished encode leaves nothing to resume for other texts
+    stream_encode_list_text(
+        model=mock_model,
+        list_text=list_text[:1],
+        streamed_encoding_data_interface=streamed_encoding_data_interface,
+        model_key="model",
+        chunk_size=2,
+    )
+    assert np.load(test_data_paths.path_saved_streamed_encoding).tolist() == [
+        [1.0, 1.0]
+    ]
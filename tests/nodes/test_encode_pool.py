@@ -0,0 +1,40 @@
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from eos.nodes.encode_features import TextEncoder
+from eos.nodes.encode_pool import EncodePool, chunk_by_length
+
+
+class MockModel:
+    def encode(
+        self, sentences: List[str], show_progress_bar: bool, batch_size: int = 32
+    ) -> np.ndarray:
+        return np.array([[len(sentence), batch_size] for sentence in sentences])
+
+
+def load_mock_model(path_model: Path) -> TextEncoder:
+    return MockModel()
+
+
+def test_chunk_by_length() -> None:
+    chunks = chunk_by_length(list_text=["aaa", "a", "aa", "aaaa"], chunk_size=3)
+
+    assert [chunk.tolist() for chunk in chunks] == [[3, 0, 2], [1]]
+
+
+def test_encode_pool() -> None:
+    list_text = ["a" * n for n in [5, 1, 3, 3, 8, 2, 0]]
+
+    with EncodePool(
+        path_model=Path("unused"),
+        num_workers=2,
+        batch_size=1,
+        model_loader=load_mock_model,
+    ) as encode_pool:
+        encoding = encode_pool.encode(sentences=list_text, show_progress_bar=True)
+
+    # Encodings are reassembled in the order of the texts
+    assert encoding[:, 0].tolist() == [5, 1, 3, 3, 8, 2, 0]
+    assert (encoding[:, 1] == 1).all()
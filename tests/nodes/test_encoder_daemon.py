@@ -0,0 +1,55 @@
+import threading
+from typing import List
+
+import numpy as np
+import pytest
+
+from eos.nodes import encoder_daemon
+from eos.nodes.encoder_daemon import EncoderDaemon, connect_encoder_daemon
+from tests.conftest import TestDataPaths
+
+
+class MockEncoder:
+    def encode(self, sentences: List[str], show_progress_bar: bool) -> np.ndarray:
+        if "fail" in sentences:
+            raise ValueError("Cannot encode")
+
+        return np.array([[len(sentence), 1.0] for sentence in sentences])
+
+
+def test_encoder_daemon(
+    test_data_paths: TestDataPaths, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path_socket = test_data_paths.path_encoder_socket
+    assert connect_encoder_daemon(path_socket=path_socket) is None
+
+    # A socket file left behind by a daemon which is gone is replaced
+    path_socket.touch()
+    daemon = EncoderDaemon(path_socket=path_socket, model=MockEncoder(), model_key="a")
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        assert connect_encoder_daemon(path_socket=path_socket, model_key="b") is None
+
+        daemon_encoder = connect_encoder_daemon(path_socket=path_socket, model_key="a")
+        assert daemon_encoder is not None
+
+        # Texts are sent in several requests over one connection
+        monkeypatch.setattr(encoder_daemon, "DAEMON_REQUEST_SIZE", 2)
+        encoding = daemon_encoder.encode(
+            sentences=["a", "bb", "ccc"], show_progress_bar=False
+        )
+        assert encoding.tolist() == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+
+        with pytest.raises(RuntimeError):
+            daemon_encoder.encode(sentences=["fail"], show_progress_bar=False)
+        daemon_encoder.close()
+
+        with pytest.raises(ValueError):
+            EncoderDaemon(path_socket=path_socket, model=MockEncoder(), model_key="a")
+    finally:
+        daemon.shutdown()
+        daemon.server_close()
+        thread.join()
+
+    assert not path_socket.exists()
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from eos.nodes.encoding_precision import (
+    EncodingPrecision,
+    dequantise_encoding,
+    mean_dequantised,
+    quantise_encoding,
+    stored_precision,
+)
+from tests.conftest import TestDataPaths
+
+
+def test_quantise_encoding() -> None:
+    encoding = np.random.default_rng(seed=0).normal(size=(10, 8)).astype(np.float32)
+    encoding[3] = 0.0  # A row of zeros has no scale
+
+    for precision, tolerance in [
+        (EncodingPrecision.float32, 0.0),
+        (EncodingPrecision.float16, 1e-2),
+        (EncodingPrecision.int8, 2e-2),
+    ]:
+        stored = quantise_encoding(encoding=encoding, precision=precision)
+        dequantised = dequantise_encoding(stored=stored)
+
+        assert stored_precision(stored=stored) == precision
+        assert dequantised.dtype == np.float32
+        assert dequantised.shape == encoding.shape
+        assert np.abs(dequantised - encoding).max() <= tolerance
+        assert not dequantised[3].any()
+
+
+def test_mean_dequantised(test_data_paths: TestDataPaths) -> None:
+    rng = np.random.default_rng(seed=0)
+    theme_encoding = rng.normal(size=(10, 4)).astype(np.float32)
+    description_encoding = rng.normal(size=(10, 4)).astype(np.float32)
+
+    # Int8 records are read back memory-mapped as by the clustering stage
+    path = test_data_paths.path_dir_output / "int8_encoding.npy"
+    np.save(
+        path,
+        quantise_encoding(
+            encoding=description_encoding, precision=EncodingPrecision.int8
+        ),
+    )
+    mean = mean_dequantised(
+        list_stored=[theme_encoding, np.load(path, mmap_mode="r")], block_size=3
+    )
+
+    assert mean.dtype == np.float32
+    assert np.allclose(mean, (theme_encoding + description_encoding) / 2, atol=1e-2)
+
+    with pytest.raises(ValueError):
+        mean_dequantised(list_stored=[theme_encoding, description_encoding[:5]])
@@ -0,0 +1,86 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from eos.data_interfaces.k_search_checkpoint_data_interface import (
+    KSearchCheckpointDataInterface,
+)
+from eos.nodes import k_search as k_search_module
+from eos.nodes.k_search import KCriterion, KSearch, digest_search, fit_candidate
+from tests.conftest import TestDataPaths
+
+
+def test_k_search_parallel() -> None:
+    encoding = np.random.default_rng(seed=0).random((60, 4))
+
+    with KSearch(encoding=encoding) as k_search:
+        scores = k_search.evaluate(list_n_clusters=[3, 4, 5, 6])
+        n_clusters, labels = k_search.best()
+    with KSearch(encoding=encoding, num_workers=2) as k_search:
+        assert k_search.evaluate(list_n_clusters=[3, 4, 5, 6]) == scores
+        assert k_search.best()[0] == n_clusters
+
+    # Labels of the best candidate are those of fitting it again
+    assert n_clusters == max(scores, key=lambda k: scores[k])
+    assert np.array_equal(labels, fit_candidate(encoding, n_clusters=n_clusters)[1])
+
+
+@pytest.mark.parametrize("criterion", list(KCriterion))
+def test_k_search_criterion(criterion: KCriterion) -> None:
+    encoding = np.random.default_rng(seed=0).random((60, 4))
+
+    with KSearch(encoding=encoding, criterion=criterion, sample_size=30) as k_search:
+        scores = k_search.evaluate(list_n_clusters=[3, 4, 5])
+    with KSearch(
+        encoding=encoding, num_workers=2, criterion=criterion, sample_size=30
+    ) as k_search:
+        assert k_search.evaluate(list_n_clusters=[3, 4, 5]) == pytest.approx(scores)
+
+    # Exact silhouettes over shared distances match those computed directly
+    if criterion == KCriterion.silhouette:
+        for n_clusters, score in scores.items():
+            assert score == pytest.approx(
+                fit_candidate(encoding, n_clusters=n_clusters)[0], abs=1e-6
+            )
+
+    # Scores by another criterion are never resumed from this search
+    assert len(
+        {digest_search(encoding, random_state=42, criterion=c) for c in KCriterion}
+    ) == len(KCriterion)
+
+
+def test_k_search_resumes(
+    test_data_paths: TestDataPaths, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    encoding = np.random.default_rng(seed=0).random((60, 4))
+    k_search_checkpoint_data_interface = KSearchCheckpointDataInterface(
+        dirpath=test_data_paths.path_dir_k_search
+    )
+
+    with KSearch(
+        encoding=encoding,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+    ) as k_search:
+        scores = k_search.evaluate(list_n_clusters=[3, 4])
+        best = k_search.best()
+
+    # Only candidates missing from the checkpoint are fitted again
+    fitted = []
+
+    def fit_candidate_recorded(
+        encoding: np.ndarray, n_clusters: int, **kwargs: Any
+    ) -> tuple:
+        fitted.append(n_clusters)
+        return fit_candidate(encoding, n_clusters, **kwargs)
+
+    monkeypatch.setattr(k_search_module, "fit_candidate", fit_candidate_recorded)
+    with KSearch(
+        encoding=encoding,
+        k_search_checkpoint_data_interface=k_search_checkpoint_data_interface,
+    ) as k_search:
+        assert k_search.best()[0] == best[0]
+        assert np.array_equal(k_search.best()[1], best[1])
+        assert k_search.evaluate(list_n_clusters=[3, 4, 5])[3] == scores[3]
+
+    assert fitted == [5]
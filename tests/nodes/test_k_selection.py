@@ -0,0 +1,65 @@
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from eos.nodes.k_search import KSearch
+from eos.nodes.k_selection import (
+    KSelection,
+    KSelectionConfig,
+    select_n_clusters,
+    spread_n_clusters,
+)
+
+
+class MockKSearch(KSearch):
+    """Scores numbers of clusters on a curve peaking at 37 without fitting"""
+
+    def __init__(self) -> None:
+        self.scores: Dict[int, float] = {}
+        self.executor = None
+
+    def evaluate(self, list_n_clusters: List[int]) -> Dict[int, float]:
+        for n_clusters in list_n_clusters:
+            self.scores[n_clusters] = -float((n_clusters - 37) ** 2)
+
+        return {n_clusters: self.scores[n_clusters] for n_clusters in list_n_clusters}
+
+
+def test_spread_n_clusters() -> None:
+    assert spread_n_clusters(10, 20, 3) == [10, 15, 20]
+    assert spread_n_clusters(10, 12, 8) == [10, 11, 12]
+    assert spread_n_clusters(10, 20, 1) == [15]
+    assert spread_n_clusters(10, 20, 0) == []
+
+
+@pytest.mark.parametrize("strategy", list(KSelection))
+def test_select_n_clusters(strategy: KSelection) -> None:
+    k_search = MockKSearch()
+
+    n_clusters = select_n_clusters(
+        k_search=k_search,
+        n_lowest=20,
+        n_highest=199,
+        config=KSelectionConfig(strategy=strategy),
+    )
+
+    assert n_clusters == 37
+    if strategy != KSelection.exhaustive:
+        assert len(k_search.scores) < 180 // 4
+
+
+@pytest.mark.parametrize("strategy", list(KSelection))
+def test_select_n_clusters_budget(strategy: KSelection) -> None:
+    k_search = MockKSearch()
+
+    n_clusters = select_n_clusters(
+        k_search=k_search,
+        n_lowest=20,
+        n_highest=199,
+        config=KSelectionConfig(strategy=strategy, budget=10),
+    )
+
+    assert len(k_search.scores) <= 10
+    assert n_clusters == max(k_search.scores, key=lambda k: k_search.scores[k])
+    assert np.all(np.isin(list(k_search.scores), np.arange(20, 200)))
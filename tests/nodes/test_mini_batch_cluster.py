@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from sklearn.metrics import adjusted_rand_score
+
+from eos.nodes.encoding_precision import (
+    EncodingPrecision,
+    mean_dequantised,
+    quantise_encoding,
+)
+from eos.nodes.k_means_cluster import derive_sub_industry_encoding
+from eos.nodes.mini_batch_cluster import (
+    MiniBatchConfig,
+    _cluster_for_sub_and_industries_streamed,
+    assign_to_centres,
+    fit_mini_batch_kmeans,
+)
+from eos.nodes.segment_reduction import Aggregation
+from tests.conftest import TestDataPaths
+
+
+def test_fit_mini_batch_kmeans(test_data_paths: TestDataPaths) -> None:
+    rng = np.random.default_rng(seed=0)
+    centres = rng.normal(scale=10.0, size=(12, 8))
+    truth = rng.integers(12, size=600)
+    theme_encoding = (centres[truth] + rng.normal(size=(600, 8))).astype(np.float32)
+    description_encoding = centres[truth] + rng.normal(size=(600, 8))
+
+    # Int8 themes are read memory-mapped as by the clustering stage
+    path = test_data_paths.path_dir_output / "streamed_theme_encoding.npy"
+    np.save(
+        path,
+        quantise_encoding(encoding=theme_encoding, precision=EncodingPrecision.int8),
+    )
+    list_stored = [
+        np.load(path, mmap_mode="r"),
+        quantise_encoding(
+            encoding=description_encoding, precision=EncodingPrecision.float16
+        ),
+    ]
+
+    fitted_centres = fit_mini_batch_kmeans(
+        list_stored=list_stored,
+        n_clusters=12,
+        block_size=50,
+        mini_batch_config=MiniBatchConfig(batch_size=64),
+    )
+    labels, cluster_encoding = assign_to_centres(
+        centres=fitted_centres, list_stored=list_stored, block_size=50
+    )
+
+    assert adjusted_rand_score(truth, labels) == 1.0
+    assert np.array_equal(np.unique(labels), np.arange(12))
+    # Encodings of clusters are those derived from all averaged rows at once
+    assert np.allclose(
+        cluster_encoding,
+        derive_sub_industry_encoding(
+            per_theme_encoding=mean_dequantised(list_stored=list_stored),
+            sub_industry_label=labels,
+        ),
+        atol=1e-5,
+    )
+
+
+def test_assign_to_centres_drops_empty_clusters() -> None:
+    encoding = np.array([[0.0], [0.1], [5.0], [5.1]], dtype=np.float32)
+    centres = np.array([[0.0], [100.0], [5.0]], dtype=np.float32)
+
+    labels, cluster_encoding = assign_to_centres(
+        centres=centres, list_stored=[encoding], block_size=3
+    )
+
+    assert labels.tolist() == [0, 0, 1, 1]
+    assert np.allclose(cluster_encoding, [[0.05], [5.05]])
+
+
+@pytest.mark.parametrize("aggregation", list(Aggregation))
+def test_assign_to_centres_aggregation(aggregation: Aggregation) -> None:
+    rng = np.random.default_rng(seed=0)
+    encoding = rng.random((40, 3)).astype(np.float32)
+    encoding[:20] += 10.0
+
+    # Centres at the means of their rows are the centroids of a weighted mean
+    labels = (np.arange(40) >= 20).astype(np.int32)
+    centres = derive_sub_industry_encoding(
+        per_theme_encoding=encoding, sub_industry_label=labels
+    )
+
+    streamed_labels, cluster_encoding = assign_to_centres(
+        centres=centres, list_stored=[encoding], block_size=7, aggregation=aggregation
+    )
+
+    assert np.array_equal(streamed_labels, labels)
+    assert np.allclose(
+        cluster_encoding,
+        derive_sub_industry_encoding(
+            per_theme_encoding=encoding,
+            sub_industry_label=labels,
+            aggregation=aggregation,
+        ),
+        atol=1e-4,
+    )
+
+
+def test_cluster_for_sub_and_industries_streamed() -> None:
+    rng = np.random.default_rng(seed=0)
+    theme_encoding = rng.random((100, 5))
+    description_encoding = rng.random((100, 5))
+
+    sub_industry_label, industry_label = _cluster_for_sub_and_industries_streamed(
+        theme_encoding=theme_encoding,
+        description_encoding=description_encoding,
+        block_size=30,
+        mini_batch_config=MiniBatchConfig(sample_size=60, batch_size=16),
+    )
+
+    # The number of sub industries is searched on 60 themes and scaled to 100
+    assert sub_industry_label.shape == (100,)
+    assert 20 <= len(np.unique(sub_industry_label)) <= 50
+    assert industry_label.shape == (len(np.unique(sub_industry_label)),)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from eos.data_interfaces.onnx_encoder_data_interface import PoolingMode
+from eos.nodes.onnx_encoder import (
+    OnnxEncoder,
+    get_pooling_mode,
+    min_cosine_similarity,
+    pool_token_embeddings,
+)
+from tests.conftest import TestDataPaths
+
+
+def test_pool_token_embeddings() -> None:
+    token_embeddings = np.array([[[1.0, 2.0], [3.0, 0.0], [100.0, 100.0]]])
+    attention_mask = np.array([[1, 1, 0]])  # The last token is padding
+
+    pooled = {
+        pooling_mode: pool_token_embeddings(
+            token_embeddings=token_embeddings,
+            attention_mask=attention_mask,
+            pooling_mode=pooling_mode,
+        ).tolist()
+        for pooling_mode in PoolingMode
+    }
+
+    assert pooled[PoolingMode.mean] == [[2.0, 1.0]]
+    assert pooled[PoolingMode.cls] == [[1.0, 2.0]]
+    assert pooled[PoolingMode.max] == [[3.0, 2.0]]
+
+
+def test_get_pooling_mode() -> None:
+    assert get_pooling_mode(pooling_config={"pooling_mode": "cls"}) == PoolingMode.cls
+    assert (
+        get_pooling_mode(
+            pooling_config={
+                "pooling_mode_cls_token": False,
+                "pooling_mode_mean_tokens": True,
+                "pooling_mode_max_tokens": False,
+                "pooling_mode_mean_sqrt_len_tokens": False,
+            }
+        )
+        == PoolingMode.mean
+    )
+    with pytest.raises(ValueError):
+        get_pooling_mode(
+            pooling_config={
+                "pooling_mode_mean_tokens": False,
+                "pooling_mode_mean_sqrt_len_tokens": True,
+            }
+        )
+
+
+def test_min_cosine_similarity() -> None:
+    reference = np.array([[1.0, 0.0], [0.0, 1.0]])
+    candidate = np.array([[2.0, 0.0], [1.0, 1.0]])
+
+    assert min_cosine_similarity(reference=reference, candidate=candidate) == (
+        pytest.approx(np.sqrt(0.5))
+    )
+    with pytest.raises(ValueError):
+        min_cosine_similarity(reference=reference[:0], candidate=candidate[:0])
+
+
+def test_onnx_encoder_requires_export(test_data_paths: TestDataPaths) -> None:
+    with pytest.raises(ValueError):
+        OnnxEncoder(path_dir_onnx=test_data_paths.path_dir_output / "onnx")
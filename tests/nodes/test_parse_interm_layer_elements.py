@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+import pytest
 from pytest import fixture
 
 from eos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey, EdgeDF, EdgeType
@@ -11,6 +12,7 @@ from eos.data_interfaces.node_dfs_data_interface import (
 )
 from eos.nodes.parse_interm_layer_elements import (
     parse_industry_nodes,
+    parse_industry_to_sector_edges,
     parse_sub_industry_nodes,
     parse_sub_industry_to_industry_edges,
     parse_theme_to_sub_industry_edges,
@@ -97,7 +99,10 @@ def test_parse_theme_to_sub_industry_edges() -> None:
     assert isinstance(edge_df, EdgeDF)
     assert edge_df.etype == EdgeType.theme_to_sub_industry
     assert len(edge_df.df) == len(sub_industry_label)
-    assert all(edge_df.df.columns == [EdgeAttrKey.eid.value, EdgeAttrKey.etype.value])
+    assert all(
+        edge_df.df.columns
+        == [EdgeAttrKey.src.value, EdgeAttrKey.dst.value, EdgeAttrKey.etype.value]
+    )
     assert (
         edge_df.df[EdgeAttrKey.etype.value].unique()[0]
         == EdgeType.theme_to_sub_industry.value
@@ -127,8 +132,27 @@ def test_parse_sub_industry_to_industry_edges() -> None:
     assert isinstance(edge_df, EdgeDF)
     assert edge_df.etype == EdgeType.sub_industry_to_industry
     assert len(edge_df.df) == len(industry_label)
-    assert all(edge_df.df.columns == [EdgeAttrKey.eid.value, EdgeAttrKey.etype.value])
+    assert all(
+        edge_df.df.columns
+        == [EdgeAttrKey.src.value, EdgeAttrKey.dst.value, EdgeAttrKey.etype.value]
+    )
     assert (
         edge_df.df[EdgeAttrKey.etype.value].unique()[0]
         == EdgeType.sub_industry_to_industry.value
     )
+
+
+def test_parse_industry_to_sector_edges() -> None:
+    df_industry = pd.DataFrame({NodeAttrKey.nid.value: [10, 11, 12]})
+    df_sector = pd.DataFrame({NodeAttrKey.nid.value: [20, 21]})
+
+    edge_df = parse_industry_to_sector_edges(df_industry, df_sector)
+    assert edge_df.etype == EdgeType.industry_to_sector
+    assert edge_df.df[EdgeAttrKey.src.value].tolist() == [10, 11, 12]
+    assert edge_df.df[EdgeAttrKey.dst.value].tolist() == [20, 21, 20]
+
+    # Industries cannot be linked without sectors
+    df_no_sector = pd.DataFrame({NodeAttrKey.nid.value: np.empty(0, dtype=np.int64)})
+    with pytest.raises(ValueError):
+        parse_industry_to_sector_edges(df_industry, df_no_sector)
+    assert len(parse_industry_to_sector_edges(df_industry[:0], df_no_sector).df) == 0
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from eos.nodes.segment_reduction import (
+    Aggregation,
+    compact_segment_ids,
+    reduce_segments,
+)
+
+
+def test_compact_segment_ids() -> None:
+    segment_ids, num_segments = compact_segment_ids(np.array([7, 2, 7, 4, 2]))
+
+    assert segment_ids.tolist() == [2, 0, 2, 1, 0]
+    assert num_segments == 3
+
+    with pytest.raises(ValueError):
+        compact_segment_ids(np.array([0, -1]))
+
+
+@pytest.mark.parametrize("aggregation", [Aggregation.mean, Aggregation.sum])
+def test_reduce_segments(aggregation: Aggregation) -> None:
+    rng = np.random.default_rng(seed=0)
+    values = rng.random((200, 5)).astype(np.float32)
+    segment_ids = rng.choice([1, 3, 4, 8, 9], size=200)
+
+    reduced = reduce_segments(
+        values=values, segment_ids=segment_ids, aggregation=aggregation
+    )
+
+    # Segments in ascending order of ids as a loop over np.unique gives them
+    expected = np.array(
+        [
+            getattr(np, aggregation.value)(values[segment_ids == segment_id], axis=0)
+            for segment_id in np.unique(segment_ids)
+        ]
+    )
+    assert reduced.dtype == np.float32
+    assert np.allclose(reduced, expected, atol=1e-5)
+
+
+def test_reduce_segments_weighted_mean() -> None:
+    values = np.array([[0.0], [1.0], [2.0], [10.0], [5.0], [5.0]])
+    segment_ids = np.array([0, 0, 0, 0, 1, 1])
+
+    reduced = reduce_segments(
+        values=values, segment_ids=segment_ids, aggregation=Aggregation.weighted_mean
+    )
+
+    # The outlier pulls the weighted mean of the first segment less than the
+    # mean, and identical rows weigh the same
+    assert 1.0 < reduced[0, 0] < values[:4].mean()
+    assert reduced[1, 0] == 5.0
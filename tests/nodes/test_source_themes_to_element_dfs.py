@@ -1,5 +1,12 @@
-from eos.data_interfaces.src_themes_data_interface import SourceThemes
-from eos.nodes.source_themes_to_element_dfs import _source_themes_to_element_dfs
+import numpy as np
+
+from eos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey, EdgeType
+from eos.data_interfaces.node_dfs_data_interface import NodeAttrKey, NodeType
+from eos.data_interfaces.src_themes_data_interface import SourceTheme, SourceThemes
+from eos.nodes.source_themes_to_element_dfs import (
+    _source_themes_to_element_dfs,
+    assign_theme_and_sector_nids,
+)
 
 
 def test_source_themes_to_element_dfs(mock_source_themes: SourceThemes) -> None:
@@ -7,3 +14,35 @@ def test_source_themes_to_element_dfs(mock_source_themes: SourceThemes) -> None:
 
     assert len(element_dfs[0].members) == 2
     assert len(element_dfs[1].members) == 1
+
+
+def test_assign_theme_and_sector_nids() -> None:
+    nid_theme, nid_sector = assign_theme_and_sector_nids(
+        sector_codes=np.array([0, 0, 1, 0, 2, 1]), n_sectors=3
+    )
+
+    # Sector nodes take the id right after their first theme
+    assert nid_theme.tolist() == [0, 2, 3, 5, 6, 8]
+    assert nid_sector.tolist() == [1, 4, 7]
+
+
+def test_source_themes_to_element_dfs_multi_sector() -> None:
+    source_themes = SourceThemes.from_members(
+        members=[
+            SourceTheme(theme="a", sector="x", description="da"),
+            SourceTheme(theme="b", sector="y", description="db"),
+            SourceTheme(theme="c", sector="x", description="dc"),
+        ]
+    )
+
+    node_dfs, edge_dfs = _source_themes_to_element_dfs(source_themes=source_themes)
+    ntype_to_df = node_dfs.to_dict()
+    df_tts = edge_dfs.to_dict()[EdgeType.theme_to_sector]
+
+    assert ntype_to_df[NodeType.theme][NodeAttrKey.nid.value].tolist() == [0, 2, 4]
+    assert ntype_to_df[NodeType.sector][NodeAttrKey.sector.value].tolist() == [
+        "x",
+        "y",
+    ]
+    assert df_tts[EdgeAttrKey.src.value].tolist() == [0, 2, 4]
+    assert df_tts[EdgeAttrKey.dst.value].tolist() == [1, 3, 1]
@@ -0,0 +1,60 @@
+from functools import partial
+from pathlib import Path
+from typing import List
+
+from eos.nodes.stage_cache import run_cached_stage
+from tests.conftest import TestDataPaths
+
+# Parameters are part of cache keys so runs are counted out of band
+runs: List[str] = []
+
+
+def copy_upper(
+    path_input: Path, path_output: Path, suffix: str, num_workers: int = 1
+) -> None:
+    runs.append(suffix)
+    path_output.write_text(path_input.read_text().upper() + suffix)
+
+
+def test_run_cached_stage(test_data_paths: TestDataPaths) -> None:
+    path_input = test_data_paths.path_dir_output / "stage_input.txt"
+    path_output = test_data_paths.path_dir_output / "stage_output.txt"
+    path_input.parent.mkdir(parents=True, exist_ok=True)
+    path_input.write_text("abc")
+
+    def run(suffix: str, num_workers: int = 1) -> None:
+        run_cached_stage(
+            stage=partial(
+                copy_upper,
+                path_input=path_input,
+                path_output=path_output,
+                suffix=suffix,
+                num_workers=num_workers,
+            ),
+            inputs=[path_input],
+            outputs=[path_output],
+            path_dir_cache=test_data_paths.path_dir_stage_cache,
+            exclude_params={"num_workers"},
+        )
+
+    runs.clear()
+    run(suffix="!")
+    path_output.unlink()
+    run(suffix="!")
+
+    # The second run restores the deleted output instead of running again
+    assert runs == ["!"]
+    assert path_output.read_text() == "ABC!"
+
+    run(suffix="?")
+    path_input.write_text("abcd")
+    run(suffix="?")
+    run(suffix="!")
+
+    # Changed parameters or inputs invalidate cached outputs
+    assert runs == ["!", "?", "?", "!"]
+    assert path_output.read_text() == "ABCD!"
+
+    # Excluded parameters do not invalidate cached outputs
+    run(suffix="!", num_workers=4)
+    assert runs == ["!", "?", "?", "!"]
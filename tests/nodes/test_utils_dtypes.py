@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from eos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDF,
+    NodeDFs,
+    NodeDFsDataInterface,
+    NodeType,
+    compact_node_df,
+)
+from eos.nodes.utils_dtypes import TEXT_DTYPE, enum_column, enum_dtype
+from tests.conftest import TestDataPaths
+
+
+def test_enum_column() -> None:
+    column = enum_column(member=NodeType.industry, length=3)
+
+    assert column.dtype == enum_dtype(NodeType)
+    assert column.tolist() == [NodeType.industry.value] * 3
+    assert column.codes.nbytes == 3
+
+
+def test_compact_node_df() -> None:
+    df = pd.DataFrame(
+        {
+            NodeAttrKey.nid.value: [0, 1],
+            NodeAttrKey.ntype.value: [NodeType.theme.value] * 2,
+            NodeAttrKey.theme.value: ["a", "b"],
+        }
+    )
+    df_compact = compact_node_df(df=df)
+
+    assert df_compact[NodeAttrKey.ntype.value].dtype == enum_dtype(NodeType)
+    assert df_compact[NodeAttrKey.theme.value].dtype == TEXT_DTYPE
+    assert (df_compact[NodeAttrKey.ntype.value] == NodeType.theme).all()
+    assert compact_node_df(df=df_compact) is df_compact
+
+    with pytest.raises(ValueError):
+        compact_node_df(df=df.assign(**{NodeAttrKey.ntype.value: "Planet"}))
+
+
+def test_compact_json_round_trip(test_data_paths: TestDataPaths) -> None:
+    df = compact_node_df(
+        df=pd.DataFrame(
+            {
+                NodeAttrKey.nid.value: [0, 1],
+                NodeAttrKey.ntype.value: [NodeType.theme.value] * 2,
+                NodeAttrKey.description.value: ["a", "b"],
+            }
+        )
+    )
+    node_dfs_data_interface = NodeDFsDataInterface(
+        filepath=test_data_paths.path_saved_node_dfs
+    )
+    node_dfs_data_interface.save(NodeDFs(members=[NodeDF(ntype=NodeType.theme, df=df)]))
+
+    assert node_dfs_data_interface.load().members[0].df.equals(df)
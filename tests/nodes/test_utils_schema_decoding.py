@@ -0,0 +1,45 @@
+import pytest
+
+from eos.data_interfaces.clusters_eval_data_interface import (
+    ClusterEval,
+    ClusteringLevel,
+    ClustersEval,
+    decode_clusters_eval,
+)
+from eos.nodes.utils_schema_decoding import SchemaError
+
+
+def test_decode_clusters_eval() -> None:
+    clusters_eval = decode_clusters_eval(
+        {
+            "level": "industry",
+            "members": [{"id": 0, "label": "a", "note": "b"}],
+        }
+    )
+
+    assert clusters_eval == ClustersEval(
+        level=ClusteringLevel.industry,
+        members=[ClusterEval(id=0, label="a", note="b")],
+    )
+
+
+@pytest.mark.parametrize(
+    "json_data, path",
+    [
+        ({"level": "sector", "members": []}, ("level",)),
+        (
+            {"level": "industry", "members": [{"id": 0, "label": "a"}]},
+            ("members", 0, "note"),
+        ),
+        (
+            {"level": "industry", "members": [{"id": "0", "label": "a", "note": "b"}]},
+            ("members", 0, "id"),
+        ),
+        ({"level": "industry", "members": [], "extra": 1}, ()),
+    ],
+)
+def test_decode_schema_error(json_data: dict, path: tuple) -> None:
+    with pytest.raises(SchemaError) as exc_info:
+        decode_clusters_eval(json_data)
+
+    assert exc_info.value.path == path
@@ -0,0 +1,45 @@
+import pytest
+
+from eos.data_interfaces.onnx_encoder_data_interface import (
+    OnnxEncoderConfig,
+    OnnxEncoderDataInterface,
+    PoolingMode,
+)
+from eos.nodes.encode_features import EncoderBackend
+from eos.pipelines.serve_encoder import serve_encoder
+from tests.conftest import TestDataPaths
+
+
+def test_serve_encoder_rejects_stale_onnx_export(
+    test_data_paths: TestDataPaths,
+) -> None:
+    path_sentence_transformer = test_data_paths.path_dir_output / "transformer"
+    path_sentence_transformer.mkdir(parents=True, exist_ok=True)
+    (path_sentence_transformer / "config.json").write_text("{}")
+    path_dir_onnx = test_data_paths.path_dir_output / "stale_onnx"
+
+    def serve() -> None:
+        serve_encoder(
+            path_sentence_transformer=path_sentence_transformer,
+            path_encoder_socket=test_data_paths.path_encoder_socket,
+            encoder_backend=EncoderBackend.onnx,
+            path_dir_onnx=path_dir_onnx,
+        )
+
+    with pytest.raises(ValueError):
+        serve()
+
+    # An export of a model since changed is not served under the new model key
+    OnnxEncoderDataInterface(dirpath=path_dir_onnx).save_config(
+        config=OnnxEncoderConfig(
+            model_digest="digest of a previous model",
+            input_names=["input_ids", "attention_mask"],
+            pooling_mode=PoolingMode.mean,
+            normalize=True,
+            max_seq_length=128,
+            quantised=False,
+        )
+    )
+    with pytest.raises(ValueError, match="not of the sentence transformer"):
+        serve()
+    assert not test_data_paths.path_encoder_socket.exists()